@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: single-pass byte scanner vs. the original regex extractors.
+
+    python benchmarks/bench_contact_scanner.py --size-mb 2 --repeat 5
+
+The baseline includes the ``bytes -> str`` decode that ``resp.text`` used to
+perform before ``_extract_emails`` and ``_extract_social_links`` ran.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.contact_finder import (  # type: ignore  # noqa: E402
+    _extract_emails,
+    _extract_social_links,
+)
+from extractors.contact_scanner import scan_contacts  # type: ignore  # noqa: E402
+
+def build_page(size_bytes: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+        for _ in range(2000)
+    ]
+    parts = ["<html><head><style>@media screen { body { margin: 0 } }</style></head><body>"]
+    size = len(parts[0])
+    i = 0
+    while size < size_bytes:
+        if i % 400 == 0:
+            chunk = f'<a href="https://cdn.example.org/assets/{i}.js">link</a>'
+        elif i % 2500 == 0:
+            chunk = f"contact sales{i}@acme-dental.com"
+        else:
+            chunk = rng.choice(words)
+        parts.append(chunk)
+        size += len(chunk) + 1
+        i += 1
+    parts.append(
+        '<footer><a href="https://www.facebook.com/acme">Facebook</a>'
+        '<a href="https://twitter.com/acme">Twitter</a>'
+        '<a href="https://www.youtube.com/channel/UC123">YouTube</a></footer></body></html>'
+    )
+    return " ".join(parts).encode("utf-8")
+
+def baseline(page: bytes):
+    html = page.decode("utf-8", errors="replace")
+    return _extract_emails(html), _extract_social_links(html)
+
+def scanner(page: bytes):
+    contacts = scan_contacts(page)
+    return contacts.emails, (
+        contacts.facebook,
+        contacts.instagram,
+        contacts.twitter,
+        contacts.linkedin,
+        contacts.tiktok,
+        contacts.youtube,
+    )
+
+def timeit(fn, page: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, nargs="+", default=[0.1, 1.0, 4.0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'baseline ms':>12} {'scanner ms':>11} {'speedup':>8}")
+    for size_mb in args.size_mb:
+        page = build_page(int(size_mb * 1024 * 1024))
+        if baseline(page) != scanner(page):
+            raise SystemExit("scanner output differs from baseline")
+        old = timeit(baseline, page, args.repeat)
+        new = timeit(scanner, page, args.repeat)
+        print(f"{size_mb:>6.1f}MB {old * 1000:>12.1f} {new * 1000:>11.1f} {old / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
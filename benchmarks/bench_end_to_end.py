@@ -0,0 +1,333 @@
+"""
+End-to-end throughput of ``runner.main`` against a local stand-in web.
+
+    python benchmarks/bench_end_to_end.py --engines threads async \\
+        --vary max_workers=5,20 --vary cpu_pool.enabled=false,true --save
+    python benchmarks/bench_end_to_end.py --compare benchmarks/results/<rev>.json
+
+Every scenario (one engine plus one combination of ``--vary`` settings) runs
+the real CLI in a fresh interpreter against ``stand_in_web``, so peak RSS is
+per scenario and nothing is monkeypatched. Latency percentiles come from the
+run's own metrics summary and are interpolated within histogram buckets.
+Caches, the journal, dedup, rate limiting and retries are off unless a
+``--vary`` turns them back on. ``--save`` writes the results as JSON for a
+later ``--compare``, which exits non-zero when a scenario regressed.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from stand_in_web import (  # noqa: E402
+    StandInWeb,
+    WebProfile,
+    add_profile_arguments,
+    profile_from_args,
+)
+
+RESULTS_DIR = BENCH_DIR / "results"
+
+QUERY_SUBJECTS = ("dentists", "plumbers", "coffee shops", "florists", "bakeries", "gyms")
+QUERY_CITIES = ("Springfield", "Riverside", "Fairview", "Georgetown")
+
+def make_queries(count: int) -> List[str]:
+    pairs = itertools.product(QUERY_CITIES, QUERY_SUBJECTS)
+    return [f"{subject} in {city}" for city, subject in itertools.islice(pairs, count)]
+
+def bench_settings(web: StandInWeb) -> Dict[str, Any]:
+    """The example settings pointed at the stand-in web with run state turned off."""
+    profile = web.profile
+    settings = json.loads((SRC_DIR / "config" / "settings.example.json").read_text("utf-8"))
+    settings.update(
+        {
+            "request_timeout": 10,
+            "max_results": profile.results_per_query,
+            "default_output_format": "jsonl",
+            "search": {
+                "url_template": web.search_url_template,
+                "page_size": profile.page_size,
+                "max_pages": -(-profile.results_per_query // profile.page_size) + 1,
+                "prefetch_pages": 2,
+            },
+            "metrics": {"enabled": True},
+        }
+    )
+    for block in (
+        "http_cache",
+        "enrichment_cache",
+        "dedup",
+        "journal",
+        "rate_limit",
+        "resilience",
+        "dns",
+    ):
+        settings[block] = {**settings.get(block, {}), "enabled": False}
+    return settings
+
+def set_path(settings: Dict[str, Any], dotted: str, value: Any) -> None:
+    *parents, leaf = dotted.split(".")
+    for key in parents:
+        settings = settings.setdefault(key, {})
+    settings[leaf] = value
+
+def parse_vary(spec: str) -> Tuple[str, List[Any]]:
+    key, sep, raw = spec.partition("=")
+    if not sep or not raw:
+        raise argparse.ArgumentTypeError(f"expected KEY=V1,V2,...: {spec!r}")
+    values = []
+    for item in raw.split(","):
+        try:
+            values.append(json.loads(item))
+        except ValueError:
+            values.append(item)
+    return key, values
+
+def scenarios(engines: List[str], varies: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+    axes = [("engine", engines)] + varies
+    return [
+        dict(zip((key for key, _ in axes), combo))
+        for combo in itertools.product(*(values for _, values in axes))
+    ]
+
+def scenario_name(overrides: Dict[str, Any]) -> str:
+    return " ".join(f"{key}={json.dumps(value)}" for key, value in overrides.items())
+
+def _peak_rss_mb(who: int) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes vs KiB
+
+def _percentiles(summary: Dict[str, Any], series: str) -> Dict[str, Optional[float]]:
+    histogram = summary["histograms"].get(series) or {}
+    return {
+        "count": histogram.get("count", 0),
+        "p50_ms": None if histogram.get("p50") is None else histogram["p50"] * 1000,
+        "p99_ms": None if histogram.get("p99") is None else histogram["p99"] * 1000,
+    }
+
+def child(config: str, inputs: str, output_dir: str) -> None:
+    """Run the CLI once in this interpreter and print its measurements as JSON."""
+    import runner  # type: ignore
+
+    start = time.perf_counter()
+    runner.main(["--config", config, "--inputs", inputs, "--output-dir", output_dir])
+    elapsed = time.perf_counter() - start
+
+    out = Path(output_dir)
+    summary = json.loads((out / "metrics_summary.json").read_text("utf-8"))
+    records = with_emails = 0
+    for path in out.glob("*.jsonl"):
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                records += 1
+                with_emails += json.loads(line)["Emails"] != "N/A"
+    failed = 0
+    for name, value in summary["counters"].items():
+        status = re.search(r'status="(\d+)"', name)
+        if name.startswith("http_errors_total") or (
+            name.startswith("http_responses_total") and status and int(status.group(1)) >= 400
+        ):
+            failed += value
+    print(
+        json.dumps(
+            {
+                "elapsed_seconds": elapsed,
+                "records": records,
+                "with_emails": with_emails,
+                "failed_fetches": failed,
+                "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+                "worker_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+                "website_fetch": _percentiles(summary, 'stage_seconds{stage="website_fetch"}'),
+                "search_fetch": _percentiles(summary, 'stage_seconds{stage="search_fetch"}'),
+            }
+        )
+    )
+
+def run_once(settings: Dict[str, Any], queries: List[str], workdir: Path) -> Dict[str, Any]:
+    workdir.mkdir(parents=True)
+    config = workdir / "settings.json"
+    config.write_text(json.dumps(settings), encoding="utf-8")
+    inputs = workdir / "inputs.json"
+    inputs.write_text(json.dumps([{"query": q} for q in queries]), encoding="utf-8")
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", str(config), str(inputs), str(workdir / "out")],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"benchmark run failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def run_scenario(
+    web: StandInWeb,
+    overrides: Dict[str, Any],
+    queries: List[str],
+    repeat: int,
+    workdir: Path,
+) -> Dict[str, Any]:
+    settings = bench_settings(web)
+    for key, value in overrides.items():
+        set_path(settings, key, value)
+    runs = [run_once(settings, queries, workdir / f"run{i}") for i in range(repeat)]
+    # The median run by throughput stands for the scenario.
+    runs.sort(key=lambda run: run["records"] / run["elapsed_seconds"])
+    result = runs[len(runs) // 2]
+    result["records_per_second"] = result["records"] / result["elapsed_seconds"]
+    result["records_per_second_runs"] = [r["records"] / r["elapsed_seconds"] for r in runs]
+    result["overrides"] = overrides
+    return result
+
+def git_revision() -> str:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=BENCH_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    revision = git("rev-parse", "--short", "HEAD") or "unknown"
+    return revision + ("-dirty" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+def print_results(results: Dict[str, Dict[str, Any]], expected: Dict[str, int]) -> None:
+    print(
+        f"{'scenario':<44} {'rec/s':>8} {'p50 ms':>7} {'p99 ms':>7} "
+        f"{'RSS MB':>7} {'emails':>11} {'failed':>6}"
+    )
+    for name, result in results.items():
+        fetch = result["website_fetch"]
+        print(
+            f"{name:<44} {result['records_per_second']:>8.1f} {_ms(fetch['p50_ms']):>7} "
+            f"{_ms(fetch['p99_ms']):>7} {result['peak_rss_mb']:>7.1f} "
+            f"{result['with_emails']:>5}/{expected['with_emails']:<5} "
+            f"{result['failed_fetches']:>6.0f}"
+        )
+
+# (metric, True when bigger is better)
+COMPARED = (
+    ("records_per_second", True),
+    ("website_fetch.p99_ms", False),
+    ("peak_rss_mb", False),
+)
+
+def _lookup(result: Dict[str, Any], dotted: str) -> Optional[float]:
+    value: Any = result
+    for key in dotted.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+def compare(
+    baseline: Dict[str, Any],
+    results: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    """Print the change per scenario and metric; return the regressions."""
+    print(f"\nagainst {baseline['revision']} ({baseline['timestamp']})")
+    regressions = []
+    for name, result in results.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<44} (not in baseline)")
+            continue
+        cells = []
+        for metric, higher_is_better in COMPARED:
+            old, new = _lookup(before, metric), _lookup(result, metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = " !"
+                regressions.append(f"{name}: {metric} {old:.1f} -> {new:.1f}")
+            cells.append(f"{metric} {change:+.0%}{flag}")
+        print(f"{name:<44} " + "  ".join(cells))
+    return regressions
+
+def main() -> None:
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["threads", "async"])
+    parser.add_argument(
+        "--vary",
+        type=parse_vary,
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="Setting (dotted path) to sweep; repeat to take the cartesian product.",
+    )
+    parser.add_argument("--queries", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const="",
+        help="Write results as JSON (default: benchmarks/results/<revision>.json).",
+    )
+    parser.add_argument("--compare", help="Saved results to compare this run against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change that counts as a regression (default 0.1).",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    profile: WebProfile = profile_from_args(args)
+    results: Dict[str, Dict[str, Any]] = {}
+    with StandInWeb(profile) as web, tempfile.TemporaryDirectory() as tmp:
+        expected = web.expected(queries)
+        print(
+            f"{len(queries)} queries, {expected['records']} results, "
+            f"{expected['websites']} sites ({expected['reachable']} reachable)\n"
+        )
+        for i, overrides in enumerate(scenarios(args.engines, args.vary)):
+            name = scenario_name(overrides)
+            results[name] = run_scenario(web, overrides, queries, args.repeat, Path(tmp) / str(i))
+    print_results(results, expected)
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "queries": queries,
+        "profile": profile.as_dict(),
+        "expected": expected,
+        "scenarios": results,
+    }
+    if args.save is not None:
+        path = Path(args.save) if args.save else RESULTS_DIR / f"{revision}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved results to {path}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text("utf-8"))
+        if baseline["profile"] != report["profile"] or baseline["queries"] != queries:
+            print("\nwarning: baseline was recorded against a different synthetic web")
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            raise SystemExit("Regressions:\n  " + "\n  ".join(regressions))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: records parsed per second by each maps_parser backend.
+
+    python benchmarks/bench_parser.py --results 20 200 2000 --repeat 5
+
+Every backend's output is checked against the BeautifulSoup reference first.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.maps_parser import PARSER_BACKENDS  # type: ignore  # noqa: E402
+
+def build_page(results: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts = ["<html><head><script>window.APP_STATE = {};</script></head><body><div id='pane'>"]
+    for i in range(results):
+        # Result pages carry plenty of markup around the fields we read.
+        filler = "".join(
+            f'<span class="chip c{j}" jsaction="x{j}">{rng.randint(0, 9999)}</span>'
+            for j in range(rng.randint(5, 20))
+        )
+        website = f'<a class="business-website" href="https://biz{i}.example.com">Website</a>'
+        parts.append(
+            f'<div class="business-result card" data-index="{i}"><div class="header">'
+            f'<div class="business-name">Business {i} &amp; Sons</div>{filler}</div>'
+            f'<div class="business-address">{i} Main St, Springfield</div>'
+            f'<div class="business-phone">+1 555-{i % 1000:03d}-{i % 10000:04d}</div>'
+            f"{website if i % 4 else ''}<div class='rating'>{filler}</div></div>"
+        )
+    parts.append("</div></body></html>")
+    return "".join(parts)
+
+def timeit(fn, page: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = dict(PARSER_BACKENDS)
+    try:
+        import selectolax  # type: ignore  # noqa: F401
+    except ImportError:
+        backends.pop("selectolax")
+
+    print(f"{'results':>8} {'backend':>11} {'ms':>9} {'records/s':>11} {'speedup':>8}")
+    for results in args.results:
+        page = build_page(results)
+        reference = backends["bs4"](page)
+        timings = {}
+        for name, parse in backends.items():
+            if parse(page) != reference:
+                raise SystemExit(f"{name} output differs from bs4")
+            timings[name] = timeit(parse, page, args.repeat)
+        for name, elapsed in timings.items():
+            print(
+                f"{results:>8} {name:>11} {elapsed * 1000:>9.1f} "
+                f"{len(reference) / elapsed:>11,.0f} {timings['bs4'] / elapsed:>7.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
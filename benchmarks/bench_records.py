@@ -0,0 +1,149 @@
+"""
+Memory and throughput of the record representation at scale.
+
+    python benchmarks/bench_records.py --records 1000000
+
+Compares the previous non-slotted dataclass and ``asdict``-based conversion
+with the slotted ``BusinessRecord``, ``record_to_dict``, the row serializer
+and the columnar ``RecordBatch``. Field strings are built up front and
+shared, so memory figures are the container overhead alone.
+"""
+
+import argparse
+import csv
+import gc
+import io
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.utils_format import (  # type: ignore  # noqa: E402
+    BusinessRecord,
+    RecordBatch,
+    record_to_dict,
+    record_to_row,
+)
+from outputs.exporters import DEFAULT_HEADERS  # type: ignore  # noqa: E402
+
+@dataclass(frozen=True)
+class LegacyRecord:
+    business_name: str
+    business_address: Optional[str]
+    website: Optional[str]
+    phone: Optional[str]
+    emails: List[str]
+    facebook: Optional[str]
+    instagram: Optional[str]
+    twitter: Optional[str]
+    linkedin: Optional[str]
+    tiktok: Optional[str]
+    youtube: Optional[str]
+
+def legacy_record_to_dict(record: LegacyRecord) -> dict:
+    data = asdict(record)
+    return {
+        "Business Name": data["business_name"],
+        "Business Address": data["business_address"] or "N/A",
+        "Website": data["website"] or "N/A",
+        "Phone": data["phone"] or "N/A",
+        "Emails": data["emails"] or "N/A",
+        "Facebook": data["facebook"] or "N/A",
+        "Instagram": data["instagram"] or "N/A",
+        "Twitter": data["twitter"] or "N/A",
+        "LinkedIn": data["linkedin"] or "N/A",
+        "TikTok": data["tiktok"] or "N/A",
+        "YouTube": data["youtube"] or "N/A",
+    }
+
+def field_values(count: int) -> List[tuple]:
+    values = []
+    for i in range(count):
+        website = f"https://biz{i}.example.com" if i % 3 else None
+        values.append(
+            (
+                f"Business {i}",
+                f"{i} Main St",
+                website,
+                f"+1 555-{i % 10000:04d}",
+                [f"info@biz{i}.example.com"] if i % 2 else [],
+                f"https://facebook.com/biz{i}" if i % 5 == 0 else None,
+                None,
+                None,
+                None,
+                None,
+                None,
+            )
+        )
+    return values
+
+def measure(label: str, build: Callable[[], object], count: int) -> object:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    built = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<34} {current / 2**20:>9.1f} MiB "
+        f"{current / count:>8.1f} B/rec {elapsed:>7.2f}s"
+    )
+    return built
+
+def throughput(label: str, fn: Callable[[], object], count: int) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {count / elapsed:>12,.0f} rec/s {elapsed:>7.2f}s")
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.records
+
+    values = field_values(count)
+    print(f"{count:,} records\n\nmemory (containers only)")
+    legacy: List[LegacyRecord] = measure(  # type: ignore[assignment]
+        "dataclass (previous)", lambda: [LegacyRecord(*v) for v in values], count
+    )
+    slotted: List[BusinessRecord] = measure(  # type: ignore[assignment]
+        "slotted BusinessRecord", lambda: [BusinessRecord(*v) for v in values], count
+    )
+    measure("RecordBatch (columnar)", lambda: RecordBatch(slotted), count)
+
+    print("\nconversion")
+    throughput(
+        "asdict record_to_dict (previous)",
+        lambda: [legacy_record_to_dict(r) for r in legacy],
+        count,
+    )
+    throughput("record_to_dict", lambda: [record_to_dict(r) for r in slotted], count)
+    throughput("record_to_row", lambda: [record_to_row(r) for r in slotted], count)
+
+    def csv_via_dicts() -> None:
+        writer = csv.DictWriter(io.StringIO(), fieldnames=DEFAULT_HEADERS)
+        writer.writeheader()
+        for record in legacy:
+            writer.writerow(legacy_record_to_dict(record))
+
+    def csv_via_rows() -> None:
+        writer = csv.writer(io.StringIO())
+        writer.writerow(DEFAULT_HEADERS)
+        writer.writerows(record_to_row(record) for record in slotted)
+
+    print("\nCSV serialization (in memory)")
+    throughput("DictWriter + asdict (previous)", csv_via_dicts, count)
+    throughput("csv.writer + record_to_row", csv_via_rows, count)
+
+if __name__ == "__main__":
+    main()
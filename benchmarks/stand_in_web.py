@@ -0,0 +1,248 @@
+"""
+Local stand-in for Google Maps and the business websites behind it.
+
+    python benchmarks/stand_in_web.py --results-per-query 250 --latency-ms 80
+
+``/search?q=...&start=N`` serves a page of ``.business-result`` blocks, the
+markup ``maps_parser`` reads. Each result links to ``/site/<id>``, a fake
+business site whose latency, size, failure mode and contacts are drawn from
+a generator seeded by the site id, so every run sees the same web.
+"""
+
+import argparse
+import random
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+SOCIAL_LINKS = (
+    "https://www.facebook.com/{slug}",
+    "https://www.instagram.com/{slug}",
+    "https://twitter.com/{slug}",
+    "https://www.linkedin.com/company/{slug}",
+    "https://www.tiktok.com/@{slug}",
+    "https://www.youtube.com/channel/{slug}",
+)
+
+@dataclass(frozen=True)
+class WebProfile:
+    """Shape of the synthetic web; every field is a knob of the benchmark."""
+
+    results_per_query: int = 250
+    page_size: int = 20
+    search_latency_ms: float = 50.0
+    latency_ms: float = 80.0
+    latency_spread: float = 0.5
+    payload_kb: float = 64.0
+    error_rate: float = 0.02
+    email_density: float = 0.6
+    social_density: float = 0.4
+    website_share: float = 0.9
+    seed: int = 7
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass(frozen=True)
+class Site:
+    latency: float
+    failure: Optional[str]
+    emails: Tuple[str, ...]
+    socials: Tuple[str, ...]
+
+def query_id(query: str) -> int:
+    return zlib.crc32(query.encode("utf-8"))
+
+def describe_site(profile: WebProfile, site_id: str) -> Site:
+    rng = random.Random(f"{profile.seed}:{site_id}")
+    # Log-normal latency: most sites answer near the median, a few much later.
+    latency = profile.latency_ms / 1000 * rng.lognormvariate(0, profile.latency_spread)
+    failure = None
+    if rng.random() < profile.error_rate:
+        failure = rng.choice(("status", "disconnect"))
+    slug = f"biz{site_id}"
+    emails: Tuple[str, ...] = ()
+    if rng.random() < profile.email_density:
+        emails = tuple(f"{name}@{slug}.test" for name in ("info", "sales")[: rng.randint(1, 2)])
+    socials = tuple(
+        template.format(slug=slug)
+        for template in SOCIAL_LINKS
+        if rng.random() < profile.social_density
+    )
+    return Site(latency, failure, emails, socials)
+
+def build_filler(size_bytes: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+        for _ in range(500)
+    ]
+    parts: List[str] = []
+    size = 0
+    while size < size_bytes:
+        chunk = f"<p>{' '.join(rng.choice(words) for _ in range(12))}</p>\n"
+        parts.append(chunk)
+        size += len(chunk)
+    return "".join(parts).encode("ascii")[:size_bytes]
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under a burst of new connections,
+    # which shows up as one-second connect stalls that are not the client's.
+    request_queue_size = 1024
+
+class StandInWeb:
+    """
+    Threaded HTTP server for the synthetic web; a context manager.
+
+    ``expected`` tallies the sites and contacts served, so a run's output
+    can be checked against what was actually there to find.
+    """
+
+    def __init__(self, profile: WebProfile, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile
+        self._filler = build_filler(int(profile.payload_kb * 1024), profile.seed)
+        self._server = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url_template(self) -> str:
+        return f"{self.base_url}/search?q={{query}}"
+
+    def start(self) -> "StandInWeb":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInWeb":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def results(self, query: str) -> List[Tuple[int, Optional[str]]]:
+        """(index, site id or None) for every result the query has."""
+        rng = random.Random(f"{self.profile.seed}:{query}")
+        qid = query_id(query)
+        return [
+            (i, f"{qid}-{i}" if rng.random() < self.profile.website_share else None)
+            for i in range(self.profile.results_per_query)
+        ]
+
+    def expected(self, queries: List[str]) -> Dict[str, int]:
+        totals = {"records": 0, "websites": 0, "reachable": 0, "with_emails": 0}
+        for query in queries:
+            for _, site_id in self.results(query):
+                totals["records"] += 1
+                if site_id is None:
+                    continue
+                site = describe_site(self.profile, site_id)
+                totals["websites"] += 1
+                if site.failure is None:
+                    totals["reachable"] += 1
+                    totals["with_emails"] += int(bool(site.emails))
+        return totals
+
+    def search_page(self, query: str, start: int) -> bytes:
+        blocks = []
+        for i, site_id in self.results(query)[start:start + self.profile.page_size]:
+            website = (
+                f'<a class="business-website" href="{self.base_url}/site/{site_id}">Website</a>'
+                if site_id
+                else ""
+            )
+            blocks.append(
+                f'<div class="business-result"><div class="business-name">'
+                f"{query.title()} {i}</div>"
+                f'<div class="business-address">{i} Main St, Springfield</div>'
+                f'<div class="business-phone">+1 555-{query_id(query) % 1000:03d}-{i:04d}</div>'
+                f"{website}</div>"
+            )
+        return f"<html><body>{''.join(blocks)}</body></html>".encode("utf-8")
+
+    def site_page(self, site: Site) -> bytes:
+        contacts = "".join(f'<a href="mailto:{email}">{email}</a>' for email in site.emails)
+        contacts += "".join(f'<a href="{url}">social</a>' for url in site.socials)
+        # Contacts sit in the footer, after the bulk of the page, as they usually do.
+        return (
+            b"<html><head><title>Business</title></head><body>"
+            + self._filler
+            + f"<footer>{contacts}</footer></body></html>".encode("utf-8")
+        )
+
+    def _handler(self) -> type:
+        web = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                parts = urlsplit(self.path)
+                if parts.path == "/search":
+                    params = parse_qs(parts.query)
+                    time.sleep(web.profile.search_latency_ms / 1000)
+                    query = params.get("q", [""])[0]
+                    body = web.search_page(query, int(params.get("start", ["0"])[0]))
+                    self._send(200, body)
+                elif parts.path.startswith("/site/"):
+                    site = describe_site(web.profile, parts.path[len("/site/"):])
+                    time.sleep(site.latency)
+                    if site.failure == "disconnect":
+                        self.close_connection = True
+                        return
+                    if site.failure == "status":
+                        self._send(500, b"<html>internal error</html>")
+                        return
+                    self._send(200, web.site_page(site))
+                else:
+                    self._send(404, b"not found")
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                return None
+
+        return Handler
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = WebProfile()
+    group = parser.add_argument_group("synthetic web")
+    for name, value in defaults.as_dict().items():
+        group.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+def profile_from_args(args: argparse.Namespace) -> WebProfile:
+    return WebProfile(**{name: getattr(args, name) for name in WebProfile().as_dict()})
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    with StandInWeb(profile_from_args(args), port=args.port) as web:
+        print(f"Serving {web.search_url_template}; Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+import asyncio
+import concurrent.futures
+import html
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from extractors.contact_scanner import SOCIAL_KEYS, ContactScanner
+from extractors.utils_format import ContactInfo, dedupe_emails
+from monitoring.metrics import get_metrics
+from network.hedging import FetchAttempt
+from network.http_client import FetchCancelled
+from pipeline.scheduler import InflightLimit
+
+LOGGER = logging.getLogger("gmaps_scraper.contact_crawl")
+
+# Path or link-text keywords of pages that tend to carry contact details,
+# with how strongly each one suggests it.
+LINK_KEYWORDS = (
+    ("contact", 4),
+    ("kontakt", 4),
+    ("contacto", 4),
+    ("contatti", 4),
+    ("impressum", 4),
+    ("imprint", 3),
+    ("legal-notice", 3),
+    ("mentions-legales", 3),
+    ("about", 2),
+    ("ueber-uns", 2),
+    ("uber-uns", 2),
+    ("quienes-somos", 2),
+    ("team", 1),
+)
+
+# Links in the page footer are where sites put their contact pages.
+FOOTER_BONUS = 1
+
+_SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip",
+    ".doc", ".docx", ".xls", ".xlsx", ".mp3", ".mp4", ".css", ".js",
+)
+
+_LINK = re.compile(
+    rb"<a\s[^>]*?href\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))[^>]*>(.{0,300}?)</a",
+    re.I | re.S,
+)
+_FOOTER = re.compile(rb"<footer[\s>]", re.I)
+_TAG = re.compile(r"<[^>]*>")
+
+# Fetches a page: ``get(url, timeout, on_chunk)`` returns the body or None.
+PageGetter = Callable[[str, float, Callable[[bytes], bool]], Optional[bytes]]
+AsyncPageGetter = Callable[[str, float, Callable[[bytes], bool]], Awaitable[Optional[bytes]]]
+
+def _site_host(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return host[len("www."):] if host.startswith("www.") else host
+
+def _without_fragment(url: str) -> str:
+    return url.split("#", 1)[0].rstrip("/")
+
+def rank_contact_links(page: bytes, base_url: str) -> List[str]:
+    """
+    Same-site links on ``page`` that look like contact, about or imprint
+    pages, most promising first. Links that match no keyword are dropped;
+    ``mailto:`` links need no fetch, the homepage scan already has them.
+    """
+    site = _site_host(base_url)
+    home = _without_fragment(base_url)
+    footer = _FOOTER.search(page)
+    footer_start = footer.start() if footer is not None else len(page)
+    scores: Dict[str, Tuple[int, int]] = {}
+    for match in _LINK.finditer(page):
+        raw = match.group(1) or match.group(2) or match.group(3) or b""
+        href = html.unescape(raw.decode("utf-8", errors="replace")).strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        url = _without_fragment(urljoin(base_url, href))
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or _site_host(url) != site or url == home:
+            continue
+        if parts.path.lower().endswith(_SKIPPED_EXTENSIONS):
+            continue
+        text = _TAG.sub(" ", match.group(4).decode("utf-8", errors="replace")).lower()
+        path = parts.path.lower()
+        score = max(
+            (weight for keyword, weight in LINK_KEYWORDS if keyword in path or keyword in text),
+            default=0,
+        )
+        if not score:
+            continue
+        if match.start() >= footer_start:
+            score += FOOTER_BONUS
+        best = scores.get(url)
+        if best is None or score > best[0]:
+            scores[url] = (score, best[1] if best is not None else len(scores))
+    # Ties go to the link that appeared first.
+    return sorted(scores, key=lambda url: (-scores[url][0], scores[url][1]))
+
+def merge_contact_info(found: ContactInfo, extra: ContactInfo) -> ContactInfo:
+    """``found`` with the emails of ``extra`` added and its empty profiles filled."""
+    return ContactInfo(
+        emails=dedupe_emails(list(found.emails) + list(extra.emails)),
+        **{key: getattr(found, key) or getattr(extra, key) for key in SOCIAL_KEYS},
+    )
+
+def contacts_complete(contacts: ContactInfo) -> bool:
+    return bool(contacts.emails) and all(getattr(contacts, key) for key in SOCIAL_KEYS)
+
+class _ByteBudget:
+    """Bytes a site may still download, shared by its parallel page fetches."""
+
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= size
+            return True
+
+class ContactCrawler:
+    """
+    Bounded follow-up crawl of a business website for the contact details
+    its homepage lacks.
+
+    After the homepage is scanned, up to ``max_pages`` same-site links
+    ranked by ``rank_contact_links`` are fetched in parallel and scanned as
+    they stream in. The crawl stops as soon as an email and all six social
+    profiles are known, and never downloads more than ``max_site_bytes``
+    (homepage included) or runs longer than ``max_site_seconds`` per site.
+
+    ``crawl`` serves threaded callers from a private pool of ``max_workers``
+    threads; ``crawl_async`` runs its fetches as tasks on the caller's loop.
+    Under a scheduler's shared ``inflight`` limit a crawl runs one fetch on
+    the slot its caller holds, plus one on each slot that is free when it
+    starts, so it never goes past the global budget and never waits on it.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 3,
+        max_site_bytes: int = 1024 * 1024,
+        max_site_seconds: float = 10.0,
+        max_workers: int = 32,
+    ):
+        self.max_pages = max_pages
+        self.max_site_bytes = max_site_bytes
+        self.max_site_seconds = max_site_seconds
+        self.max_workers = max_workers
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def plan(self, home_url: str, page: bytes, contacts: ContactInfo) -> List[str]:
+        """The extra pages worth fetching for a site, if any."""
+        if contacts_complete(contacts):
+            get_metrics().inc("contact_crawl_sites_total", outcome="complete")
+            return []
+        urls = rank_contact_links(page, home_url)[: self.max_pages]
+        if not urls:
+            get_metrics().inc("contact_crawl_sites_total", outcome="no_links")
+        elif len(page) >= self.max_site_bytes:
+            get_metrics().inc("contact_crawl_sites_total", outcome="over_budget")
+            return []
+        return urls
+
+    def _page_scan(
+        self,
+        fetch: FetchAttempt,
+        budget: _ByteBudget,
+    ) -> Tuple[ContactScanner, Callable[[bytes], bool], List[bool]]:
+        scanner = ContactScanner()
+        cut_short: List[bool] = []
+
+        def on_chunk(chunk: bytes) -> bool:
+            if not budget.take(len(chunk)):
+                cut_short.append(True)
+                raise FetchCancelled(fetch.url)
+            return scanner.feed(chunk)
+
+        return scanner, fetch.watch(on_chunk), cut_short
+
+    def _fetch_page(
+        self,
+        fetch: FetchAttempt,
+        budget: _ByteBudget,
+        deadline: float,
+        get: PageGetter,
+    ) -> ContactInfo:
+        scanner, on_chunk, cut_short = self._page_scan(fetch, budget)
+        body = get(fetch.url, max(deadline - time.monotonic(), 0.1), on_chunk)
+        # A page cut off by the byte budget still counts for what it showed.
+        return scanner.result() if body is not None or cut_short else ContactInfo()
+
+    async def _fetch_page_async(
+        self,
+        fetch: FetchAttempt,
+        budget: _ByteBudget,
+        deadline: float,
+        get: AsyncPageGetter,
+    ) -> ContactInfo:
+        scanner, on_chunk, cut_short = self._page_scan(fetch, budget)
+        body = await get(fetch.url, max(deadline - time.monotonic(), 0.1), on_chunk)
+        return scanner.result() if body is not None or cut_short else ContactInfo()
+
+    @staticmethod
+    def _width(urls: List[str], inflight: Optional[InflightLimit]) -> int:
+        """How many of ``urls`` to fetch at once, taking the extra slots from ``inflight``."""
+        if inflight is None:
+            return len(urls)
+        width = 1
+        while width < len(urls) and inflight.try_acquire():
+            width += 1
+        return width
+
+    def _finish(self, contacts: ContactInfo, found: ContactInfo, fetched: int) -> ContactInfo:
+        metrics = get_metrics()
+        metrics.inc("contact_crawl_pages_total", fetched)
+        added = (len(found.emails) > len(contacts.emails)) or any(
+            getattr(found, key) and not getattr(contacts, key) for key in SOCIAL_KEYS
+        )
+        metrics.inc("contact_crawl_sites_total", outcome="added" if added else "nothing_new")
+        return found
+
+    def _executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="crawl",
+                )
+            return self._pool
+
+    def crawl(
+        self,
+        home_url: str,
+        page: bytes,
+        contacts: ContactInfo,
+        get: PageGetter,
+        cancelled: Optional[threading.Event] = None,
+        inflight: Optional[InflightLimit] = None,
+    ) -> ContactInfo:
+        """
+        ``contacts`` (found on the homepage ``page``) plus what the extra
+        pages add. Setting ``cancelled`` abandons the crawl's fetches.
+        """
+        urls = self.plan(home_url, page, contacts)
+        if not urls:
+            return contacts
+        deadline = time.monotonic() + self.max_site_seconds
+        budget = _ByteBudget(self.max_site_bytes - len(page))
+        pool = self._executor()
+        fetches = [FetchAttempt(url, cancelled) for url in urls]
+        queued = deque(fetches)
+        width = self._width(urls, inflight)
+
+        def submit() -> "concurrent.futures.Future[ContactInfo]":
+            return pool.submit(self._fetch_page, queued.popleft(), budget, deadline, get)
+
+        pending = {submit() for _ in range(width)}
+        found = contacts
+        fetched = 0
+        try:
+            while pending and not contacts_complete(found):
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    timeout=max(deadline - time.monotonic(), 0.0),
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                if not done:
+                    LOGGER.debug("Contact crawl of %s ran out of time", home_url)
+                    break
+                for future in done:
+                    fetched += 1
+                    try:
+                        found = merge_contact_info(found, future.result())
+                    except Exception as exc:  # pragma: no cover - defensive logging
+                        LOGGER.debug("Contact page fetch failed: %s", exc)
+                    if queued:
+                        pending.add(submit())
+        finally:
+            for fetch in fetches:
+                fetch.cancelled.set()
+            for future in pending:
+                future.cancel()
+            if inflight is not None:
+                for _ in range(width - 1):
+                    inflight.release()
+        return self._finish(contacts, found, fetched)
+
+    async def crawl_async(
+        self,
+        home_url: str,
+        page: bytes,
+        contacts: ContactInfo,
+        get: AsyncPageGetter,
+        inflight: Optional[InflightLimit] = None,
+    ) -> ContactInfo:
+        """Event-loop counterpart of ``crawl``; leftover fetches are cancelled tasks."""
+        urls = self.plan(home_url, page, contacts)
+        if not urls:
+            return contacts
+        deadline = time.monotonic() + self.max_site_seconds
+        budget = _ByteBudget(self.max_site_bytes - len(page))
+        queued = deque(urls)
+        width = self._width(urls, inflight)
+
+        def submit() -> "asyncio.Future[ContactInfo]":
+            fetch = FetchAttempt(queued.popleft())
+            return asyncio.ensure_future(self._fetch_page_async(fetch, budget, deadline, get))
+
+        pending = {submit() for _ in range(width)}
+        found = contacts
+        fetched = 0
+        try:
+            while pending and not contacts_complete(found):
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(deadline - time.monotonic(), 0.0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    LOGGER.debug("Contact crawl of %s ran out of time", home_url)
+                    break
+                for task in done:
+                    fetched += 1
+                    try:
+                        found = merge_contact_info(found, task.result())
+                    except Exception as exc:  # pragma: no cover - defensive logging
+                        LOGGER.debug("Contact page fetch failed: %s", exc)
+                    if queued:
+                        pending.add(submit())
+        finally:
+            for task in pending:
+                task.cancel()
+            if inflight is not None:
+                for _ in range(width - 1):
+                    inflight.release()
+        return self._finish(contacts, found, fetched)
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def build_contact_crawler(settings: Dict[str, Any]) -> Optional[ContactCrawler]:
+    config = settings.get("contact_crawl") or {}
+    if not config.get("enabled", False):
+        return None
+    max_pages = int(config.get("max_pages", 3))
+    # Each enrichment slot may have all of its site's extra pages in flight;
+    # under a scheduler its shared in-flight limit decides how many run.
+    fetch_slots = int((settings.get("scheduler") or {}).get("global_max_inflight", 32))
+    return ContactCrawler(
+        max_pages=max_pages,
+        max_site_bytes=int(config.get("max_kb_per_site", 1024)) * 1024,
+        max_site_seconds=float(config.get("max_seconds_per_site", 10)),
+        max_workers=max(fetch_slots, int(settings.get("max_workers", 5))) * max(max_pages, 1),
+    )
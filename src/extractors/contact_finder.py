@@ -1,18 +1,48 @@
+import asyncio
 import concurrent.futures
 import logging
 import re
-from typing import Iterable, List, Optional, Tuple
-
-import requests
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from extractors.contact_crawl import ContactCrawler
+from extractors.contact_scanner import ContactScanner
 from extractors.utils_format import (
     BusinessRecord,
+    ContactInfo,
     dedupe_emails,
     normalize_email,
 )
+from monitoring.metrics import get_metrics
+from network.hedging import FetchAttempt, Hedger
+from network.http_client import AsyncHttpClient, HttpClient, get_default_client
+from pipeline.cpu_pool import CpuPool
+from pipeline.scheduler import InflightLimit
+from storage.enrichment_cache import EnrichmentCache
 
 LOGGER = logging.getLogger("gmaps_scraper.contact_finder")
 
+# Called with a record exported unenriched and the budget ("record" or
+# "query") its fetch ran out of.
+MissedCallback = Callable[[BusinessRecord, str], None]
+
+# Called with a record whose website fetch failed, before it is yielded.
+FailedCallback = Callable[[BusinessRecord], None]
+
 EMAIL_REGEX = re.compile(
     r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
     re.IGNORECASE,
@@ -36,16 +66,20 @@ SOCIAL_PATTERNS = {
     ),
 }
 
-def _safe_get(url: str, timeout: int) -> Optional[str]:
+def _safe_get(
+    url: str,
+    timeout: int,
+    client: Optional[HttpClient] = None,
+    on_chunk: Optional[Callable[[bytes], bool]] = None,
+) -> Optional[bytes]:
+    if client is None:
+        client = get_default_client()
     try:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (compatible; BitbashScraper/1.0; +https://bitbash.dev)"
-            )
-        }
-        resp = requests.get(url, headers=headers, timeout=timeout)
+        # Includes the streaming scan done by ``on_chunk``.
+        with get_metrics().timer("stage_seconds", stage="website_fetch"):
+            resp = client.get(url, timeout=timeout, on_chunk=on_chunk)
         resp.raise_for_status()
-        return resp.text
+        return resp.content
     except Exception as exc:  # pragma: no cover - defensive logging
         LOGGER.debug("Failed to fetch %s: %s", url, exc)
         return None
@@ -76,71 +110,569 @@ def _extract_social_links(html: str) -> Tuple[
         profiles["youtube"],
     )
 
-def _enrich_single(record: BusinessRecord, timeout: int) -> BusinessRecord:
-    if not record.website:
-        return record
+def _merge_contacts(record: BusinessRecord, contacts: ContactInfo) -> BusinessRecord:
+    # Merge emails
+    combined_emails = dedupe_emails(list(record.emails) + contacts.emails)
 
-    html = _safe_get(record.website, timeout=timeout)
-    if not html:
+    # Most sites add nothing new; keep the original record instead of copying it.
+    if combined_emails == record.emails and not any(
+        getattr(contacts, name) and not getattr(record, name) for name in SOCIAL_PATTERNS
+    ):
         return record
 
-    emails = _extract_emails(html)
-    (
-        facebook,
-        instagram,
-        twitter,
-        linkedin,
-        tiktok,
-        youtube,
-    ) = _extract_social_links(html)
-
-    # Merge emails
-    combined_emails = dedupe_emails(list(record.emails) + emails)
-
     return BusinessRecord(
         business_name=record.business_name,
         business_address=record.business_address,
         website=record.website,
         phone=record.phone,
         emails=combined_emails,
-        facebook=record.facebook or facebook,
-        instagram=record.instagram or instagram,
-        twitter=record.twitter or twitter,
-        linkedin=record.linkedin or linkedin,
-        tiktok=record.tiktok or tiktok,
-        youtube=record.youtube or youtube,
+        facebook=record.facebook or contacts.facebook,
+        instagram=record.instagram or contacts.instagram,
+        twitter=record.twitter or contacts.twitter,
+        linkedin=record.linkedin or contacts.linkedin,
+        tiktok=record.tiktok or contacts.tiktok,
+        youtube=record.youtube or contacts.youtube,
     )
 
+def _fetch_attempt(
+    attempt: FetchAttempt,
+    timeout: float,
+    client: Optional[HttpClient],
+    stream_scan: bool,
+) -> Optional[Tuple[str, bytes, Optional[ContactScanner]]]:
+    scanner = ContactScanner() if stream_scan else None
+    page = _safe_get(
+        attempt.url,
+        timeout=timeout,
+        client=client,
+        on_chunk=attempt.watch(scanner.feed if scanner is not None else None),
+    )
+    return (attempt.url, page, scanner) if page else None
+
+def _enrich_single(
+    record: BusinessRecord,
+    timeout: float,
+    client: Optional[HttpClient] = None,
+    cache: Optional[EnrichmentCache] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    cancelled: Optional[threading.Event] = None,
+    crawler: Optional[ContactCrawler] = None,
+    on_failed: Optional[FailedCallback] = None,
+    inflight: Optional[InflightLimit] = None,
+) -> BusinessRecord:
+    if not record.website:
+        return record
+
+    if cache is not None:
+        cached = cache.get(record.website)
+        if cached is not None:
+            return _merge_contacts(record, cached)
+
+    # Scanning while streaming would burn this I/O thread's share of the GIL,
+    # so with a cpu_pool the whole body goes to a worker process instead.
+    stream_scan = cpu_pool is None
+
+    def attempt(fetch: FetchAttempt) -> Optional[Tuple[str, bytes, Optional[ContactScanner]]]:
+        return _fetch_attempt(fetch, timeout, client, stream_scan)
+
+    if hedger is not None:
+        fetched = hedger.run(record.website, attempt, cancelled)
+    else:
+        fetched = attempt(FetchAttempt(record.website, cancelled))
+    if fetched is None:
+        return _failed(record, on_failed)
+    url, page, scanner = fetched
+    with get_metrics().timer("stage_seconds", stage="contact_extraction"):
+        if scanner is not None:
+            contacts = scanner.result(page)
+        else:
+            assert cpu_pool is not None
+            contacts = cpu_pool.scan(page)
+
+    if crawler is not None:
+        contacts = crawler.crawl(
+            url,
+            page,
+            contacts,
+            lambda link, limit, on_chunk: _safe_get(link, min(timeout, limit), client, on_chunk),
+            cancelled,
+            inflight,
+        )
+
+    if cache is not None:
+        cache.put(record.website, contacts)
+    return _merge_contacts(record, contacts)
+
+def _failed(record: BusinessRecord, on_failed: Optional[FailedCallback]) -> BusinessRecord:
+    if on_failed is not None:
+        on_failed(record)
+    return record
+
+def _future_result(
+    future: "concurrent.futures.Future[BusinessRecord]",
+    original: BusinessRecord,
+    on_failed: Optional[FailedCallback] = None,
+) -> BusinessRecord:
+    try:
+        return future.result()
+    except Exception as exc:  # pragma: no cover - defensive logging
+        LOGGER.debug(
+            "Error enriching record %r: %s",
+            original.business_name,
+            exc,
+        )
+        return _failed(original, on_failed)
+
+def _budget(
+    record_budget: Optional[float],
+    deadline: Optional[float],
+) -> Tuple[Optional[float], str]:
+    """Seconds a fetch starting now may take, and which budget sets that limit."""
+    remaining = None if deadline is None else deadline - time.monotonic()
+    if record_budget is not None and (remaining is None or record_budget < remaining):
+        return record_budget, "record"
+    return remaining, "query"
+
+def _missed(
+    record: BusinessRecord,
+    budget: str,
+    on_missed: Optional[MissedCallback],
+) -> BusinessRecord:
+    LOGGER.debug("Out of %s budget for %r; exporting it unenriched", budget, record.business_name)
+    get_metrics().inc("enrichment_deadline_missed_total", budget=budget)
+    if on_missed is not None:
+        on_missed(record, budget)
+    return record
+
+def iter_enriched_records(
+    records: Iterable[BusinessRecord],
+    timeout: int = 10,
+    max_workers: int = 5,
+    client: Optional[HttpClient] = None,
+    cache: Optional[EnrichmentCache] = None,
+    window: Optional[int] = None,
+    executor: Optional[Any] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    record_budget: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_missed: Optional[MissedCallback] = None,
+    crawler: Optional[ContactCrawler] = None,
+    on_failed: Optional[FailedCallback] = None,
+    inflight: Optional[InflightLimit] = None,
+) -> Iterator[BusinessRecord]:
+    """
+    Enrich records lazily, yielding each one as soon as its fetch completes.
+
+    ``records`` is consumed incrementally and at most ``window`` records
+    (default ``2 * max_workers``) are in flight at any time, so memory stays
+    bounded however many records flow through.
+
+    ``executor`` may be any object with an ``Executor``-style ``submit``,
+    e.g. a shared pool used by several queries; it is not shut down here.
+    Without one a private pool of ``max_workers`` threads is used.
+
+    With a ``cpu_pool`` contact extraction runs in its worker processes.
+
+    With a ``hedger`` a website that is slow to respond is raced against its
+    other URL variants. With a ``crawler`` the contact pages a homepage
+    links to are searched for what the homepage lacks; ``inflight`` is the
+    shared limit of a scheduler's ``executor``, which keeps the crawl's
+    extra fetches within its budget.
+
+    A record whose fetch takes longer than ``record_budget`` seconds (counted
+    from when a worker starts it) or runs past ``deadline`` (a
+    ``time.monotonic()`` value, normally the query's) is yielded unenriched and reported to
+    ``on_missed``; its fetch gives up at the next chunk it receives. Records
+    that arrive after the deadline are not fetched at all. A record whose
+    website could not be fetched is reported to ``on_failed``.
+    """
+    window = max(window or 2 * max_workers, 1)
+    owns_executor = executor is None
+    if executor is None:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    if record_budget is not None:
+        timeout = min(timeout, record_budget)
+    pending: Dict["concurrent.futures.Future[BusinessRecord]", BusinessRecord] = {}
+    # For fetches on a budget: the event that makes the fetch give up, and
+    # when a worker started it. A queued record's own budget has not begun.
+    budgets: Dict[
+        "concurrent.futures.Future[BusinessRecord]",
+        Tuple[threading.Event, "concurrent.futures.Future[float]"],
+    ] = {}
+    abandoned = False
+    count = 0
+
+    def run(
+        record: BusinessRecord,
+        cancelled: Optional[threading.Event],
+        started: Optional["concurrent.futures.Future[float]"],
+    ) -> BusinessRecord:
+        if started is not None:
+            started.set_result(time.monotonic())
+        return _enrich_single(
+            record,
+            timeout,
+            client,
+            cache,
+            cpu_pool,
+            hedger,
+            cancelled,
+            crawler,
+            on_failed,
+            inflight,
+        )
+
+    def due(started: "concurrent.futures.Future[float]") -> Tuple[Optional[float], str]:
+        """When a fetch runs out of budget, and which budget that is."""
+        if record_budget is not None and started.done():
+            record_due = started.result() + record_budget
+            if deadline is None or record_due < deadline:
+                return record_due, "record"
+        return deadline, "query"
+
+    def collect() -> Iterator[BusinessRecord]:
+        """Wait for a fetch to finish or run out of budget; yield what is ready."""
+        nonlocal abandoned, count
+        # Waiting on the start of queued fetches too picks up their budgets.
+        waiting: Set["concurrent.futures.Future[Any]"] = set(pending)
+        dues: List[float] = []
+        for _, started in budgets.values():
+            if not started.done():
+                waiting.add(started)
+            when, _ = due(started)
+            if when is not None:
+                dues.append(when)
+        timeout = max(0.0, min(dues) - time.monotonic()) if dues else None
+        done, _ = concurrent.futures.wait(
+            waiting,
+            timeout=timeout,
+            return_when=concurrent.futures.FIRST_COMPLETED,
+        )
+        for future in done:
+            if future not in pending:
+                continue
+            budgets.pop(future, None)
+            count += 1
+            yield _future_result(future, pending.pop(future), on_failed)
+        now = time.monotonic()
+        for future, (cancelled, started) in list(budgets.items()):
+            when, budget = due(started)
+            if when is None or when > now or future.done():
+                continue
+            del budgets[future]
+            cancelled.set()
+            if not future.cancel():
+                abandoned = True
+            count += 1
+            yield _missed(pending.pop(future), budget, on_missed)
+
+    try:
+        for record in records:
+            seconds, budget = _budget(record_budget, deadline)
+            if seconds is not None and seconds <= 0:
+                count += 1
+                yield _missed(record, budget, on_missed)
+                continue
+            cancelled = started = None
+            if seconds is not None:
+                cancelled = threading.Event()
+                started = concurrent.futures.Future()
+            future = executor.submit(run, record, cancelled, started)
+            pending[future] = record
+            if cancelled is not None and started is not None:
+                budgets[future] = (cancelled, started)
+            while len(pending) >= window:
+                yield from collect()
+
+        while pending:
+            yield from collect()
+    finally:
+        for cancelled, _ in budgets.values():
+            cancelled.set()
+        if owns_executor:
+            # Fetches that ran out of budget finish in the background.
+            executor.shutdown(wait=not abandoned, cancel_futures=True)
+        else:
+            for future in pending:
+                future.cancel()
+        LOGGER.debug("Enriched %d business records", count)
+
 def enrich_business_records(
     records: Iterable[BusinessRecord],
     timeout: int = 10,
     max_workers: int = 5,
+    client: Optional[HttpClient] = None,
+    cache: Optional[EnrichmentCache] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    record_budget: Optional[float] = None,
+    query_budget: Optional[float] = None,
+    on_missed: Optional[MissedCallback] = None,
+    crawler: Optional[ContactCrawler] = None,
 ) -> List[BusinessRecord]:
+    """
+    Enrich ``records`` in one go. With ``query_budget`` seconds the whole
+    batch stops fetching once it runs out; see ``iter_enriched_records``
+    for the other options.
+    """
     records_list = list(records)
     LOGGER.info("Enriching %d business records with contact info", len(records_list))
 
     if not records_list:
         return []
 
-    enriched: List[BusinessRecord] = []
+    return list(
+        iter_enriched_records(
+            records_list,
+            timeout=timeout,
+            max_workers=max_workers,
+            client=client,
+            cache=cache,
+            window=len(records_list),
+            cpu_pool=cpu_pool,
+            hedger=hedger,
+            record_budget=record_budget,
+            deadline=time.monotonic() + query_budget if query_budget is not None else None,
+            on_missed=on_missed,
+            crawler=crawler,
+        )
+    )
+
+async def _safe_get_async(
+    client: AsyncHttpClient,
+    url: str,
+    timeout: int,
+    on_chunk: Optional[Callable[[bytes], bool]] = None,
+) -> Optional[bytes]:
+    try:
+        with get_metrics().timer("stage_seconds", stage="website_fetch"):
+            resp = await client.get(url, timeout=timeout, on_chunk=on_chunk)
+        resp.raise_for_status()
+        return resp.content
+    except Exception as exc:  # pragma: no cover - defensive logging
+        LOGGER.debug("Failed to fetch %s: %s", url, exc)
+        return None
+
+async def _fetch_attempt_async(
+    attempt: FetchAttempt,
+    client: AsyncHttpClient,
+    timeout: float,
+    stream_scan: bool,
+) -> Optional[Tuple[str, bytes, Optional[ContactScanner]]]:
+    scanner = ContactScanner() if stream_scan else None
+    page = await _safe_get_async(
+        client,
+        attempt.url,
+        timeout=timeout,
+        on_chunk=attempt.watch(scanner.feed if scanner is not None else None),
+    )
+    return (attempt.url, page, scanner) if page else None
+
+async def _enrich_single_async(
+    client: AsyncHttpClient,
+    record: BusinessRecord,
+    timeout: float,
+    cache: Optional[EnrichmentCache] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    crawler: Optional[ContactCrawler] = None,
+    on_failed: Optional[FailedCallback] = None,
+    inflight: Optional[InflightLimit] = None,
+) -> BusinessRecord:
+    if not record.website:
+        return record
+
+    if cache is not None:
+        cached = cache.get(record.website)
+        if cached is not None:
+            return _merge_contacts(record, cached)
+
+    stream_scan = cpu_pool is None
+
+    async def attempt(
+        fetch: FetchAttempt,
+    ) -> Optional[Tuple[str, bytes, Optional[ContactScanner]]]:
+        return await _fetch_attempt_async(fetch, client, timeout, stream_scan)
+
+    async def get(link: str, limit: float, on_chunk: Callable[[bytes], bool]) -> Optional[bytes]:
+        return await _safe_get_async(client, link, min(timeout, limit), on_chunk)
+
+    if hedger is not None:
+        fetched = await hedger.run_async(record.website, attempt)
+    else:
+        fetched = await attempt(FetchAttempt(record.website))
+    if fetched is None:
+        return _failed(record, on_failed)
+    url, page, scanner = fetched
+    with get_metrics().timer("stage_seconds", stage="contact_extraction"):
+        if scanner is not None:
+            contacts = scanner.result(page)
+        else:
+            assert cpu_pool is not None
+            contacts = await cpu_pool.scan_async(page)
+
+    if crawler is not None:
+        contacts = await crawler.crawl_async(url, page, contacts, get, inflight)
+
+    if cache is not None:
+        cache.put(record.website, contacts)
+    return _merge_contacts(record, contacts)
+
+async def _as_async_iterator(
+    records: Union[Iterable[BusinessRecord], AsyncIterable[BusinessRecord]],
+) -> AsyncIterator[BusinessRecord]:
+    if isinstance(records, AsyncIterable):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
+
+async def aiter_enriched_records(
+    records: Union[Iterable[BusinessRecord], AsyncIterable[BusinessRecord]],
+    client: AsyncHttpClient,
+    timeout: int = 10,
+    concurrency: int = 100,
+    cache: Optional[EnrichmentCache] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    record_budget: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_missed: Optional[MissedCallback] = None,
+    crawler: Optional[ContactCrawler] = None,
+    on_failed: Optional[FailedCallback] = None,
+    inflight: Optional[InflightLimit] = None,
+) -> AsyncIterator[BusinessRecord]:
+    """
+    Async generator counterpart of ``iter_enriched_records``: keeps at most
+    ``concurrency`` fetches in flight and yields records as they complete.
+    Budgets count from when a fetch starts, and a fetch that runs out of
+    one is cancelled. With an ``inflight`` limit each fetch also holds one
+    of its slots, shared with other loops.
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_record = {
-            executor.submit(_enrich_single, record, timeout): record
-            for record in records_list
-        }
-        for future in concurrent.futures.as_completed(future_to_record):
-            original = future_to_record[future]
+    ``records`` may be an async iterable, e.g. one fed page by page; fetches
+    that finish while it waits for more are yielded straight away.
+    """
+    if record_budget is not None:
+        timeout = min(timeout, record_budget)
+
+    async def enrich(record: BusinessRecord) -> BusinessRecord:
+        if inflight is None:
+            return await enrich_one(record)
+        await inflight.acquire()
+        try:
+            return await enrich_one(record)
+        finally:
+            inflight.release()
+
+    async def enrich_one(record: BusinessRecord) -> BusinessRecord:
+        try:
+            fetch = _enrich_single_async(
+                client, record, timeout, cache, cpu_pool, hedger, crawler, on_failed, inflight
+            )
+            seconds, budget = _budget(record_budget, deadline)
+            if seconds is None:
+                return await fetch
             try:
-                new_record = future.result()
-            except Exception as exc:  # pragma: no cover - defensive logging
-                LOGGER.debug(
-                    "Error enriching record %r: %s",
-                    original.business_name,
-                    exc,
-                )
-                enriched.append(original)
+                return await asyncio.wait_for(fetch, max(seconds, 0.0))
+            except asyncio.TimeoutError:
+                return _missed(record, budget, on_missed)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            LOGGER.debug(
+                "Error enriching record %r: %s",
+                record.business_name,
+                exc,
+            )
+            return _failed(record, on_failed)
+
+    source = _as_async_iterator(records)
+    pending: Set["asyncio.Future[BusinessRecord]"] = set()
+    # The source's next record, awaited alongside the fetches in flight.
+    upcoming: Optional["asyncio.Future[BusinessRecord]"] = None
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            if not exhausted and upcoming is None and len(pending) < concurrency:
+                upcoming = asyncio.ensure_future(source.__anext__())
+            waiting = pending | {upcoming} if upcoming is not None else pending
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for task in done & pending:
+                pending.discard(task)
+                yield task.result()
+            if upcoming is None or not upcoming.done():
+                continue
+            arrived, upcoming = upcoming, None
+            try:
+                record = arrived.result()
+            except StopAsyncIteration:
+                exhausted = True
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                yield _missed(record, "query", on_missed)
             else:
-                enriched.append(new_record)
+                pending.add(asyncio.ensure_future(enrich(record)))
+    finally:
+        leftover = pending | {upcoming} if upcoming is not None else pending
+        for task in leftover:
+            task.cancel()
+        # Let cancelled fetches hand back their in-flight slots.
+        await asyncio.gather(*leftover, return_exceptions=True)
+
+async def enrich_business_records_async(
+    records: Iterable[BusinessRecord],
+    timeout: int = 10,
+    concurrency: int = 100,
+    client: Optional[AsyncHttpClient] = None,
+    cache: Optional[EnrichmentCache] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    record_budget: Optional[float] = None,
+    query_budget: Optional[float] = None,
+    on_missed: Optional[MissedCallback] = None,
+    crawler: Optional[ContactCrawler] = None,
+) -> List[BusinessRecord]:
+    """
+    Event-loop counterpart of ``enrich_business_records``.
 
-    return enriched
\ No newline at end of file
+    All website fetches run as coroutines on a single loop, with at most
+    ``concurrency`` of them in flight at once. Returns the same records the
+    threaded path would, in completion order. Requires ``httpx``.
+
+    When no ``client`` is given a temporary one is created and closed again.
+    """
+    records_list = list(records)
+    LOGGER.info(
+        "Enriching %d business records with contact info (async, concurrency=%d)",
+        len(records_list),
+        concurrency,
+    )
+
+    if not records_list:
+        return []
+
+    owns_client = client is None
+    if client is None:
+        client = AsyncHttpClient(max_connections=concurrency)
+
+    try:
+        return [
+            record
+            async for record in aiter_enriched_records(
+                records_list,
+                client,
+                timeout=timeout,
+                concurrency=concurrency,
+                cache=cache,
+                cpu_pool=cpu_pool,
+                hedger=hedger,
+                record_budget=record_budget,
+                deadline=time.monotonic() + query_budget if query_budget is not None else None,
+                on_missed=on_missed,
+                crawler=crawler,
+            )
+        ]
+    finally:
+        if owns_client:
+            await client.aclose()
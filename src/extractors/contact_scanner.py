@@ -0,0 +1,138 @@
+import re
+from typing import Dict, List, Optional
+
+from extractors.utils_format import ContactInfo, dedupe_emails, normalize_email
+
+SOCIAL_KEYS = ("facebook", "instagram", "twitter", "linkedin", "tiktok", "youtube")
+
+# Every email contains "@" and every social profile URL contains "://", so a
+# single pass over the page only has to stop at those two anchors. The
+# surrounding bytes are then matched locally, which is far cheaper than
+# running the email pattern from every alphanumeric position and six URL
+# patterns over the whole document.
+_ANCHOR = re.compile(rb"@|://")
+
+_EMAIL_LOCAL_CHARS = frozenset(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-"
+)
+_EMAIL_DOMAIN = re.compile(rb"[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+# What ``\s`` matches in decoded UTF-8 text beyond the bytes pattern's
+# ASCII whitespace: \x1c-\x1f, and NEL, NBSP, U+1680, U+2000-U+200A,
+# U+2028, U+2029, U+202F, U+205F and U+3000 as their encoded bytes.
+_UNICODE_SPACE = (
+    rb"[\x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]"
+    rb"|\xe2\x81\x9f|\xe3\x80\x80"
+)
+
+# Host part of each social profile URL, matched right after "://". The
+# trailing ``[^\s"']+`` of ``contact_finder.SOCIAL_PATTERNS`` is spelled out
+# so it stops at the same (Unicode) whitespace.
+_SOCIAL_TAIL = re.compile(
+    rb"(?:(?P<facebook>(?:www\.)?facebook\.com/)"
+    rb"|(?P<instagram>(?:www\.)?instagram\.com/)"
+    rb"|(?P<twitter>(?:www\.)?(?:twitter\.com|x\.com)/)"
+    rb"|(?P<linkedin>(?:[a-z]{2,3}\.)?linkedin\.com/)"
+    rb"|(?P<tiktok>(?:www\.)?tiktok\.com/)"
+    rb"|(?P<youtube>(?:www\.)?(?:youtube\.com|youtu\.be)/))"
+    rb"(?:(?!" + _UNICODE_SPACE + rb")[^\s\"'])+",
+    re.I,
+)
+
+def _scheme_start(data: bytes, colon: int) -> int:
+    """Return the index where ``http://``/``https://`` starts, or -1."""
+    if colon >= 5 and data[colon - 5 : colon].lower() == b"https":
+        return colon - 5
+    if colon >= 4 and data[colon - 4 : colon].lower() == b"http":
+        return colon - 4
+    return -1
+
+# Bytes that can never be part of an email or a social URL match; the
+# streaming scanner only cuts chunks at these so no match spans a cut.
+_BOUNDARY_BYTES = (b" ", b"\n", b"\t", b"\r", b"\f", b"\v", b'"', b"'")
+
+class ContactScanner:
+    """
+    Incremental form of ``scan_contacts`` for streamed downloads.
+
+    ``feed`` accepts body chunks as they arrive and returns True once at
+    least one email and all six social profiles have been found, which lets
+    the HTTP client stop reading early.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.codec = encoding or "utf-8"
+        self.bytes_seen = 0
+        self._pending = b""
+        self._emails: List[str] = []
+        self._profiles: Dict[str, Optional[str]] = {key: None for key in SOCIAL_KEYS}
+        self._missing = len(SOCIAL_KEYS)
+
+    @property
+    def complete(self) -> bool:
+        return bool(self._emails) and not self._missing
+
+    def feed(self, chunk: bytes) -> bool:
+        self.bytes_seen += len(chunk)
+        data = self._pending + chunk if self._pending else chunk
+        cut = max(data.rfind(b) for b in _BOUNDARY_BYTES) + 1
+        if cut:
+            self._scan(data[:cut])
+        self._pending = data[cut:]
+        return self.complete
+
+    def result(self, page: Optional[bytes] = None) -> ContactInfo:
+        """
+        Flush buffered bytes and return what was found. ``page`` is scanned
+        instead when nothing was fed, e.g. for bodies that were not streamed.
+        """
+        if page is not None and not self.bytes_seen:
+            self.bytes_seen = len(page)
+            self._scan(page)
+        elif self._pending:
+            self._scan(self._pending)
+        self._pending = b""
+        return ContactInfo(emails=dedupe_emails(self._emails), **self._profiles)
+
+    def _scan(self, data: bytes) -> None:
+        emails = self._emails
+        profiles = self._profiles
+        email_end = 0
+
+        for anchor in _ANCHOR.finditer(data):
+            at = anchor.start()
+            if data[at] == 0x40:  # "@"
+                start = at
+                while start > email_end and data[start - 1] in _EMAIL_LOCAL_CHARS:
+                    start -= 1
+                if start == at:
+                    continue
+                domain = _EMAIL_DOMAIN.match(data, at + 1)
+                if domain is None:
+                    continue
+                email_end = domain.end()
+                email = normalize_email(data[start:email_end].decode("ascii"))
+                if not email.endswith("@example.com"):
+                    emails.append(email)
+            elif self._missing:
+                start = _scheme_start(data, at)
+                if start < 0:
+                    continue
+                match = _SOCIAL_TAIL.match(data, at + 3)
+                if match is None or profiles[match.lastgroup] is not None:
+                    continue
+                profiles[match.lastgroup] = data[start : match.end()].decode(
+                    self.codec, errors="replace"
+                )
+                self._missing -= 1
+
+def scan_contacts(data: bytes, encoding: Optional[str] = None) -> ContactInfo:
+    """
+    Extract emails and the first profile link for each social network from
+    raw page bytes in a single pass.
+
+    Produces the same result as ``_extract_emails`` plus
+    ``_extract_social_links`` in ``contact_finder`` on the page decoded as
+    UTF-8, without decoding it first; only the matched fragments are decoded.
+    """
+    return ContactScanner(encoding).result(data)
@@ -1,33 +1,20 @@
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 
 from extractors.utils_format import BusinessRecord, make_basic_record
 
+DEFAULT_BACKEND = "lxml"
+
 def _text_or_none(element) -> Optional[str]:
     if element is None:
         return None
     text = element.get_text(strip=True)
     return text or None
 
-def parse_maps_results(html: str) -> List[BusinessRecord]:
-    """
-    Parse business results from a Google Maps / local search HTML page.
-
-    This implementation is intentionally conservative and does not depend on
-    brittle class names from Google. It instead expects a generic structure
-    that can be reproduced in tests and adapted for real scraping:
-
-        <div class="business-result">
-            <div class="business-name">Name</div>
-            <div class="business-address">Address</div>
-            <div class="business-phone">+1 000-000-0000</div>
-            <a class="business-website" href="https://example.com">Website</a>
-        </div>
-
-    For real-world usage, you may need to adjust the selectors to match the
-    actual HTML structure Google returns in your environment.
-    """
+def _parse_bs4(html: str) -> List[BusinessRecord]:
+    """Reference implementation; the other backends must match its output."""
     soup = BeautifulSoup(html, "lxml")
 
     results: List[BusinessRecord] = []
@@ -67,4 +54,141 @@ def parse_maps_results(html: str) -> List[BusinessRecord]:
         )
         results.append(record)
 
-    return results
\ No newline at end of file
+    return results
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Compiled once; each mirrors one CSS selector of the BS4 implementation.
+_XP_RESULTS = etree.XPath(f"//*[{_has_class('business-result')}]")
+_XP_FALLBACK_RESULTS = etree.XPath("//*[@data-result-type='business']")
+_XP_NAME = etree.XPath(f"(.//*[{_has_class('business-name')}])[1]")
+_XP_ARIA_LINK = etree.XPath("(.//a[@aria-label])[1]")
+_XP_STRONG = etree.XPath("(.//strong)[1]")
+_XP_ADDRESS = etree.XPath(f"(.//*[{_has_class('business-address')}])[1]")
+_XP_PHONE = etree.XPath(f"(.//*[{_has_class('business-phone')}])[1]")
+_XP_WEBSITE = etree.XPath(f"(.//a[{_has_class('business-website')}])[1]")
+# ``get_text`` skips comments and script/style/template contents; so does this.
+_XP_TEXT = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+)
+
+def _first(xpath: etree.XPath, node) -> Optional[etree._Element]:
+    found = xpath(node)
+    return found[0] if found else None
+
+def _lxml_text(element) -> Optional[str]:
+    if element is None:
+        return None
+    text = "".join(s.strip() for s in _XP_TEXT(element))
+    return text or None
+
+def _parse_lxml(html: str) -> List[BusinessRecord]:
+    """Precompiled XPath over a bare lxml tree; no BeautifulSoup objects."""
+    if not html.strip():
+        return []
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    try:
+        root = lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+    except etree.ParserError:
+        # e.g. only a comment: lxml reports "Document is empty".
+        return []
+
+    business_nodes = _XP_RESULTS(root) or _XP_FALLBACK_RESULTS(root)
+
+    results: List[BusinessRecord] = []
+    for node in business_nodes:
+        name_el = _first(_XP_NAME, node)
+        if name_el is None:
+            name_el = _first(_XP_ARIA_LINK, node)
+            if name_el is None:
+                name_el = _first(_XP_STRONG, node)
+
+        name = _lxml_text(name_el)
+        if not name:
+            continue
+
+        website_el = _first(_XP_WEBSITE, node)
+        results.append(
+            make_basic_record(
+                name=name,
+                address=_lxml_text(_first(_XP_ADDRESS, node)),
+                website=website_el.get("href") if website_el is not None else None,
+                phone=_lxml_text(_first(_XP_PHONE, node)),
+            )
+        )
+    return results
+
+def _selectolax_text(element) -> Optional[str]:
+    if element is None:
+        return None
+    text = element.text(strip=True)
+    return text or None
+
+def _parse_selectolax(html: str) -> List[BusinessRecord]:
+    """Lexbor-based CSS engine; requires the optional ``selectolax`` package."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    # Matches ``get_text``, which leaves these out of the extracted text.
+    tree.strip_tags(["script", "style", "template"])
+    business_nodes = tree.css(".business-result") or tree.css('[data-result-type="business"]')
+
+    results: List[BusinessRecord] = []
+    for node in business_nodes:
+        name_el = (
+            node.css_first(".business-name")
+            or node.css_first("a[aria-label]")
+            or node.css_first("strong")
+        )
+        name = _selectolax_text(name_el)
+        if not name:
+            continue
+
+        website_el = node.css_first("a.business-website")
+        results.append(
+            make_basic_record(
+                name=name,
+                address=_selectolax_text(node.css_first(".business-address")),
+                website=website_el.attributes.get("href") if website_el is not None else None,
+                phone=_selectolax_text(node.css_first(".business-phone")),
+            )
+        )
+    return results
+
+PARSER_BACKENDS: Dict[str, Callable[[str], List[BusinessRecord]]] = {
+    "bs4": _parse_bs4,
+    "lxml": _parse_lxml,
+    "selectolax": _parse_selectolax,
+}
+
+def parse_maps_results(html: str, backend: Optional[str] = None) -> List[BusinessRecord]:
+    """
+    Parse business results from a Google Maps / local search HTML page.
+
+    This implementation is intentionally conservative and does not depend on
+    brittle class names from Google. It instead expects a generic structure
+    that can be reproduced in tests and adapted for real scraping:
+
+        <div class="business-result">
+            <div class="business-name">Name</div>
+            <div class="business-address">Address</div>
+            <div class="business-phone">+1 000-000-0000</div>
+            <a class="business-website" href="https://example.com">Website</a>
+        </div>
+
+    For real-world usage, you may need to adjust the selectors to match the
+    actual HTML structure Google returns in your environment.
+
+    ``backend`` picks one of ``PARSER_BACKENDS``: ``lxml`` (default,
+    precompiled XPath), ``selectolax`` or the original ``bs4``. All three
+    return the same records.
+    """
+    name = backend or DEFAULT_BACKEND
+    try:
+        parse = PARSER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown parser backend {name!r}; choose one of: {', '.join(PARSER_BACKENDS)}"
+        ) from None
+    return parse(html)
@@ -1,8 +1,27 @@
-from dataclasses import asdict, dataclass
-from typing import Dict, Iterable, List, Optional
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+RECORD_FIELDS = (
+    "business_name",
+    "business_address",
+    "website",
+    "phone",
+    "emails",
+    "facebook",
+    "instagram",
+    "twitter",
+    "linkedin",
+    "tiktok",
+    "youtube",
+)
 
 @dataclass(frozen=True)
 class BusinessRecord:
+    # Slotted: no per-instance __dict__, which matters at millions of records.
+    __slots__ = RECORD_FIELDS
+
     business_name: str
     business_address: Optional[str]
     website: Optional[str]
@@ -15,6 +34,22 @@ class BusinessRecord:
     tiktok: Optional[str]
     youtube: Optional[str]
 
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Frozen slotted instances cannot be restored attribute by attribute.
+        return (BusinessRecord, tuple(getattr(self, name) for name in RECORD_FIELDS))
+
+@dataclass(frozen=True)
+class ContactInfo:
+    """Contact details extracted from a business website."""
+
+    emails: List[str] = field(default_factory=list)
+    facebook: Optional[str] = None
+    instagram: Optional[str] = None
+    twitter: Optional[str] = None
+    linkedin: Optional[str] = None
+    tiktok: Optional[str] = None
+    youtube: Optional[str] = None
+
 def make_basic_record(
     name: str,
     address: Optional[str] = None,
@@ -48,21 +83,145 @@ def dedupe_emails(emails: Iterable[str]) -> List[str]:
             out.append(norm)
     return out
 
+def merge_business_records(base: BusinessRecord, other: BusinessRecord) -> BusinessRecord:
+    """
+    Combine two sightings of the same business: ``base`` wins where both
+    have a value, ``other`` fills the gaps and emails are unioned.
+    """
+    return BusinessRecord(
+        business_name=base.business_name,
+        business_address=base.business_address or other.business_address,
+        website=base.website or other.website,
+        phone=base.phone or other.phone,
+        emails=dedupe_emails(list(base.emails) + list(other.emails)),
+        facebook=base.facebook or other.facebook,
+        instagram=base.instagram or other.instagram,
+        twitter=base.twitter or other.twitter,
+        linkedin=base.linkedin or other.linkedin,
+        tiktok=base.tiktok or other.tiktok,
+        youtube=base.youtube or other.youtube,
+    )
+
+def normalize_website_origin(url: Optional[str]) -> Optional[str]:
+    """
+    Reduce a website URL to a scheme-less origin key such as ``example.com``
+    or ``example.com:8080``, so http/https and www/apex variants of the same
+    site share one key.
+    """
+    if not url:
+        return None
+    candidate = url.strip()
+    if "://" not in candidate:
+        candidate = "http://" + candidate
+    try:
+        parts = urlsplit(candidate)
+        host = (parts.hostname or "").lower().rstrip(".")
+        port = parts.port
+    except ValueError:
+        return None
+    if not host:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        return f"{host}:{port}"
+    return host
+
+def normalize_website_key(url: Optional[str]) -> Optional[str]:
+    """
+    Key for the page a website URL points at: its origin (see
+    ``normalize_website_origin``) plus path and query, so businesses on a
+    shared host such as ``facebook.com/<page>`` or ``sites.google.com/<site>``
+    stay apart. The trailing slash, fragment and ``utm_*`` tracking
+    parameters are dropped.
+    """
+    origin = normalize_website_origin(url)
+    if origin is None:
+        return None
+    candidate = url.strip() if url else ""
+    if "://" not in candidate:
+        candidate = "http://" + candidate
+    parts = urlsplit(candidate)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_")
+    )
+    key = origin + parts.path.rstrip("/")
+    return f"{key}?{urlencode(query)}" if query else key
+
+def dump_record(record: BusinessRecord) -> str:
+    """Serialize a record to compact JSON for the on-disk stores."""
+    data = {name: getattr(record, name) for name in RECORD_FIELDS}
+    return json.dumps(data, separators=(",", ":"))
+
+def load_record(data: str) -> BusinessRecord:
+    return BusinessRecord(**json.loads(data))
+
 def record_to_dict(record: BusinessRecord) -> Dict[str, object]:
     """
     Convert a BusinessRecord into the JSON-friendly schema used in the README.
     """
-    data = asdict(record)
     return {
-        "Business Name": data["business_name"],
-        "Business Address": data["business_address"] or "N/A",
-        "Website": data["website"] or "N/A",
-        "Phone": data["phone"] or "N/A",
-        "Emails": data["emails"] or "N/A",
-        "Facebook": data["facebook"] or "N/A",
-        "Instagram": data["instagram"] or "N/A",
-        "Twitter": data["twitter"] or "N/A",
-        "LinkedIn": data["linkedin"] or "N/A",
-        "TikTok": data["tiktok"] or "N/A",
-        "YouTube": data["youtube"] or "N/A",
-    }
\ No newline at end of file
+        "Business Name": record.business_name,
+        "Business Address": record.business_address or "N/A",
+        "Website": record.website or "N/A",
+        "Phone": record.phone or "N/A",
+        "Emails": record.emails or "N/A",
+        "Facebook": record.facebook or "N/A",
+        "Instagram": record.instagram or "N/A",
+        "Twitter": record.twitter or "N/A",
+        "LinkedIn": record.linkedin or "N/A",
+        "TikTok": record.tiktok or "N/A",
+        "YouTube": record.youtube or "N/A",
+    }
+
+def record_to_row(record: BusinessRecord) -> Tuple[object, ...]:
+    """``record_to_dict`` values as a tuple in export column order, without the dict."""
+    return (
+        record.business_name,
+        record.business_address or "N/A",
+        record.website or "N/A",
+        record.phone or "N/A",
+        record.emails or "N/A",
+        record.facebook or "N/A",
+        record.instagram or "N/A",
+        record.twitter or "N/A",
+        record.linkedin or "N/A",
+        record.tiktok or "N/A",
+        record.youtube or "N/A",
+    )
+
+class RecordBatch:
+    """
+    Columnar container for large result sets: one list per field instead of
+    one object per record. Iterating yields ``BusinessRecord`` instances on
+    demand; ``columns`` exposes the raw field lists, e.g. for columnar
+    exporters.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, records: Iterable[BusinessRecord] = ()):
+        self.columns: Dict[str, List[Any]] = {name: [] for name in RECORD_FIELDS}
+        self.extend(records)
+
+    def append(self, record: BusinessRecord) -> None:
+        for name, column in self.columns.items():
+            column.append(getattr(record, name))
+
+    def extend(self, records: Iterable[BusinessRecord]) -> None:
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.columns["business_name"])
+
+    def __iter__(self) -> Iterator[BusinessRecord]:
+        for values in zip(*self.columns.values()):
+            yield BusinessRecord(*values)
+
+    def rows(self) -> Iterator[Tuple[object, ...]]:
+        """Export rows, as ``record_to_row`` would produce for each record."""
+        for name, *values in zip(*self.columns.values()):
+            yield (name, *(value or "N/A" for value in values))
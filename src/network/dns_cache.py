@@ -0,0 +1,165 @@
+import concurrent.futures
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+LOGGER = logging.getLogger("gmaps_scraper.dns_cache")
+
+AddrInfo = Tuple[int, int, int, str, tuple]
+Resolver = Callable[[str, int], List[AddrInfo]]
+
+_original_getaddrinfo = socket.getaddrinfo
+
+def system_resolver(host: str, port: int) -> List[AddrInfo]:
+    return _original_getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+def is_ip_literal(host: str) -> bool:
+    """True for an IPv4 or (bracketed) IPv6 address, which needs no lookup."""
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+class DnsCache:
+    """
+    Resolver cache with concurrent pre-resolution.
+
+    ``prefetch`` resolves a batch of hosts in parallel before any fetch
+    starts, so DNS latency overlaps instead of stalling each worker in turn.
+    Answers are kept for ``ttl`` seconds and failures for ``negative_ttl``.
+    While ``install``-ed, ``socket.getaddrinfo`` is served from the cache,
+    which covers both requests/urllib3 and httpx.
+
+    ``resolver`` defaults to the system resolver; tests pass a stub.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Resolver] = None,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        max_workers: int = 32,
+    ):
+        self.resolver = resolver or system_resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._answers: Dict[str, Tuple[float, Optional[List[AddrInfo]]]] = {}
+        self._lock = threading.Lock()
+        self._installed = False
+
+    def _cached(self, host: str) -> Tuple[bool, Optional[List[AddrInfo]]]:
+        with self._lock:
+            entry = self._answers.get(host)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entry[1]
+
+    def resolve(self, host: str, port: int = 443) -> Optional[List[AddrInfo]]:
+        """Return addresses for ``host`` or ``None`` if it does not resolve."""
+        host = host.lower()
+        found, answer = self._cached(host)
+        if found:
+            return answer
+        try:
+            answer = self.resolver(host, port)
+        except (socket.gaierror, UnicodeError, OSError) as exc:
+            LOGGER.debug("Could not resolve %s: %s", host, exc)
+            answer = None
+        ttl = self.ttl if answer else self.negative_ttl
+        with self._lock:
+            self._answers[host] = (time.monotonic() + ttl, answer or None)
+        return answer or None
+
+    def prefetch(self, hosts: Iterable[str]) -> Dict[str, bool]:
+        """Resolve every distinct host concurrently; map host -> resolvable."""
+        unique = sorted({h.lower() for h in hosts if h and not is_ip_literal(h)})
+        if not unique:
+            return {}
+        workers = max(1, min(self.max_workers, len(unique)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            answers = dict(zip(unique, pool.map(self.resolve, unique)))
+        failed = [host for host, answer in answers.items() if not answer]
+        LOGGER.info(
+            "Pre-resolved %d hosts (%d failed to resolve)",
+            len(unique),
+            len(failed),
+        )
+        return {host: bool(answer) for host, answer in answers.items()}
+
+    def getaddrinfo(
+        self,
+        host: Any,
+        port: Any,
+        family: int = 0,
+        type: int = 0,
+        proto: int = 0,
+        flags: int = 0,
+    ) -> List[AddrInfo]:
+        """Drop-in replacement for ``socket.getaddrinfo`` backed by the cache."""
+        if not isinstance(host, str) or not host or is_ip_literal(host):
+            return _original_getaddrinfo(host, port, family, type, proto, flags)
+        try:
+            port_number = int(port or 0)
+        except (TypeError, ValueError):
+            return _original_getaddrinfo(host, port, family, type, proto, flags)
+
+        answer = self.resolve(host, port_number)
+        if not answer:
+            raise socket.gaierror(socket.EAI_NONAME, f"Name or service not known: {host}")
+
+        results: List[AddrInfo] = []
+        for fam, _, _, canonname, sockaddr in answer:
+            if family not in (0, socket.AF_UNSPEC) and fam != family:
+                continue
+            results.append(
+                (
+                    fam,
+                    type or socket.SOCK_STREAM,
+                    proto,
+                    canonname,
+                    (sockaddr[0], port_number) + tuple(sockaddr[2:]),
+                )
+            )
+        if not results:
+            raise socket.gaierror(socket.EAI_FAMILY, f"No address of requested family for {host}")
+        return results
+
+    def install(self) -> None:
+        socket.getaddrinfo = self.getaddrinfo  # type: ignore[assignment]
+        self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            socket.getaddrinfo = _original_getaddrinfo
+            self._installed = False
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "hosts": len(self._answers)}
+
+    def __enter__(self) -> "DnsCache":
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+
+def build_dns_cache(settings: Dict[str, Any]) -> Optional[DnsCache]:
+    config = settings.get("dns") or {}
+    # Opt-in: a host that fails its one up-front lookup is not fetched at
+    # all, where a plain fetch would have resolved it again.
+    if not config.get("enabled", False):
+        return None
+    return DnsCache(
+        ttl=float(config.get("ttl_seconds", 300)),
+        negative_ttl=float(config.get("negative_ttl_seconds", 60)),
+        max_workers=int(config.get("prefetch_workers", 32)),
+    )
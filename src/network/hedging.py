@@ -0,0 +1,224 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+from monitoring.metrics import get_metrics
+from network.dns_cache import is_ip_literal
+from network.http_client import FetchCancelled
+
+LOGGER = logging.getLogger("gmaps_scraper.hedging")
+
+T = TypeVar("T")
+
+def url_variants(url: str) -> List[str]:
+    """
+    ``url`` followed by other spellings of the same site: the other scheme
+    (http/https), then the www / apex twin of its host.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return [url]
+    host = parts.hostname or ""
+    variants = [url]
+    if parts.scheme in ("http", "https"):
+        other = "http" if parts.scheme == "https" else "https"
+        variants.append(urlunsplit(parts._replace(scheme=other)))
+    if "." in host and not is_ip_literal(host):
+        twin = host[len("www."):] if host.startswith("www.") else "www." + host
+        netloc = twin if port is None else f"{twin}:{port}"
+        variants.append(urlunsplit(parts._replace(netloc=netloc)))
+    return variants
+
+class FetchAttempt:
+    """
+    One request of a (possibly hedged) fetch.
+
+    ``watch`` wraps the download's ``on_chunk`` callback so the first body
+    chunk marks the attempt as ``responded`` and, once ``cancelled`` (or the
+    caller's own ``outer`` event) is set, the next chunk abandons it.
+    """
+
+    def __init__(self, url: str, outer: Optional[threading.Event] = None):
+        self.url = url
+        self.responded = threading.Event()
+        self.cancelled = threading.Event()
+        self.outer = outer
+
+    def watch(
+        self,
+        on_chunk: Optional[Callable[[bytes], bool]] = None,
+    ) -> Callable[[bytes], bool]:
+        def watched(chunk: bytes) -> bool:
+            self.responded.set()
+            if self.cancelled.is_set() or (self.outer is not None and self.outer.is_set()):
+                raise FetchCancelled(self.url)
+            return bool(on_chunk(chunk)) if on_chunk is not None else False
+
+        return watched
+
+class Hedger:
+    """
+    Races a website fetch that is slow to respond against other URL variants
+    of the same site (see ``url_variants``).
+
+    When no attempt has received a byte ``delay_seconds`` after the last one
+    started, the next variant is launched; when every running attempt has
+    failed, it is launched at once. The first attempt to return a result
+    wins and the rest are cancelled. At most ``max_variants`` alternates are
+    tried per fetch.
+
+    ``run`` serves threaded callers from a private pool of ``max_workers``
+    threads; ``run_async`` races tasks on the caller's event loop.
+    """
+
+    def __init__(
+        self,
+        delay_seconds: float = 1.0,
+        max_variants: int = 2,
+        max_workers: int = 32,
+    ):
+        self.delay_seconds = delay_seconds
+        self.max_variants = max_variants
+        self.max_workers = max_workers
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def variants(self, url: str) -> List[str]:
+        return url_variants(url)[: 1 + self.max_variants]
+
+    def _next_wait(self, urls: List[str], running: Dict[Any, FetchAttempt]) -> Optional[float]:
+        """How long to wait before hedging again; None to wait for a result."""
+        if not urls or any(attempt.responded.is_set() for attempt in running.values()):
+            return None
+        return self.delay_seconds
+
+    def _executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="hedge",
+                )
+            return self._pool
+
+    def run(
+        self,
+        url: str,
+        attempt: Callable[[FetchAttempt], Optional[T]],
+        cancelled: Optional[threading.Event] = None,
+    ) -> Optional[T]:
+        """
+        Return the first non-None result of ``attempt`` over ``url``'s
+        variants, or None when all of them fail. Setting ``cancelled``
+        abandons every attempt at its next chunk.
+        """
+        metrics = get_metrics()
+        pool = self._executor()
+        urls = self.variants(url)
+        running: Dict["concurrent.futures.Future[Optional[T]]", FetchAttempt] = {}
+
+        def launch() -> None:
+            fetch = FetchAttempt(urls.pop(0), cancelled)
+            running[pool.submit(attempt, fetch)] = fetch
+
+        launch()
+        try:
+            while running:
+                done, _ = concurrent.futures.wait(
+                    running,
+                    timeout=self._next_wait(urls, running),
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                if not done:
+                    metrics.inc("hedged_requests_total", outcome="launched")
+                    launch()
+                    continue
+                for future in done:
+                    fetch = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:  # pragma: no cover - defensive logging
+                        LOGGER.debug("Attempt on %s failed: %s", fetch.url, exc)
+                        result = None
+                    if result is not None:
+                        if fetch.url != url:
+                            metrics.inc("hedged_requests_total", outcome="won")
+                        return result
+                if not running and urls and not (cancelled is not None and cancelled.is_set()):
+                    metrics.inc("hedged_requests_total", outcome="fallback")
+                    launch()
+            return None
+        finally:
+            for fetch in running.values():
+                fetch.cancelled.set()
+
+    async def run_async(
+        self,
+        url: str,
+        attempt: Callable[[FetchAttempt], Awaitable[Optional[T]]],
+    ) -> Optional[T]:
+        """Event-loop counterpart of ``run``; losing attempts are cancelled tasks."""
+        metrics = get_metrics()
+        urls = self.variants(url)
+        running: Dict["asyncio.Future[Optional[T]]", FetchAttempt] = {}
+
+        def launch() -> None:
+            fetch = FetchAttempt(urls.pop(0))
+            running[asyncio.ensure_future(attempt(fetch))] = fetch
+
+        launch()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self._next_wait(urls, running),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    metrics.inc("hedged_requests_total", outcome="launched")
+                    launch()
+                    continue
+                for task in done:
+                    fetch = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as exc:  # pragma: no cover - defensive logging
+                        LOGGER.debug("Attempt on %s failed: %s", fetch.url, exc)
+                        result = None
+                    if result is not None:
+                        if fetch.url != url:
+                            metrics.inc("hedged_requests_total", outcome="won")
+                        return result
+                if not running and urls:
+                    metrics.inc("hedged_requests_total", outcome="fallback")
+                    launch()
+            return None
+        finally:
+            for task in running:
+                task.cancel()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            # Attempts still running give up at their next chunk or timeout.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def build_hedger(settings: Dict[str, Any]) -> Optional[Hedger]:
+    config = settings.get("hedging") or {}
+    if not config.get("enabled", False):
+        return None
+    max_variants = int(config.get("max_variants", 2))
+    # Callers block while their attempts run here, so every fetch slot may
+    # need one thread per variant.
+    fetch_slots = int((settings.get("scheduler") or {}).get("global_max_inflight", 32))
+    return Hedger(
+        delay_seconds=float(config.get("delay_seconds", 1.0)),
+        max_variants=max_variants,
+        max_workers=max(fetch_slots, int(settings.get("max_workers", 5))) * (1 + max_variants),
+    )
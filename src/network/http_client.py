@@ -0,0 +1,726 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from monitoring.metrics import get_metrics
+from network.rate_limit import HostRateLimiter, host_of
+from network.resilience import HostUnavailableError, ResiliencePolicy, classify_failure
+
+if TYPE_CHECKING:  # pragma: no cover
+    from network.response_cache import ResponseCache
+
+LOGGER = logging.getLogger("gmaps_scraper.http_client")
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; BitbashScraper/1.0; +https://bitbash.dev)"
+
+def _accept_encoding() -> str:
+    # urllib3 and httpx only decode brotli when a brotli package is importable.
+    try:
+        import brotli  # type: ignore  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # type: ignore  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+class HttpError(Exception):
+    """Raised by ``HttpResponse.raise_for_status`` for 4xx/5xx responses."""
+
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.url = url
+        self.status_code = status_code
+
+class UnsupportedContentError(Exception):
+    """Raised when a response's Content-Type is not in the allowed list."""
+
+    def __init__(self, url: str, content_type: str):
+        super().__init__(f"Skipped {url}: unsupported content type {content_type!r}")
+        self.url = url
+        self.content_type = content_type
+
+class FetchCancelled(Exception):
+    """Raised from an ``on_chunk`` callback to abandon a download midway."""
+
+    def __init__(self, url: str):
+        super().__init__(f"Cancelled download of {url}")
+        self.url = url
+
+@dataclass(frozen=True)
+class HttpResponse:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str] = None
+    from_cache: bool = False
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HttpError(self.url, self.status_code)
+
+def _lower_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+    return {k.lower(): v for k, v in headers.items()}
+
+@dataclass(frozen=True)
+class DownloadLimits:
+    """
+    Guards applied to business website downloads.
+
+    ``max_bytes`` caps how much of a body is read; ``allowed_content_types``
+    (prefix match, empty = anything) is checked before the body is read; with
+    ``stop_when_complete`` the download ends as soon as the ``on_chunk``
+    callback reports that it has everything it needs. That is off by
+    default: the contact scanner is satisfied by one email and every
+    profile, so emails further down the page would be lost.
+    """
+
+    max_bytes: Optional[int] = None
+    allowed_content_types: Tuple[str, ...] = ()
+    stop_when_complete: bool = False
+    chunk_size: int = 64 * 1024
+
+class TransferStats:
+    """Thread-safe counters describing how much body data a client read or skipped."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.truncated = 0
+        self.skipped = 0
+
+    def record(
+        self,
+        downloaded: int,
+        content_length: Optional[int],
+        truncated: bool = False,
+        skipped: bool = False,
+    ) -> None:
+        saved = 0
+        if (truncated or skipped) and content_length is not None:
+            saved = max(0, content_length - downloaded)
+        with self._lock:
+            self.bytes_downloaded += downloaded
+            self.bytes_saved += saved
+            self.truncated += int(truncated)
+            self.skipped += int(skipped)
+        metrics = get_metrics()
+        if metrics.enabled:
+            metrics.inc("http_bytes_downloaded_total", downloaded)
+            metrics.inc("http_bytes_saved_total", saved)
+            if truncated:
+                metrics.inc("http_downloads_truncated_total")
+            if skipped:
+                metrics.inc("http_downloads_skipped_total")
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "bytes_downloaded": self.bytes_downloaded,
+                "bytes_saved": self.bytes_saved,
+                "truncated": self.truncated,
+                "skipped": self.skipped,
+            }
+
+def _observe_fetch(
+    url: str,
+    started: float,
+    status_code: Optional[int] = None,
+    exc: Optional[BaseException] = None,
+) -> None:
+    """Report one network attempt: latency per host plus its status or error class."""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+    host = host_of(url)
+    metrics.observe("http_request_seconds", time.perf_counter() - started, host=host)
+    if exc is None:
+        metrics.inc("http_responses_total", host=host, status=status_code)
+    else:
+        if isinstance(exc, UnsupportedContentError):
+            error = "unsupported_content"
+        elif isinstance(exc, FetchCancelled):
+            error = "cancelled"
+        else:
+            error = classify_failure(exc) or type(exc).__name__
+        metrics.inc("http_errors_total", host=host, error=error)
+
+def _observe_cache(hit: bool) -> None:
+    get_metrics().inc("cache_lookups_total", cache="http", result="hit" if hit else "miss")
+
+def _content_length(headers: Mapping[str, str]) -> Optional[int]:
+    try:
+        return int(headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+def _check_content_type(
+    url: str,
+    headers: Mapping[str, str],
+    limits: Optional[DownloadLimits],
+) -> None:
+    if limits is None or not limits.allowed_content_types:
+        return
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type and not content_type.startswith(limits.allowed_content_types):
+        raise UnsupportedContentError(url, content_type)
+
+class _BodyReader:
+    """Accumulates streamed chunks while enforcing ``DownloadLimits``."""
+
+    def __init__(
+        self,
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ):
+        self.limits = limits
+        self.on_chunk = on_chunk
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.truncated = False
+
+    def add(self, chunk: bytes) -> bool:
+        """Store ``chunk``; return True when reading should stop."""
+        limits = self.limits
+        if limits is not None and limits.max_bytes is not None:
+            room = limits.max_bytes - self.size
+            if len(chunk) > room:
+                chunk = chunk[:room]
+                self.truncated = True
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        done = False
+        if self.on_chunk is not None and chunk:
+            done = bool(self.on_chunk(chunk))
+        if done and limits is not None and limits.stop_when_complete:
+            self.truncated = True
+        return self.truncated
+
+    def body(self) -> bytes:
+        return b"".join(self.chunks)
+
+class HttpClient:
+    """
+    Pooled, keep-alive HTTP client shared by every fetcher in a run.
+
+    Uses a ``requests.Session`` with one connection pool per host by default.
+    With ``http2=True`` the transport switches to ``httpx`` (which must be
+    installed together with ``h2``). An optional ``ResponseCache`` is
+    consulted before, and updated after, every request. Network fetches then
+    pass through the optional ``ResiliencePolicy`` (retries, circuit
+    breakers, negative cache) and ``HostRateLimiter`` (pacing), in that
+    order.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = DEFAULT_USER_AGENT,
+        timeout: int = 15,
+        pool_hosts: int = 100,
+        pool_per_host: int = 10,
+        http2: bool = False,
+        cache: Optional["ResponseCache"] = None,
+        download_limits: Optional[DownloadLimits] = None,
+        limiter: Optional[HostRateLimiter] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+    ):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.http2 = http2
+        self.cache = cache
+        self.download_limits = download_limits
+        self.limiter = limiter
+        self.resilience = resilience
+        self.stats = TransferStats()
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept-Encoding": _accept_encoding(),
+            "Connection": "keep-alive",
+        }
+
+        if http2:
+            import httpx  # optional dependency, only needed for HTTP/2
+
+            self._httpx = httpx.Client(
+                http2=True,
+                headers=self.headers,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=pool_hosts * pool_per_host,
+                    max_keepalive_connections=pool_hosts * pool_per_host,
+                ),
+            )
+            self._session = None
+        else:
+            self._httpx = None
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+            adapter = HTTPAdapter(
+                pool_connections=pool_hosts,
+                pool_maxsize=pool_per_host,
+                max_retries=0,
+            )
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+
+    def get(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        kind: str = "website",
+        on_chunk: Optional[Callable[[bytes], bool]] = None,
+    ) -> HttpResponse:
+        """
+        Fetch ``url``. Bodies are streamed; for ``kind="website"`` the
+        client's ``download_limits`` apply. ``on_chunk`` sees the body as it
+        arrives (or in one piece when served from cache) and may return True
+        to end the download early when ``stop_when_complete`` is set, or
+        raise ``FetchCancelled`` to drop it and its connection.
+        """
+        entry = None
+        if self.cache is not None:
+            cached, entry = self.cache.lookup(url)
+            _observe_cache(cached is not None)
+            if cached is not None:
+                if on_chunk is not None:
+                    on_chunk(cached.content)
+                return cached
+            headers = {**self.cache.conditional_headers(entry), **(headers or {})}
+
+        limits = self.download_limits if kind == "website" else None
+        response = self._fetch_resilient(url, kind, timeout, headers, limits, on_chunk)
+
+        if self.cache is not None:
+            response = self.cache.handle_response(url, kind, response, entry)
+        return response
+
+    def _fetch_resilient(
+        self,
+        url: str,
+        kind: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        policy = self.resilience
+        if policy is None:
+            return self._fetch_paced(url, timeout, headers, limits, on_chunk)
+
+        host = host_of(url)
+        attempt = 0
+        while True:
+            probe = policy.before_request(host, kind)
+            try:
+                response = self._fetch_paced(url, timeout, headers, limits, on_chunk)
+            except (UnsupportedContentError, HostUnavailableError, FetchCancelled):
+                if probe:
+                    policy.release_probe(host)
+                raise
+            except Exception as exc:
+                delay = policy.after_error(host, kind, exc, attempt)
+                if delay is None:
+                    raise
+                LOGGER.debug("Retrying %s in %.2fs after %s", url, delay, exc)
+            except BaseException:
+                # Cancelled (or interrupted) mid-request: there is no outcome.
+                if probe:
+                    policy.release_probe(host)
+                raise
+            else:
+                delay = policy.after_response(host, response.status_code, attempt)
+                if delay is None:
+                    return response
+                LOGGER.debug("Retrying %s in %.2fs after HTTP %s", url, delay, response.status_code)
+            attempt += 1
+            time.sleep(delay)
+
+    def _fetch_paced(
+        self,
+        url: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        if self.limiter is None:
+            return self._fetch(url, timeout, headers, limits, on_chunk)
+
+        host = host_of(url)
+        self.limiter.acquire(host)
+        started = time.monotonic()
+        status_code: Optional[int] = None
+        retry_after: Optional[str] = None
+        try:
+            response = self._fetch(url, timeout, headers, limits, on_chunk)
+            status_code = response.status_code
+            retry_after = response.headers.get("retry-after")
+        except (UnsupportedContentError, FetchCancelled):
+            status_code = 200  # the host answered fine; we just did not read the body
+            raise
+        finally:
+            self.limiter.release(host, status_code, time.monotonic() - started, retry_after)
+        return response
+
+    def _fetch(
+        self,
+        url: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        started = time.perf_counter()
+        try:
+            response = self._transfer(url, timeout, headers, limits, on_chunk)
+        except Exception as exc:
+            _observe_fetch(url, started, exc=exc)
+            raise
+        _observe_fetch(url, started, response.status_code)
+        return response
+
+    def _transfer(
+        self,
+        url: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        timeout = self.timeout if timeout is None else timeout
+        reader = _BodyReader(limits, on_chunk)
+        chunk_size = limits.chunk_size if limits is not None else 64 * 1024
+
+        if self._httpx is not None:
+            with self._httpx.stream("GET", url, timeout=timeout, headers=headers) as resp:
+                lowered = _lower_headers(resp.headers)
+                try:
+                    if resp.status_code < 300:
+                        _check_content_type(url, lowered, limits)
+                except UnsupportedContentError:
+                    self.stats.record(0, _content_length(lowered), skipped=True)
+                    raise
+                for chunk in resp.iter_bytes(chunk_size):
+                    if reader.add(chunk):
+                        break
+                downloaded = resp.num_bytes_downloaded
+                final_url = str(resp.url)
+                encoding = resp.charset_encoding
+                status_code = resp.status_code
+        else:
+            assert self._session is not None
+            resp = self._session.get(url, timeout=timeout, headers=headers, stream=True)
+            try:
+                lowered = _lower_headers(resp.headers)
+                try:
+                    if resp.status_code < 300:
+                        _check_content_type(url, lowered, limits)
+                except UnsupportedContentError:
+                    self.stats.record(0, _content_length(lowered), skipped=True)
+                    raise
+                for chunk in resp.iter_content(chunk_size):
+                    if reader.add(chunk):
+                        break
+                downloaded = resp.raw.tell()
+                final_url = resp.url
+                encoding = requests.utils.get_encoding_from_headers(resp.headers)
+                status_code = resp.status_code
+            finally:
+                resp.close()
+
+        self.stats.record(downloaded, _content_length(lowered), truncated=reader.truncated)
+        return HttpResponse(
+            url=final_url,
+            status_code=status_code,
+            headers=lowered,
+            content=reader.body(),
+            encoding=encoding,
+            truncated=reader.truncated,
+        )
+
+    def close(self) -> None:
+        if self._httpx is not None:
+            self._httpx.close()
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class AsyncHttpClient:
+    """
+    Event-loop counterpart of ``HttpClient`` built on ``httpx.AsyncClient``.
+
+    An instance is bound to the loop it is first used on, so the async engine
+    creates one per ``asyncio.run`` call.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = DEFAULT_USER_AGENT,
+        timeout: int = 15,
+        max_connections: int = 100,
+        http2: bool = False,
+        cache: Optional["ResponseCache"] = None,
+        download_limits: Optional[DownloadLimits] = None,
+        stats: Optional[TransferStats] = None,
+        limiter: Optional[HostRateLimiter] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+    ):
+        import httpx  # imported lazily so the threaded engine does not need it
+
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.cache = cache
+        self.download_limits = download_limits
+        self.limiter = limiter
+        self.resilience = resilience
+        self.stats = stats or TransferStats()
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept-Encoding": _accept_encoding(),
+        }
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            headers=self.headers,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def get(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        kind: str = "website",
+        on_chunk: Optional[Callable[[bytes], bool]] = None,
+    ) -> HttpResponse:
+        entry = None
+        if self.cache is not None:
+            cached, entry = self.cache.lookup(url)
+            _observe_cache(cached is not None)
+            if cached is not None:
+                if on_chunk is not None:
+                    on_chunk(cached.content)
+                return cached
+            headers = {**self.cache.conditional_headers(entry), **(headers or {})}
+
+        limits = self.download_limits if kind == "website" else None
+        response = await self._fetch_resilient(url, kind, timeout, headers, limits, on_chunk)
+
+        if self.cache is not None:
+            response = self.cache.handle_response(url, kind, response, entry)
+        return response
+
+    async def _fetch_resilient(
+        self,
+        url: str,
+        kind: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        policy = self.resilience
+        if policy is None:
+            return await self._fetch_paced(url, timeout, headers, limits, on_chunk)
+
+        host = host_of(url)
+        attempt = 0
+        while True:
+            probe = policy.before_request(host, kind)
+            try:
+                response = await self._fetch_paced(url, timeout, headers, limits, on_chunk)
+            except (UnsupportedContentError, HostUnavailableError, FetchCancelled):
+                if probe:
+                    policy.release_probe(host)
+                raise
+            except Exception as exc:
+                delay = policy.after_error(host, kind, exc, attempt)
+                if delay is None:
+                    raise
+                LOGGER.debug("Retrying %s in %.2fs after %s", url, delay, exc)
+            except BaseException:
+                # Cancelled (or interrupted) mid-request: there is no outcome.
+                if probe:
+                    policy.release_probe(host)
+                raise
+            else:
+                delay = policy.after_response(host, response.status_code, attempt)
+                if delay is None:
+                    return response
+                LOGGER.debug("Retrying %s in %.2fs after HTTP %s", url, delay, response.status_code)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _fetch_paced(
+        self,
+        url: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        if self.limiter is None:
+            return await self._fetch(url, timeout, headers, limits, on_chunk)
+
+        host = host_of(url)
+        await self.limiter.acquire_async(host)
+        started = time.monotonic()
+        status_code: Optional[int] = None
+        retry_after: Optional[str] = None
+        try:
+            response = await self._fetch(url, timeout, headers, limits, on_chunk)
+            status_code = response.status_code
+            retry_after = response.headers.get("retry-after")
+        except (UnsupportedContentError, FetchCancelled):
+            status_code = 200  # the host answered fine; we just did not read the body
+            raise
+        finally:
+            self.limiter.release(host, status_code, time.monotonic() - started, retry_after)
+        return response
+
+    async def _fetch(
+        self,
+        url: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        started = time.perf_counter()
+        try:
+            response = await self._transfer(url, timeout, headers, limits, on_chunk)
+        except Exception as exc:
+            _observe_fetch(url, started, exc=exc)
+            raise
+        _observe_fetch(url, started, response.status_code)
+        return response
+
+    async def _transfer(
+        self,
+        url: str,
+        timeout: Optional[float],
+        headers: Optional[Mapping[str, str]],
+        limits: Optional[DownloadLimits],
+        on_chunk: Optional[Callable[[bytes], bool]],
+    ) -> HttpResponse:
+        timeout = self.timeout if timeout is None else timeout
+        reader = _BodyReader(limits, on_chunk)
+        chunk_size = limits.chunk_size if limits is not None else 64 * 1024
+
+        async with self._client.stream("GET", url, timeout=timeout, headers=headers) as resp:
+            lowered = _lower_headers(resp.headers)
+            try:
+                if resp.status_code < 300:
+                    _check_content_type(url, lowered, limits)
+            except UnsupportedContentError:
+                self.stats.record(0, _content_length(lowered), skipped=True)
+                raise
+            async for chunk in resp.aiter_bytes(chunk_size):
+                if reader.add(chunk):
+                    break
+            downloaded = resp.num_bytes_downloaded
+
+        self.stats.record(downloaded, _content_length(lowered), truncated=reader.truncated)
+        return HttpResponse(
+            url=str(resp.url),
+            status_code=resp.status_code,
+            headers=lowered,
+            content=reader.body(),
+            encoding=resp.charset_encoding,
+            truncated=reader.truncated,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+def build_download_limits(settings: Dict[str, Any]) -> DownloadLimits:
+    config = settings.get("download") or {}
+    max_kb = config.get("max_kb", 2048)
+    return DownloadLimits(
+        max_bytes=int(max_kb) * 1024 if max_kb else None,
+        allowed_content_types=tuple(
+            t.lower() for t in config.get("allowed_content_types", ["text/", "application/xhtml"])
+        ),
+        stop_when_complete=bool(config.get("stop_when_complete", False)),
+        chunk_size=int(config.get("chunk_kb", 64)) * 1024,
+    )
+
+def build_http_client(
+    settings: Dict[str, Any],
+    cache: Optional["ResponseCache"] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    resilience: Optional[ResiliencePolicy] = None,
+) -> HttpClient:
+    return HttpClient(
+        user_agent=settings.get("user_agent", DEFAULT_USER_AGENT),
+        timeout=int(settings.get("request_timeout", 15)),
+        pool_hosts=int(settings.get("http_pool_hosts", 100)),
+        pool_per_host=int(settings.get("http_pool_per_host", 10)),
+        http2=bool(settings.get("http2", False)),
+        cache=cache,
+        download_limits=build_download_limits(settings),
+        limiter=limiter,
+        resilience=resilience,
+    )
+
+def build_async_http_client(
+    settings: Dict[str, Any],
+    cache: Optional["ResponseCache"] = None,
+    stats: Optional[TransferStats] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    resilience: Optional[ResiliencePolicy] = None,
+) -> AsyncHttpClient:
+    return AsyncHttpClient(
+        user_agent=settings.get("user_agent", DEFAULT_USER_AGENT),
+        timeout=int(settings.get("request_timeout", 15)),
+        max_connections=int(settings.get("async_concurrency", 100)),
+        http2=bool(settings.get("http2", False)),
+        cache=cache,
+        download_limits=build_download_limits(settings),
+        stats=stats,
+        limiter=limiter,
+        resilience=resilience,
+    )
+
+_DEFAULT_CLIENTS: Dict[str, HttpClient] = {}
+_DEFAULT_CLIENTS_LOCK = threading.Lock()
+
+def get_default_client(user_agent: str = DEFAULT_USER_AGENT) -> HttpClient:
+    """
+    Process-wide client used when a caller does not inject one, so that even
+    ad-hoc calls reuse pooled connections.
+    """
+    with _DEFAULT_CLIENTS_LOCK:
+        client = _DEFAULT_CLIENTS.get(user_agent)
+        if client is None:
+            client = HttpClient(user_agent=user_agent)
+            _DEFAULT_CLIENTS[user_agent] = client
+        return client
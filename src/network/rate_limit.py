@@ -0,0 +1,223 @@
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+LOGGER = logging.getLogger("gmaps_scraper.rate_limit")
+
+THROTTLE_STATUSES = (429, 503)
+
+# How long a caller sleeps before re-checking a host that is at its
+# concurrency limit.
+_SLOT_POLL_SECONDS = 0.05
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    requests_per_second: float = 2.0
+    burst: int = 4
+    initial_concurrency: float = 2.0
+    min_concurrency: float = 1.0
+    max_concurrency: float = 16.0
+    increase_step: float = 1.0
+    backoff_factor: float = 0.5
+    slow_response_seconds: float = 5.0
+    max_retry_after_seconds: float = 120.0
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Return the number of seconds a ``Retry-After`` header asks us to wait."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - (time.time() if now is None else now))
+
+class HostState:
+    """
+    Token bucket plus AIMD concurrency window for one host.
+
+    The bucket paces request starts at ``requests_per_second`` with bursts of
+    up to ``burst``. The concurrency limit grows by ``increase_step / limit``
+    per successful response (about +1 per window of successes) and is
+    multiplied by ``backoff_factor`` on 429/503 or slow responses, at most
+    once per second so one burst of throttled replies counts once.
+    """
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.tokens = float(config.burst)
+        self.last_refill = time.monotonic()
+        self.limit = config.initial_concurrency
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.slow = 0
+
+    def try_acquire(self, now: float) -> float:
+        """Take a slot and a token, or return how long to wait before retrying."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= int(self.limit):
+            return _SLOT_POLL_SECONDS
+        rate = self.config.requests_per_second
+        if rate > 0:
+            self.tokens = min(
+                float(self.config.burst),
+                self.tokens + (now - self.last_refill) * rate,
+            )
+            self.last_refill = now
+            if self.tokens < 1.0:
+                return (1.0 - self.tokens) / rate
+            self.tokens -= 1.0
+        self.in_flight += 1
+        self.requests += 1
+        return 0.0
+
+    def release(
+        self,
+        now: float,
+        status_code: Optional[int],
+        latency: float,
+        retry_after: Optional[float],
+    ) -> None:
+        config = self.config
+        self.in_flight = max(0, self.in_flight - 1)
+        throttled = status_code in THROTTLE_STATUSES
+        slow = latency > config.slow_response_seconds
+        if status_code is None:
+            self.errors += 1
+        if throttled:
+            self.throttled += 1
+            if retry_after is not None:
+                self.blocked_until = max(
+                    self.blocked_until,
+                    now + min(retry_after, config.max_retry_after_seconds),
+                )
+        if slow:
+            self.slow += 1
+
+        if throttled or slow:
+            if now - self.last_decrease >= 1.0:
+                self.limit = max(config.min_concurrency, self.limit * config.backoff_factor)
+                self.last_decrease = now
+        elif status_code is not None and status_code < 400:
+            self.limit = min(
+                config.max_concurrency,
+                self.limit + config.increase_step / max(self.limit, 1.0),
+            )
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "tokens": round(self.tokens, 2),
+            "blocked_for": round(max(0.0, self.blocked_until - now), 2),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "slow": self.slow,
+            "errors": self.errors,
+        }
+
+class HostRateLimiter:
+    """
+    Per-host pacing shared by every client in a run.
+
+    ``acquire`` (or ``acquire_async``) blocks until the host has both a free
+    concurrency slot and a token; ``release`` feeds the outcome back into the
+    host's AIMD window and honours ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        config: Optional[RateLimitConfig] = None,
+        overrides: Optional[Mapping[str, RateLimitConfig]] = None,
+    ):
+        self.config = config or RateLimitConfig()
+        self.overrides = dict(overrides or {})
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(self.overrides.get(host, self.config))
+            self._hosts[host] = state
+        return state
+
+    def _try_acquire(self, host: str) -> float:
+        with self._lock:
+            return self._state(host).try_acquire(time.monotonic())
+
+    def acquire(self, host: str) -> None:
+        while True:
+            wait = self._try_acquire(host)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, host: str) -> None:
+        while True:
+            wait = self._try_acquire(host)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(
+        self,
+        host: str,
+        status_code: Optional[int],
+        latency: float,
+        retry_after: Optional[str] = None,
+    ) -> None:
+        delay = parse_retry_after(retry_after)
+        with self._lock:
+            state = self._state(host)
+            state.release(time.monotonic(), status_code, latency, delay)
+            if status_code in THROTTLE_STATUSES:
+                LOGGER.warning(
+                    "Throttled by %s (HTTP %s); concurrency limit now %.2f",
+                    host,
+                    status_code,
+                    state.limit,
+                )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current per-host limits and counters, for logging or monitoring."""
+        now = time.monotonic()
+        with self._lock:
+            return {host: state.snapshot(now) for host, state in self._hosts.items()}
+
+def _config_from(values: Mapping[str, Any], base: RateLimitConfig) -> RateLimitConfig:
+    fields = {
+        name: type(getattr(base, name))(values[name])
+        for name in RateLimitConfig.__dataclass_fields__
+        if name in values
+    }
+    return RateLimitConfig(**{**base.__dict__, **fields})
+
+def build_rate_limiter(settings: Dict[str, Any]) -> Optional[HostRateLimiter]:
+    config = settings.get("rate_limit") or {}
+    if not config.get("enabled", False):
+        return None
+    base = _config_from(config, RateLimitConfig())
+    overrides = {
+        host.lower(): _config_from(values, base)
+        for host, values in (config.get("host_overrides") or {}).items()
+    }
+    return HostRateLimiter(base, overrides)
@@ -0,0 +1,326 @@
+import logging
+import random
+import socket
+import sqlite3
+import ssl
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+LOGGER = logging.getLogger("gmaps_scraper.resilience")
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Failure classes that are retried; "dns" and "tls" failures are permanent
+# for our purposes and go straight to the negative cache.
+TRANSIENT_FAILURES = ("timeout", "connection")
+
+DEFAULT_NEGATIVE_TTLS = {
+    "dns": 24 * 3600,
+    "tls": 24 * 3600,
+    "connection": 3600,
+    "timeout": 1800,
+}
+
+class HostUnavailableError(Exception):
+    """Raised without touching the network when a host is known to be down."""
+
+    def __init__(self, host: str, reason: str):
+        super().__init__(f"Skipping {host}: {reason}")
+        self.host = host
+        self.reason = reason
+
+def _exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    stack = [exc]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        for linked in (current.__cause__, current.__context__):
+            if linked is not None:
+                stack.append(linked)
+        # urllib3 keeps the underlying error in ``reason``/``args``.
+        reason = getattr(current, "reason", None)
+        if isinstance(reason, BaseException):
+            stack.append(reason)
+        stack.extend(arg for arg in current.args if isinstance(arg, BaseException))
+
+def classify_failure(exc: BaseException) -> Optional[str]:
+    """Map a transport exception to dns / tls / timeout / connection."""
+    chain = list(_exception_chain(exc))
+    for item in chain:
+        if isinstance(item, socket.gaierror):
+            return "dns"
+    text = " ".join(str(item) for item in chain).lower()
+    if (
+        "name or service not known" in text
+        or "nodename nor servname" in text
+        or "getaddrinfo failed" in text
+        or "name resolution" in text
+    ):
+        return "dns"
+    for item in chain:
+        if isinstance(item, ssl.SSLError) or type(item).__name__ in ("SSLError", "SSLCertVerificationError"):
+            return "tls"
+    if "certificate verify failed" in text:
+        return "tls"
+    for item in chain:
+        if isinstance(item, (socket.timeout, TimeoutError)) or "timeout" in type(item).__name__.lower():
+            return "timeout"
+    for item in chain:
+        if isinstance(item, ConnectionError) or "connect" in type(item).__name__.lower():
+            return "connection"
+    return None
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retries transient failures with full-jitter exponential backoff."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 10.0
+
+    def backoff(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker for a single host.
+
+    ``failure_threshold`` consecutive failures open the circuit for
+    ``reset_seconds``; after that a single probe request is let through and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+    def allow(self, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.probing or now - self.opened_at < self.reset_seconds:
+            return False
+        self.probing = True
+        return True
+
+    def release_probe(self) -> None:
+        """The probe ended without an outcome; the next request probes instead."""
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = now
+            self.probing = False
+
+class NegativeCache:
+    """
+    Persistent record of hosts that failed with DNS/TLS/connection errors.
+
+    Lookups hit an in-memory copy, so a known-dead host is rejected in
+    microseconds; writes go through to SQLite so the knowledge survives
+    across runs until each entry's TTL expires.
+    """
+
+    def __init__(self, path: Path, ttls: Optional[Dict[str, int]] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = dict(DEFAULT_NEGATIVE_TTLS)
+        self.ttls.update(ttls or {})
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dead_hosts (
+                host TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        now = time.time()
+        self._conn.execute("DELETE FROM dead_hosts WHERE expires_at <= ?", (now,))
+        self._conn.commit()
+        self._entries: Dict[str, tuple] = {
+            host: (kind, expires_at)
+            for host, kind, expires_at in self._conn.execute(
+                "SELECT host, kind, expires_at FROM dead_hosts"
+            )
+        }
+
+    def lookup(self, host: str) -> Optional[str]:
+        entry = self._entries.get(host)
+        if entry is None:
+            return None
+        kind, expires_at = entry
+        if expires_at <= time.time():
+            with self._lock:
+                self._entries.pop(host, None)
+            return None
+        return kind
+
+    def record(self, host: str, kind: str) -> None:
+        ttl = self.ttls.get(kind)
+        if not ttl:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._entries[host] = (kind, expires_at)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dead_hosts VALUES (?, ?, ?)",
+                (host, kind, expires_at),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class ResiliencePolicy:
+    """
+    Combines retries, per-host circuit breakers and the negative cache.
+
+    HTTP clients call ``before_request`` (which may raise
+    ``HostUnavailableError``), then ``after_response`` or ``after_error``;
+    both return a delay when the request should be retried, or ``None``.
+    A request that ends with neither (e.g. it is cancelled) must be passed
+    to ``release_probe`` if ``before_request`` made it the host's probe.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+        negative_cache: Optional[NegativeCache] = None,
+    ):
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.negative_cache = negative_cache
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.short_circuited = 0
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+            self._breakers[host] = breaker
+        return breaker
+
+    def before_request(self, host: str, kind: str) -> bool:
+        """Raise if ``host`` is unavailable; True if the request is its half-open probe."""
+        if kind == "website" and self.negative_cache is not None:
+            dead = self.negative_cache.lookup(host)
+            if dead is not None:
+                with self._lock:
+                    self.short_circuited += 1
+                raise HostUnavailableError(host, f"recent {dead} failure")
+        with self._lock:
+            breaker = self._breaker(host)
+            if not breaker.allow(time.monotonic()):
+                self.short_circuited += 1
+                raise HostUnavailableError(host, "circuit open")
+            return breaker.probing
+
+    def release_probe(self, host: str) -> None:
+        with self._lock:
+            self._breaker(host).release_probe()
+
+    def after_response(self, host: str, status_code: int, attempt: int) -> Optional[float]:
+        retryable = status_code in RETRYABLE_STATUSES
+        with self._lock:
+            breaker = self._breaker(host)
+            if status_code >= 500 or status_code == 429:
+                breaker.record_failure(time.monotonic())
+            else:
+                breaker.record_success()
+        if retryable and attempt + 1 < self.retry.max_attempts:
+            return self.retry.backoff(attempt)
+        return None
+
+    def after_error(
+        self,
+        host: str,
+        kind: str,
+        exc: BaseException,
+        attempt: int,
+    ) -> Optional[float]:
+        failure = classify_failure(exc)
+        with self._lock:
+            self._breaker(host).record_failure(time.monotonic())
+        if failure in TRANSIENT_FAILURES and attempt + 1 < self.retry.max_attempts:
+            return self.retry.backoff(attempt)
+        if failure is not None and kind == "website" and self.negative_cache is not None:
+            LOGGER.info("Marking %s as unavailable after %s failure", host, failure)
+            self.negative_cache.record(host, failure)
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            open_hosts = {
+                host: breaker.state
+                for host, breaker in self._breakers.items()
+                if breaker.state != "closed"
+            }
+            return {
+                "short_circuited": self.short_circuited,
+                "open_circuits": open_hosts,
+                "negative_cache_size": len(self.negative_cache) if self.negative_cache else 0,
+            }
+
+    def close(self) -> None:
+        if self.negative_cache is not None:
+            self.negative_cache.close()
+
+def build_resilience_policy(
+    settings: Dict[str, Any],
+    output_dir: Path,
+) -> Optional[ResiliencePolicy]:
+    config = settings.get("resilience") or {}
+    if not config.get("enabled", False):
+        return None
+    negative_cache = None
+    negative = config.get("negative_cache") or {}
+    # Opt-in: it persists failures across runs, so a host that was briefly
+    # down or slow would lose its contacts in the next run too.
+    if negative.get("enabled", False):
+        negative_cache = NegativeCache(
+            Path(negative.get("path") or output_dir / ".negative_cache.sqlite"),
+            ttls={kind: int(ttl) for kind, ttl in (negative.get("ttl_seconds") or {}).items()},
+        )
+    return ResiliencePolicy(
+        retry=RetryPolicy(
+            max_attempts=int(config.get("max_attempts", 3)),
+            base_delay=float(config.get("base_delay_seconds", 0.5)),
+            max_delay=float(config.get("max_delay_seconds", 10.0)),
+        ),
+        failure_threshold=int(config.get("breaker_failure_threshold", 5)),
+        reset_seconds=float(config.get("breaker_reset_seconds", 60.0)),
+        negative_cache=negative_cache,
+    )
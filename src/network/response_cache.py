@@ -0,0 +1,311 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from network.http_client import HttpResponse
+
+LOGGER = logging.getLogger("gmaps_scraper.response_cache")
+
+DEFAULT_TTLS = {
+    "search": 6 * 3600,
+    "website": 7 * 24 * 3600,
+}
+
+MODES = ("readwrite", "cache-only")
+
+class CacheMissError(Exception):
+    """Raised in cache-only mode when a URL has never been cached."""
+
+    def __init__(self, url: str):
+        super().__init__(f"No cached response for {url} (cache-only mode)")
+        self.url = url
+
+@dataclass(frozen=True)
+class CacheEntry:
+    url: str
+    kind: str
+    body_hash: str
+    size: int
+    status_code: int
+    headers: Dict[str, str]
+    encoding: Optional[str]
+    stored_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache.
+
+    Bodies are stored content-addressed (``bodies/<sha256>``) so identical
+    pages fetched under different URLs share one file; a small SQLite index
+    maps each URL to its body, validators and timestamps. Entries are fresh
+    for the TTL of their kind (``search`` or ``website``); stale entries are
+    revalidated with ``If-None-Match`` / ``If-Modified-Since``. Once the total
+    body size exceeds ``max_bytes`` the least recently used entries are
+    evicted. In ``cache-only`` mode the network is never touched.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttls: Optional[Dict[str, int]] = None,
+        mode: str = "readwrite",
+    ):
+        if mode not in MODES:
+            raise ValueError(f"http_cache mode must be one of: {', '.join(MODES)}")
+        self.directory = Path(directory)
+        self.bodies_dir = self.directory / "bodies"
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.mode = mode
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.directory / "index.sqlite"),
+            check_same_thread=False,
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                encoding TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+        )
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        self._total_bytes = int(row[0])
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "cache-only"
+
+    def _body_path(self, body_hash: str) -> Path:
+        return self.bodies_dir / body_hash[:2] / body_hash
+
+    def _load(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, kind, body_hash, size, status_code, headers, encoding, "
+                "stored_at FROM entries WHERE url_key = ?",
+                (_sha256(url.encode("utf-8")),),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(
+            url=row[0],
+            kind=row[1],
+            body_hash=row[2],
+            size=row[3],
+            status_code=row[4],
+            headers=json.loads(row[5]),
+            encoding=row[6],
+            stored_at=row[7],
+        )
+
+    def _touch(self, url: str, revalidated: bool = False) -> None:
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ?, stored_at = ? WHERE url_key = ?",
+                    (now, now, _sha256(url.encode("utf-8"))),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE url_key = ?",
+                    (now, _sha256(url.encode("utf-8"))),
+                )
+            self._conn.commit()
+
+    def _to_response(self, entry: CacheEntry) -> Optional[HttpResponse]:
+        try:
+            content = self._body_path(entry.body_hash).read_bytes()
+        except OSError:
+            return None
+        return HttpResponse(
+            url=entry.url,
+            status_code=entry.status_code,
+            headers=entry.headers,
+            content=content,
+            encoding=entry.encoding,
+            from_cache=True,
+        )
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        ttl = self.ttls.get(entry.kind, 0)
+        return time.time() - entry.stored_at < ttl
+
+    def lookup(self, url: str) -> Tuple[Optional[HttpResponse], Optional[CacheEntry]]:
+        """
+        Return ``(response, entry)``. ``response`` is set when the cached copy
+        can be served without touching the network; otherwise ``entry`` (if
+        any) carries the validators for a conditional request.
+        """
+        entry = self._load(url)
+        if entry is not None and (self.offline or self.is_fresh(entry)):
+            response = self._to_response(entry)
+            if response is not None:
+                self._touch(url)
+                return response, entry
+            entry = None
+        if entry is None and self.offline:
+            raise CacheMissError(url)
+        return None, entry
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def handle_response(
+        self,
+        url: str,
+        kind: str,
+        response: HttpResponse,
+        entry: Optional[CacheEntry],
+    ) -> HttpResponse:
+        """Resolve a 304 against ``entry`` and store complete 200s."""
+        if response.status_code == 304 and entry is not None:
+            cached = self._to_response(entry)
+            if cached is not None:
+                self._touch(url, revalidated=True)
+                return replace(cached, url=response.url)
+        if response.status_code == 200:
+            self.store(url, kind, response)
+        return response
+
+    def store(self, url: str, kind: str, response: HttpResponse) -> None:
+        if response.truncated:
+            # A capped or early-stopped body must not be replayed as the page.
+            return
+        body_hash = _sha256(response.content)
+        path = self._body_path(body_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(response.content)
+            os.replace(tmp, path)
+
+        now = time.time()
+        url_key = _sha256(url.encode("utf-8"))
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM entries WHERE url_key = ?", (url_key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url_key,
+                    url,
+                    kind,
+                    body_hash,
+                    len(response.content),
+                    response.status_code,
+                    json.dumps(response.headers),
+                    response.encoding,
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._total_bytes += len(response.content) - (previous[0] if previous else 0)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            target = int(self.max_bytes * 0.9)
+            rows = self._conn.execute(
+                "SELECT url_key, body_hash, size FROM entries ORDER BY accessed_at"
+            ).fetchall()
+            evicted = 0
+            for url_key, body_hash, size in rows:
+                if self._total_bytes <= target:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE url_key = ?", (url_key,))
+                self._total_bytes -= size
+                evicted += 1
+                shared = self._conn.execute(
+                    "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+                ).fetchone()
+                if shared is None:
+                    try:
+                        self._body_path(body_hash).unlink()
+                    except OSError:
+                        pass
+            self._conn.commit()
+        LOGGER.debug("Evicted %d cached responses", evicted)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def build_response_cache(
+    settings: Dict[str, Any],
+    output_dir: Path,
+    mode: Optional[str] = None,
+) -> Optional[ResponseCache]:
+    """
+    Build the cache described by the ``http_cache`` settings block, or return
+    ``None`` when it is disabled. ``mode`` overrides the configured mode and
+    opens the cache even when it is disabled (``--cache-only`` replays what
+    an earlier run with the cache on stored).
+
+    The cache is opt-in: it outlives the run, and until an entry's TTL runs
+    out a re-run sees the page as it was, not as it is now.
+    """
+    config = settings.get("http_cache") or {}
+    if not config.get("enabled", False) and mode is None:
+        return None
+    directory = config.get("directory") or str(output_dir / ".http_cache")
+    return ResponseCache(
+        directory=Path(directory),
+        max_bytes=int(config.get("max_mb", 512)) * 1024 * 1024,
+        ttls={
+            kind: int(seconds)
+            for kind, seconds in (config.get("ttl_seconds") or {}).items()
+        },
+        mode=mode or config.get("mode", "readwrite"),
+    )
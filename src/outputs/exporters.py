@@ -1,59 +1,280 @@
 import csv
 import json
 import logging
+import textwrap
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import IO, Any, Dict, Iterable, List, Optional
 
-import pandas as pd
+from extractors.utils_format import BusinessRecord, record_to_dict, record_to_row
 
 LOGGER = logging.getLogger("gmaps_scraper.exporters")
 
+DEFAULT_HEADERS = [
+    "Business Name",
+    "Business Address",
+    "Website",
+    "Phone",
+    "Emails",
+    "Facebook",
+    "Instagram",
+    "Twitter",
+    "LinkedIn",
+    "TikTok",
+    "YouTube",
+]
+
+FORMAT_EXTENSIONS = {
+    "csv": "csv",
+    "json": "json",
+    "jsonl": "jsonl",
+    "excel": "xlsx",
+    "parquet": "parquet",
+}
+
+# Export column -> BusinessRecord attribute, for the typed (Parquet) output.
+COLUMN_FIELDS = {
+    "Business Name": "business_name",
+    "Business Address": "business_address",
+    "Website": "website",
+    "Phone": "phone",
+    "Emails": "emails",
+    "Facebook": "facebook",
+    "Instagram": "instagram",
+    "Twitter": "twitter",
+    "LinkedIn": "linkedin",
+    "TikTok": "tiktok",
+    "YouTube": "youtube",
+}
+
 def _ensure_parent(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
+class RecordWriter:
+    """
+    Incremental exporter: ``write`` one record dict at a time, then ``close``.
+
+    Text formats flush after every record so partial results are already on
+    disk if the process dies mid-query.
+
+    ``write_record`` takes a ``BusinessRecord`` directly; row-based formats
+    serialize it without building the intermediate dict.
+    """
+
+    def __init__(self, path: Path):
+        _ensure_parent(path)
+        self.path = path
+        self.count = 0
+
+    def write(self, record: Dict[str, object]) -> None:
+        self._write(record)
+        self.count += 1
+
+    def write_record(self, record: BusinessRecord) -> None:
+        self._write_record(record)
+        self.count += 1
+
+    def _write(self, record: Dict[str, object]) -> None:
+        raise NotImplementedError
+
+    def _write_record(self, record: BusinessRecord) -> None:
+        self._write(record_to_dict(record))
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class JsonLinesWriter(RecordWriter):
+    """One JSON object per line; safe to append to and to read back partially."""
+
+    def __init__(self, path: Path, append: bool = False):
+        super().__init__(path)
+        self._file: IO[str] = path.open("a" if append else "w", encoding="utf-8")
+
+    def _write(self, record: Dict[str, object]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+class JsonArrayWriter(RecordWriter):
+    """Writes the same indented JSON array as ``json.dump(..., indent=2)``."""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file: IO[str] = path.open("w", encoding="utf-8")
+
+    def _write(self, record: Dict[str, object]) -> None:
+        body = json.dumps(record, ensure_ascii=False, indent=2)
+        self._file.write(("[\n" if not self.count else ",\n") + textwrap.indent(body, "  "))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.write("\n]" if self.count else "[]")
+        self._file.close()
+
+class CsvWriter(RecordWriter):
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file: IO[str] = path.open("w", encoding="utf-8", newline="")
+        self._rows = csv.writer(self._file)
+        self._writer: Optional[csv.DictWriter] = None
+        self._header_written = False
+
+    def _write(self, record: Dict[str, object]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(record.keys()))
+            if not self._header_written:
+                self._writer.writeheader()
+                self._header_written = True
+        self._writer.writerow(record)
+        self._file.flush()
+
+    def _write_record(self, record: BusinessRecord) -> None:
+        if not self._header_written:
+            self._rows.writerow(DEFAULT_HEADERS)
+            self._header_written = True
+        self._rows.writerow(record_to_row(record))
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._header_written:
+            # Create an empty file with headers only
+            self._rows.writerow(DEFAULT_HEADERS)
+        self._file.close()
+
+def _excel_value(value: object) -> object:
+    # Same cell text pandas produced for list values such as "Emails".
+    if isinstance(value, (list, tuple, dict)):
+        return str(value)
+    return value
+
+class StreamingExcelWriter(RecordWriter):
+    """
+    openpyxl write-only workbook: rows are streamed to a temporary file as
+    they arrive instead of being held in memory, and ``close`` assembles
+    the ``.xlsx``.
+    """
+
+    def __init__(self, path: Path):
+        from openpyxl import Workbook  # imported lazily, only Excel output needs it
+
+        super().__init__(path)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._header_written = False
+
+    def _write(self, record: Dict[str, object]) -> None:
+        if not self._header_written:
+            self._sheet.append(list(record.keys()))
+            self._header_written = True
+        self._sheet.append([_excel_value(value) for value in record.values()])
+
+    def _write_record(self, record: BusinessRecord) -> None:
+        if not self._header_written:
+            self._sheet.append(DEFAULT_HEADERS)
+            self._header_written = True
+        self._sheet.append([_excel_value(value) for value in record_to_row(record)])
+
+    def close(self) -> None:
+        self._workbook.save(self.path)
+
+class ParquetWriter(RecordWriter):
+    """
+    Typed, compressed columnar output. Missing values are nulls rather than
+    ``"N/A"`` and ``Emails`` is a ``list<string>`` column. Rows are buffered
+    per column and flushed as one row group every ``row_group_size`` rows.
+    Requires ``pyarrow``.
+    """
+
+    def __init__(self, path: Path, row_group_size: int = 50_000, compression: str = "zstd"):
+        import pyarrow as pa  # imported lazily, only Parquet output needs it
+        import pyarrow.parquet as pq
+
+        super().__init__(path)
+        self._pa = pa
+        self.row_group_size = row_group_size
+        self.schema = pa.schema(
+            [
+                pa.field(column, pa.list_(pa.string()) if column == "Emails" else pa.string())
+                for column in DEFAULT_HEADERS
+            ]
+        )
+        self._writer = pq.ParquetWriter(str(path), self.schema, compression=compression)
+        self._columns: Dict[str, List[Any]] = {column: [] for column in DEFAULT_HEADERS}
+
+    def _write(self, record: Dict[str, object]) -> None:
+        for column, values in self._columns.items():
+            value = record.get(column)
+            if value == "N/A":
+                value = None
+            if column == "Emails":
+                value = list(value or [])  # type: ignore[call-overload]
+            values.append(value)
+        self._maybe_flush()
+
+    def _write_record(self, record: BusinessRecord) -> None:
+        for column, values in self._columns.items():
+            values.append(getattr(record, COLUMN_FIELDS[column]))
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._columns["Business Name"]) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._columns["Business Name"]:
+            return
+        table = self._pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table)
+        for values in self._columns.values():
+            values.clear()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+def open_record_writer(fmt: str, output_dir: Path, base_filename: str) -> RecordWriter:
+    fmt = fmt.lower()
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    target = output_dir / f"{base_filename}.{FORMAT_EXTENSIONS[fmt]}"
+    LOGGER.debug("Exporting %s to %s", fmt, target)
+    if fmt == "json":
+        return JsonArrayWriter(target)
+    if fmt == "jsonl":
+        return JsonLinesWriter(target)
+    if fmt == "csv":
+        return CsvWriter(target)
+    if fmt == "parquet":
+        return ParquetWriter(target)
+    return StreamingExcelWriter(target)
+
+def _write_all(writer: RecordWriter, records: Iterable[Dict[str, object]]) -> Path:
+    with writer:
+        for record in records:
+            writer.write(record)
+    return writer.path
+
 def export_to_json(records: Iterable[Dict[str, object]], path: Path) -> Path:
-    _ensure_parent(path)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(list(records), f, ensure_ascii=False, indent=2)
-    return path
+    return _write_all(JsonArrayWriter(path), records)
+
+def export_to_jsonl(records: Iterable[Dict[str, object]], path: Path) -> Path:
+    return _write_all(JsonLinesWriter(path), records)
 
 def export_to_csv(records: Iterable[Dict[str, object]], path: Path) -> Path:
-    _ensure_parent(path)
-    records_list: List[Dict[str, object]] = list(records)
-    if not records_list:
-        # Create an empty file with headers only
-        with path.open("w", encoding="utf-8", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "Business Name",
-                    "Business Address",
-                    "Website",
-                    "Phone",
-                    "Emails",
-                    "Facebook",
-                    "Instagram",
-                    "Twitter",
-                    "LinkedIn",
-                    "TikTok",
-                    "YouTube",
-                ]
-            )
-        return path
-
-    headers = list(records_list[0].keys())
-    with path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        for row in records_list:
-            writer.writerow(row)
-    return path
+    return _write_all(CsvWriter(path), records)
 
 def export_to_excel(records: Iterable[Dict[str, object]], path: Path) -> Path:
-    _ensure_parent(path)
-    df = pd.DataFrame(list(records))
-    df.to_excel(path, index=False)
-    return path
+    return _write_all(StreamingExcelWriter(path), records)
+
+def export_to_parquet(records: Iterable[Dict[str, object]], path: Path) -> Path:
+    return _write_all(ParquetWriter(path), records)
 
 def export_records(
     records: Iterable[Dict[str, object]],
@@ -61,18 +282,4 @@ def export_records(
     output_dir: Path,
     base_filename: str,
 ) -> Path:
-    fmt = fmt.lower()
-    if fmt == "json":
-        target = output_dir / f"{base_filename}.json"
-        LOGGER.debug("Exporting JSON to %s", target)
-        return export_to_json(records, target)
-    if fmt == "csv":
-        target = output_dir / f"{base_filename}.csv"
-        LOGGER.debug("Exporting CSV to %s", target)
-        return export_to_csv(records, target)
-    if fmt == "excel":
-        target = output_dir / f"{base_filename}.xlsx"
-        LOGGER.debug("Exporting Excel to %s", target)
-        return export_to_excel(records, target)
-
-    raise ValueError(f"Unsupported export format: {fmt}")
\ No newline at end of file
+    return _write_all(open_record_writer(fmt, output_dir, base_filename), records)
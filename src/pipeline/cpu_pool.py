@@ -0,0 +1,80 @@
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional
+
+from extractors.contact_scanner import scan_contacts
+from extractors.maps_parser import parse_maps_results
+from extractors.utils_format import BusinessRecord, ContactInfo
+
+LOGGER = logging.getLogger("gmaps_scraper.cpu_pool")
+
+def parse_page(
+    content: bytes,
+    encoding: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> List[BusinessRecord]:
+    """Worker entry point: decode and parse one search result page."""
+    return parse_maps_results(content.decode(encoding or "utf-8", errors="replace"), backend)
+
+def scan_page(content: bytes) -> ContactInfo:
+    """Worker entry point: extract contacts from one website body."""
+    return scan_contacts(content)
+
+class CpuPool:
+    """
+    Process pool for the CPU-bound stages: parsing result pages and scanning
+    website bodies for contacts. Pages cross the process boundary as raw
+    bytes, which pickle cheaply, and only the compact results come back.
+
+    ``parse`` and ``scan`` block the calling I/O thread until a worker is
+    done; the work itself no longer holds the GIL, so other threads keep
+    fetching meanwhile. ``scan_async`` awaits the result without blocking
+    the event loop.
+
+    ``start_method`` defaults to ``spawn`` so workers never inherit locks
+    held by the parent's I/O threads.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: str = "spawn"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(start_method),
+        )
+
+    def parse(
+        self,
+        content: bytes,
+        encoding: Optional[str] = None,
+        backend: Optional[str] = None,
+    ) -> List[BusinessRecord]:
+        return self._executor.submit(parse_page, content, encoding, backend).result()
+
+    def scan(self, content: bytes) -> ContactInfo:
+        return self._executor.submit(scan_page, content).result()
+
+    async def scan_async(self, content: bytes) -> ContactInfo:
+        return await asyncio.wrap_future(self._executor.submit(scan_page, content))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "CpuPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+def build_cpu_pool(settings: Dict[str, Any]) -> Optional[CpuPool]:
+    config = settings.get("cpu_pool") or {}
+    if not config.get("enabled", False):
+        return None
+    pool = CpuPool(
+        max_workers=int(config.get("max_workers") or 0) or None,
+        start_method=config.get("start_method") or "spawn",
+    )
+    LOGGER.info("Parsing and contact extraction run in %d worker processes", pool.max_workers)
+    return pool
@@ -0,0 +1,268 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger("gmaps_scraper.scheduler")
+
+POLICIES = ("round_robin", "fifo")
+
+_Task = Tuple["concurrent.futures.Future[Any]", Callable[..., Any], tuple, dict]
+
+class InflightLimit:
+    """
+    Counting semaphore shared by threads and by coroutines on different
+    event loops.
+
+    Each async query drives its own loop, so ``asyncio.Semaphore`` cannot
+    bound them together; this hands free slots to waiters in arrival order
+    across loops and threads.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(limit, 1)
+        self._free = self.limit
+        self._lock = threading.Lock()
+        # Each waiter takes a handed-over slot and returns True, or returns
+        # False when it can no longer take one.
+        self._waiters: Deque[Callable[[], bool]] = deque()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        waiter: "asyncio.Future[None]" = loop.create_future()
+
+        def wake() -> bool:
+            try:
+                loop.call_soon_threadsafe(self._hand_over, waiter)
+            except RuntimeError:
+                return False  # its loop has closed
+            return True
+
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return
+            self._waiters.append(wake)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = wake in self._waiters
+                if queued:
+                    self._waiters.remove(wake)
+            if not queued and waiter.done() and not waiter.cancelled():
+                # The slot arrived together with the cancellation.
+                self.release()
+            raise
+
+    def acquire_blocking(self) -> None:
+        """Take a slot from a thread, waiting for one if none is free."""
+        ready = threading.Event()
+
+        def wake() -> bool:
+            ready.set()
+            return True
+
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return
+            self._waiters.append(wake)
+        ready.wait()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free right now."""
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return True
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                if self._waiters.popleft()():
+                    return
+            self._free += 1
+
+    def _hand_over(self, waiter: "asyncio.Future[None]") -> None:
+        if waiter.cancelled():
+            self.release()
+        else:
+            waiter.set_result(None)
+
+class FairExecutor:
+    """
+    Fixed-size worker pool shared by every query in a batch.
+
+    The pool size is the global concurrency budget: no more than
+    ``max_workers`` fetches run at once across all queries. Work is queued per
+    group (one group per query). With the ``round_robin`` policy idle workers
+    take the next task from each group in turn, so a query with hundreds of
+    websites cannot starve the others; ``fifo`` runs tasks in submission
+    order.
+
+    Each task holds a slot of ``inflight`` while it runs. Website fetches
+    of the async engine run on their query's event loop rather than on these
+    threads and take slots of it too, so both keep to the same
+    ``max_workers`` budget.
+    """
+
+    def __init__(self, max_workers: int, policy: str = "round_robin"):
+        if policy not in POLICIES:
+            raise ValueError(f"scheduler policy must be one of: {', '.join(POLICIES)}")
+        self.policy = policy
+        self.inflight = InflightLimit(max_workers)
+        self._cond = threading.Condition()
+        self._groups: "OrderedDict[str, Deque[_Task]]" = OrderedDict()
+        self._fifo: Deque[_Task] = deque()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"fair-executor-{i}", daemon=True)
+            for i in range(max(max_workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        group: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> "concurrent.futures.Future[Any]":
+        future: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+        task = (future, fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot submit to a FairExecutor after shutdown")
+            if self.policy == "fifo":
+                self._fifo.append(task)
+            else:
+                self._groups.setdefault(group, deque()).append(task)
+            self._cond.notify()
+        return future
+
+    def group(self, name: str) -> "GroupExecutor":
+        return GroupExecutor(self, name)
+
+    def _next_task(self) -> Optional[_Task]:
+        if self._fifo:
+            return self._fifo.popleft()
+        if not self._groups:
+            return None
+        group, tasks = next(iter(self._groups.items()))
+        task = tasks.popleft()
+        if tasks:
+            self._groups.move_to_end(group)
+        else:
+            del self._groups[group]
+        return task
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    task = self._next_task()
+            future, fn, args, kwargs = task
+            self.inflight.acquire_blocking()
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as exc:  # pragma: no cover - passed to the caller
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+            finally:
+                self.inflight.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "FairExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+class GroupExecutor:
+    """``Executor``-like view of a ``FairExecutor`` bound to one group."""
+
+    def __init__(self, pool: FairExecutor, name: str):
+        self.pool = pool
+        self.name = name
+        self.inflight = pool.inflight
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> "concurrent.futures.Future[Any]":
+        return self.pool.submit(self.name, fn, *args, **kwargs)
+
+def run_query_batch(
+    jobs: Sequence[Tuple[str, str]],
+    settings: Dict[str, Any],
+    run_query: Callable[..., Path],
+    **run_kwargs: Any,
+) -> List[Path]:
+    """
+    Run ``run_query(query, settings, fmt, executor=..., **run_kwargs)`` for
+    every ``(query, fmt)`` job, several at a time.
+
+    ``scheduler.max_concurrent_queries`` bounds how many queries are active;
+    ``scheduler.global_max_inflight`` is the size of the shared fetch pool;
+    ``scheduler.per_query_max_inflight`` caps each query's share of it.
+    Output paths are returned in job order; the first failure is re-raised
+    once the remaining queries have finished.
+    """
+    config = settings.get("scheduler") or {}
+    max_queries = int(config.get("max_concurrent_queries", 4))
+    global_limit = int(config.get("global_max_inflight", 32))
+    per_query = int(config.get("per_query_max_inflight", 8))
+    policy = config.get("policy", "round_robin")
+
+    query_settings = dict(settings)
+    configured_window = settings.get("enrich_window")
+    query_settings["enrich_window"] = (
+        min(int(configured_window), per_query) if configured_window else per_query
+    )
+
+    LOGGER.info(
+        "Scheduling %d queries (%d at a time, %d fetches in flight, policy=%s)",
+        len(jobs),
+        max_queries,
+        global_limit,
+        policy,
+    )
+
+    with FairExecutor(global_limit, policy=policy) as pool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(max_queries, 1)) as queries:
+            futures = [
+                queries.submit(
+                    run_query,
+                    query,
+                    query_settings,
+                    fmt,
+                    executor=pool.group(f"{index}:{query}"),
+                    **run_kwargs,
+                )
+                for index, (query, fmt) in enumerate(jobs)
+            ]
+            concurrent.futures.wait(futures)
+    return [future.result() for future in futures]
@@ -0,0 +1,251 @@
+import json
+import logging
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from extractors.utils_format import BusinessRecord, record_to_dict
+from monitoring.metrics import get_metrics
+from pipeline.scheduler import FairExecutor
+
+LOGGER = logging.getLogger("gmaps_scraper.service")
+
+# Settings a request may override; everything else is fixed by the server.
+REQUEST_OVERRIDES = ("max_results", "enrich_contacts", "parser_backend")
+
+class ServiceBusyError(Exception):
+    """Raised when no request slot frees up within the admission timeout."""
+
+class ScrapeService:
+    """
+    Runs queries against resources that stay warm between requests.
+
+    One pooled HTTP client, the caches and a ``FairExecutor`` sized by
+    ``scheduler.global_max_inflight`` are shared by every request; each
+    request is its own executor group, so a large query cannot starve small
+    ones. At most ``service.max_concurrent_requests`` run at once.
+
+    ``iter_records(query, settings, executor=..., **resources)`` produces a
+    query's records lazily (``runner.iter_business_records``); only
+    ``enrich_window`` of them are in flight, so a client that reads slowly
+    slows fetching down instead of letting records pile up in memory.
+    """
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        iter_records: Callable[..., Iterator[BusinessRecord]],
+        **resources: Any,
+    ):
+        config = settings.get("service") or {}
+        scheduler = settings.get("scheduler") or {}
+        self.settings = dict(settings)
+        self.settings["enrich_window"] = int(scheduler.get("per_query_max_inflight", 8))
+        self.iter_records = iter_records
+        self.resources = resources
+        self.queue_timeout = float(config.get("queue_timeout_seconds", 5))
+        self._slots = threading.BoundedSemaphore(int(config.get("max_concurrent_requests", 8)))
+        self._pool = FairExecutor(
+            int(scheduler.get("global_max_inflight", 32)),
+            policy=scheduler.get("policy", "round_robin"),
+        )
+        self._lock = threading.Lock()
+        self._active: Dict[str, threading.Event] = {}
+        self.served = 0
+
+    def request_settings(self, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(overrides, dict):
+            raise ValueError("'settings' must be a JSON object")
+        unknown = set(overrides) - set(REQUEST_OVERRIDES)
+        if unknown:
+            raise ValueError(f"cannot override: {', '.join(sorted(unknown))}")
+        return {**self.settings, **overrides}
+
+    def stream(
+        self,
+        request_id: str,
+        query: str,
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the query's records as export dicts. Raises ``ServiceBusyError``
+        on the first ``next()`` when the service is full. Stops early once
+        ``cancel(request_id)`` is called or the generator is closed, which
+        cancels the request's fetches that have not started.
+        """
+        settings = self.request_settings(overrides or {})
+        cancelled = threading.Event()
+        with self._lock:
+            if request_id in self._active:
+                raise ValueError(f"request id {request_id!r} is already in use")
+            self._active[request_id] = cancelled
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                del self._active[request_id]
+            get_metrics().inc("service_requests_total", outcome="busy")
+            raise ServiceBusyError("all request slots are busy")
+        records = None
+        outcome = "cancelled"
+        try:
+            records = self.iter_records(
+                query,
+                settings,
+                executor=self._pool.group(request_id),
+                **self.resources,
+            )
+            for record in records:
+                if cancelled.is_set():
+                    break
+                yield record_to_dict(record)
+            else:
+                outcome = "completed"
+        except Exception:
+            outcome = "failed"
+            raise
+        finally:
+            if records is not None:
+                records.close()  # type: ignore[attr-defined]
+            with self._lock:
+                del self._active[request_id]
+                self.served += 1
+            self._slots.release()
+            get_metrics().inc("service_requests_total", outcome=outcome)
+            LOGGER.info("Request %s for %r %s", request_id, query, outcome)
+
+    def cancel(self, request_id: str) -> bool:
+        with self._lock:
+            cancelled = self._active.get(request_id)
+        if cancelled is None:
+            return False
+        cancelled.set()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"active": len(self._active), "served": self.served}
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service: ScrapeService
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {"status": "ok", **self.service.stats()})
+
+    def do_DELETE(self) -> None:  # noqa: N802 - http.server naming
+        request_id = self.path[len("/scrape/"):] if self.path.startswith("/scrape/") else ""
+        if not request_id or not self.service.cancel(request_id):
+            self._send_json(404, {"error": "no such request"})
+            return
+        self._send_json(202, {"cancelled": request_id})
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        if self.path != "/scrape":
+            self._send_json(404, {"error": "not found"})
+            return
+        query = None
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            query = body.get("query") if isinstance(body, dict) else None
+            if not isinstance(query, str) or not query.strip():
+                raise ValueError("body must be a JSON object with a non-empty 'query'")
+            # Clients may name the request up front so they can cancel it
+            # before the first record (and the response headers) arrive.
+            request_id = self.headers.get("X-Request-Id") or uuid.uuid4().hex[:16]
+            stream = self.service.stream(request_id, query, body.get("settings"))
+            # Pulling the first record before answering lets admission and
+            # search failures still get a proper status code.
+            first = next(stream, None)
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        except ServiceBusyError as exc:
+            self._send_json(503, {"error": str(exc)}, {"Retry-After": "1"})
+            return
+        except Exception as exc:
+            LOGGER.warning("Query %r failed: %s", query, exc)
+            self._send_json(502, {"error": str(exc)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("X-Request-Id", request_id)
+        self.end_headers()
+        try:
+            if first is not None:
+                self._write_line(first)
+                for row in stream:
+                    self._write_line(row)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; closing the stream cancels its fetches.
+            LOGGER.info("Client disconnected from request %s", request_id)
+            self.close_connection = True
+            return
+        except Exception as exc:
+            # Headers are gone already; report the failure as the last line.
+            LOGGER.warning("Query %r failed mid-stream: %s", query, exc)
+            self._write_line({"error": str(exc)})
+        finally:
+            stream.close()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_line(self, row: Dict[str, Any]) -> None:
+        data = json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(
+        self,
+        status: int,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - base signature
+        LOGGER.debug("%s - " + format, self.address_string(), *args)
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many short lookups may connect at once; the default backlog is 5.
+    request_queue_size = 128
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            LOGGER.debug("Client %s went away", client_address)
+            return
+        super().handle_error(request, client_address)
+
+def serve(
+    service: ScrapeService,
+    host: str = "127.0.0.1",
+    port: int = 8787,
+) -> ThreadingHTTPServer:
+    """
+    Bind the service's HTTP API; the caller runs ``serve_forever()``.
+
+    ``POST /scrape`` with ``{"query": ..., "settings": {...}}`` streams the
+    records as NDJSON (``X-Request-Id`` names the request, chosen by the
+    client or the server);
+    ``DELETE /scrape/<id>`` cancels it; ``GET /health`` reports load.
+    """
+    handler = type("ServiceHandler", (_Handler,), {"service": service})
+    server = _Server((host, port), handler)
+    LOGGER.info("Serving scrape API on http://%s:%d", host, server.server_address[1])
+    return server
@@ -0,0 +1,532 @@
+import concurrent.futures
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+from pipeline.scheduler import FairExecutor
+
+LOGGER = logging.getLogger("gmaps_scraper.work_queue")
+
+# Only query jobs exist for now: the worker that runs a query's search also
+# enriches its records. Jobs carry a ``kind`` so per-record enrichment jobs
+# can share the queue later.
+QUERY_JOB = "query"
+
+@dataclass(frozen=True)
+class Job:
+    """A claimed job. ``lease_token`` identifies this particular delivery."""
+
+    id: int
+    kind: str
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+    lease_token: str
+
+class WorkQueue(Protocol):
+    """
+    What a broker backend implements. ``MemoryWorkQueue`` and
+    ``SqliteWorkQueue`` document the semantics each method must keep.
+    """
+
+    def put(self, kind: str, key: str, payload: Dict[str, Any]) -> bool: ...
+
+    def claim(
+        self,
+        worker: str,
+        lease_seconds: float,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> Optional[Job]: ...
+
+    def heartbeat(self, job: Job, lease_seconds: float) -> bool: ...
+
+    def complete(self, job: Job, result: Optional[Dict[str, Any]] = None) -> bool: ...
+
+    def fail(self, job: Job, error: str) -> bool: ...
+
+    def results(self, kind: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]: ...
+
+    def stats(self) -> Dict[str, int]: ...
+
+    def close(self) -> None: ...
+
+def query_job_key(query: str, fmt: str) -> str:
+    return json.dumps([query, fmt])
+
+class MemoryWorkQueue:
+    """
+    In-process broker with the same semantics as ``SqliteWorkQueue``.
+
+    Jobs live only as long as the object, so it serves tests and workers
+    running as threads of one process; it is also the reference
+    ``WorkQueue`` implementation for a networked broker backend to follow.
+    """
+
+    def __init__(self, max_attempts: int = 3, clock: Callable[[], float] = time.time):
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[str, str], int] = {}
+
+    def put(self, kind: str, key: str, payload: Dict[str, Any]) -> bool:
+        """Enqueue a job; a ``(kind, key)`` that was ever enqueued is ignored."""
+        with self._lock:
+            if (kind, key) in self._keys:
+                return False
+            job_id = len(self._jobs) + 1
+            self._keys[(kind, key)] = job_id
+            self._jobs[job_id] = {
+                "kind": kind,
+                "key": key,
+                "payload": payload,
+                "state": "queued",
+                "attempts": 0,
+                "owner": None,
+                "token": None,
+                "expires": 0.0,
+                "result": None,
+                "error": None,
+            }
+            return True
+
+    def claim(
+        self,
+        worker: str,
+        lease_seconds: float,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> Optional[Job]:
+        """
+        Lease the oldest available job: queued, or leased to a worker that
+        stopped heart-beating. Abandoned jobs out of attempts are failed.
+        """
+        now = self._clock()
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if kinds is not None and job["kind"] not in kinds:
+                    continue
+                if job["state"] == "leased" and job["expires"] <= now:
+                    if job["attempts"] >= self.max_attempts:
+                        job.update(state="failed", error="lease expired", token=None)
+                        continue
+                    LOGGER.info("Redelivering job %r abandoned by %s", job["key"], job["owner"])
+                elif job["state"] != "queued":
+                    continue
+                job.update(
+                    state="leased",
+                    owner=worker,
+                    token=uuid.uuid4().hex,
+                    expires=now + lease_seconds,
+                    attempts=job["attempts"] + 1,
+                )
+                return Job(
+                    job_id,
+                    job["kind"],
+                    job["key"],
+                    job["payload"],
+                    job["attempts"],
+                    job["token"],
+                )
+        return None
+
+    def heartbeat(self, job: Job, lease_seconds: float) -> bool:
+        """Extend the lease; False once it has passed to another delivery."""
+        with self._lock:
+            entry = self._jobs[job.id]
+            if entry["state"] != "leased" or entry["token"] != job.lease_token:
+                return False
+            entry["expires"] = self._clock() + lease_seconds
+            return True
+
+    def complete(self, job: Job, result: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Record the job's result. Only the first completion of a job counts,
+        from whichever delivery gets there first; later ones return False.
+        """
+        with self._lock:
+            entry = self._jobs[job.id]
+            if entry["state"] == "done":
+                return False
+            entry.update(state="done", result=result, token=None, error=None)
+            return True
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Give the job back for another attempt, or fail it for good. True if retried."""
+        with self._lock:
+            entry = self._jobs[job.id]
+            if entry["state"] != "leased" or entry["token"] != job.lease_token:
+                return False
+            retry = entry["attempts"] < self.max_attempts
+            entry.update(state="queued" if retry else "failed", error=error, token=None)
+            return retry
+
+    def results(self, kind: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        with self._lock:
+            done = [
+                (job["key"], job["result"])
+                for job in self._jobs.values()
+                if job["kind"] == kind and job["state"] == "done"
+            ]
+        return iter(done)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job["state"]] += 1
+        return counts
+
+    def close(self) -> None:
+        return None
+
+class SqliteWorkQueue:
+    """
+    Durable job queue in a SQLite file, shared by every worker process on
+    the host (SQLite's locking is not safe on network filesystems).
+
+    Claims run in an ``IMMEDIATE`` transaction, so two processes can never
+    lease the same job. Each delivery carries a fresh lease token: a worker
+    whose lease expired and was redelivered cannot extend or fail the new
+    delivery, and only the first ``complete`` of a job is stored.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                token TEXT,
+                expires REAL NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                UNIQUE (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+            """
+        )
+
+    def put(self, kind: str, key: str, payload: Dict[str, Any]) -> bool:
+        """Enqueue a job; a ``(kind, key)`` that was ever enqueued is ignored."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (kind, key, payload) VALUES (?, ?, ?)",
+                (kind, key, json.dumps(payload)),
+            )
+        return cursor.rowcount == 1
+
+    def claim(
+        self,
+        worker: str,
+        lease_seconds: float,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> Optional[Job]:
+        """
+        Lease the oldest available job: queued, or leased to a worker that
+        stopped heart-beating. Abandoned jobs out of attempts are failed.
+        """
+        now = self._clock()
+        kind_filter = ""
+        params: List[Any] = [now]
+        if kinds is not None:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'failed', error = 'lease expired', token = NULL "
+                    "WHERE state = 'leased' AND expires <= ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT id, kind, key, payload, attempts, state, owner FROM jobs "
+                    "WHERE (state = 'queued' OR (state = 'leased' AND expires <= ?))"
+                    f"{kind_filter} ORDER BY id LIMIT 1",
+                    params,
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, kind, key, payload, attempts, state, owner = row
+                if state == "leased":
+                    LOGGER.info("Redelivering job %r abandoned by %s", key, owner)
+                token = uuid.uuid4().hex
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'leased', owner = ?, token = ?, expires = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (worker, token, now + lease_seconds, job_id),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(job_id, kind, key, json.loads(payload), attempts + 1, token)
+
+    def heartbeat(self, job: Job, lease_seconds: float) -> bool:
+        """Extend the lease; False once it has passed to another delivery."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET expires = ? WHERE id = ? AND state = 'leased' AND token = ?",
+                (self._clock() + lease_seconds, job.id, job.lease_token),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job: Job, result: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Record the job's result. Only the first completion of a job counts,
+        from whichever delivery gets there first; later ones return False.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, token = NULL, error = NULL "
+                "WHERE id = ? AND state != 'done'",
+                (json.dumps(result), job.id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Give the job back for another attempt, or fail it for good. True if retried."""
+        with self._lock:
+            # A SELECT in the same transaction instead of UPDATE ... RETURNING,
+            # which needs SQLite 3.35.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET state = CASE WHEN attempts < ? THEN 'queued' "
+                    "ELSE 'failed' END, error = ?, token = NULL "
+                    "WHERE id = ? AND state = 'leased' AND token = ?",
+                    (self.max_attempts, error, job.id, job.lease_token),
+                )
+                row = None
+                if cursor.rowcount == 1:
+                    row = self._conn.execute(
+                        "SELECT state FROM jobs WHERE id = ?", (job.id,)
+                    ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row is not None and row[0] == "queued"
+
+    def results(self, kind: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, result FROM jobs WHERE kind = ? AND state = 'done' ORDER BY id",
+                (kind,),
+            ).fetchall()
+        return iter([(key, json.loads(result)) for key, result in rows])
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._lock:
+            for state, count in self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ):
+                counts[state] = count
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class _Heartbeat:
+    """Keeps a job's lease alive from a background thread while it runs."""
+
+    def __init__(self, queue: WorkQueue, job: Job, lease_seconds: float, interval: float):
+        self.queue = queue
+        self.job = job
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if not self.queue.heartbeat(self.job, self.lease_seconds):
+                # Another worker now owns the job. Ours still finishes; its
+                # output replaces the other's atomically and only one
+                # completion is recorded, so the result is the same.
+                LOGGER.warning("Lost the lease on job %r", self.job.key)
+                self.lost = True
+                return
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue_queries(queue: WorkQueue, jobs: Sequence[Tuple[str, str]]) -> int:
+    """Enqueue ``(query, fmt)`` jobs; returns how many were new."""
+    added = sum(
+        queue.put(QUERY_JOB, query_job_key(query, fmt), {"query": query, "fmt": fmt})
+        for query, fmt in jobs
+    )
+    LOGGER.info("Enqueued %d new query jobs (%d already queued)", added, len(jobs) - added)
+    return added
+
+def _run_query_job(
+    queue: WorkQueue,
+    job: Job,
+    settings: Dict[str, Any],
+    run_query: Callable[..., Path],
+    output_dir: Path,
+    lease_seconds: float,
+    heartbeat_seconds: float,
+    **run_kwargs: Any,
+) -> None:
+    # Each delivery writes into its own staging directory and the finished
+    # files are renamed into place, so a redelivered job racing a slow worker
+    # can never interleave rows in the output.
+    staging = output_dir / ".staging" / job.lease_token
+    artifacts: List[Path] = []
+    try:
+        with _Heartbeat(queue, job, lease_seconds, heartbeat_seconds):
+            staged = run_query(
+                job.payload["query"],
+                settings,
+                job.payload["fmt"],
+                output_dir=staging,
+                **run_kwargs,
+            )
+            # Side files such as the deferred-record listing go first, so
+            # they are in place by the time the output appears.
+            for path in sorted(staging.iterdir()):
+                if path.is_file() and path != staged:
+                    artifacts.append(output_dir / path.name)
+                    os.replace(path, artifacts[-1])
+            output = output_dir / staged.name
+            os.replace(staged, output)
+    except Exception as exc:
+        retried = queue.fail(job, repr(exc))
+        LOGGER.error(
+            "Query job %r failed on attempt %d (%s): %s",
+            job.payload["query"],
+            job.attempts,
+            "will retry" if retried else "giving up",
+            exc,
+        )
+        return
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    result = {"output": str(output), "artifacts": [str(path) for path in artifacts]}
+    if not queue.complete(job, result):
+        LOGGER.info("Query job %r was already completed by another worker", job.key)
+
+def run_worker(
+    queue: WorkQueue,
+    settings: Dict[str, Any],
+    run_query: Callable[..., Path],
+    output_dir: Path,
+    worker_id: Optional[str] = None,
+    **run_kwargs: Any,
+) -> Dict[str, int]:
+    """
+    Claim and run query jobs until none are queued or leased, then return
+    the queue's stats.
+
+    Up to ``scheduler.max_concurrent_queries`` jobs run at once, sharing one
+    ``FairExecutor`` exactly as in a local batch. While other workers hold
+    leases this worker keeps polling, so it can pick up their jobs if they
+    die; ``work_queue.lease_seconds`` is how long that takes to notice.
+    """
+    config = settings.get("work_queue") or {}
+    lease_seconds = float(config.get("lease_seconds", 60))
+    heartbeat_seconds = float(config.get("heartbeat_seconds", lease_seconds / 4))
+    poll_seconds = float(config.get("poll_seconds", 2))
+    scheduler = settings.get("scheduler") or {}
+    max_queries = max(int(scheduler.get("max_concurrent_queries", 4)), 1)
+    query_settings = dict(settings)
+    query_settings["enrich_window"] = int(scheduler.get("per_query_max_inflight", 8))
+    worker_id = worker_id or default_worker_id()
+
+    def slot(index: int) -> int:
+        done = 0
+        while True:
+            job = queue.claim(f"{worker_id}/{index}", lease_seconds, kinds=[QUERY_JOB])
+            if job is None:
+                stats = queue.stats()
+                if not stats["queued"] and not stats["leased"]:
+                    return done
+                time.sleep(poll_seconds)
+                continue
+            LOGGER.info("Worker %s running %r (attempt %d)", worker_id, job.key, job.attempts)
+            _run_query_job(
+                queue,
+                job,
+                query_settings,
+                run_query,
+                output_dir,
+                lease_seconds,
+                heartbeat_seconds,
+                executor=pool.group(f"{job.id}:{job.key}"),
+                **run_kwargs,
+            )
+            done += 1
+
+    LOGGER.info("Worker %s started with %d query slots", worker_id, max_queries)
+    with FairExecutor(
+        int(scheduler.get("global_max_inflight", 32)),
+        policy=scheduler.get("policy", "round_robin"),
+    ) as pool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_queries) as slots:
+            ran = sum(slots.map(slot, range(max_queries)))
+    stats = queue.stats()
+    LOGGER.info(
+        "Worker %s ran %d jobs; queue: %d done, %d failed",
+        worker_id,
+        ran,
+        stats["done"],
+        stats["failed"],
+    )
+    return stats
+
+QUEUE_BACKENDS = ("sqlite", "memory")
+
+def build_work_queue(settings: Dict[str, Any], output_dir: Path) -> WorkQueue:
+    config = settings.get("work_queue") or {}
+    backend = config.get("backend", "sqlite")
+    max_attempts = int(config.get("max_attempts", 3))
+    if backend == "memory":
+        return MemoryWorkQueue(max_attempts=max_attempts)
+    if backend != "sqlite":
+        raise ValueError(f"work_queue.backend must be one of: {', '.join(QUEUE_BACKENDS)}")
+    path = config.get("path") or str(output_dir / "work_queue.sqlite")
+    return SqliteWorkQueue(Path(path), max_attempts=max_attempts)
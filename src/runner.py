@@ -1,9 +1,15 @@
 import argparse
+import asyncio
+import concurrent.futures
 import json
 import logging
+import signal
 import sys
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
 
 import requests
 
@@ -13,15 +19,75 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from extractors.maps_parser import parse_maps_results  # type: ignore  # noqa: E402
-from extractors.contact_finder import enrich_business_records  # type: ignore  # noqa: E402
-from extractors.utils_format import (  # type: ignore  # noqa: E402
-    BusinessRecord,
-    record_to_dict,
+from extractors.contact_crawl import (  # type: ignore  # noqa: E402
+    ContactCrawler,
+    build_contact_crawler,
+)
+from extractors.contact_finder import (  # type: ignore  # noqa: E402
+    FailedCallback,
+    MissedCallback,
+    aiter_enriched_records,
+    enrich_business_records,
+    enrich_business_records_async,
+    iter_enriched_records,
+)
+from extractors.utils_format import BusinessRecord  # type: ignore  # noqa: E402
+from monitoring.metrics import (  # type: ignore  # noqa: E402
+    Metrics,
+    build_metrics,
+    get_metrics,
+    install_metrics,
+    serve_metrics,
+)
+from network.dns_cache import DnsCache, build_dns_cache  # type: ignore  # noqa: E402
+from network.hedging import Hedger, build_hedger  # type: ignore  # noqa: E402
+from network.http_client import (  # type: ignore  # noqa: E402
+    HttpClient,
+    HttpResponse,
+    build_async_http_client,
+    build_http_client,
+    get_default_client,
+)
+from network.rate_limit import build_rate_limiter, host_of  # type: ignore  # noqa: E402
+from network.resilience import build_resilience_policy  # type: ignore  # noqa: E402
+from network.response_cache import build_response_cache  # type: ignore  # noqa: E402
+from outputs.exporters import open_record_writer  # type: ignore  # noqa: E402
+from pipeline.cpu_pool import CpuPool, build_cpu_pool  # type: ignore  # noqa: E402
+from pipeline.scheduler import (  # type: ignore  # noqa: E402
+    GroupExecutor,
+    InflightLimit,
+    run_query_batch,
+)
+from pipeline.service import ScrapeService, serve  # type: ignore  # noqa: E402
+from pipeline.work_queue import (  # type: ignore  # noqa: E402
+    WorkQueue,
+    build_work_queue,
+    enqueue_queries,
+    run_worker,
+)
+from storage.dedup_index import DedupIndex, build_dedup_index  # type: ignore  # noqa: E402
+from storage.enrichment_cache import (  # type: ignore  # noqa: E402
+    EnrichmentCache,
+    build_enrichment_cache,
+)
+from storage.snapshot_store import (  # type: ignore  # noqa: E402
+    QuerySnapshot,
+    SnapshotStore,
+    build_snapshot_store,
+    write_delta,
+)
+from storage.run_journal import (  # type: ignore  # noqa: E402
+    RunJournal,
+    build_run_journal,
+    record_key,
 )
-from outputs.exporters import export_records  # type: ignore  # noqa: E402
 
 LOGGER = logging.getLogger("gmaps_scraper")
 
+DEFAULT_SEARCH_URL_TEMPLATE = "https://www.google.com/maps/search/{query}"
+
+T = TypeVar("T")
+
 def load_settings(path: Path) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"Settings file not found: {path}")
@@ -38,63 +104,778 @@ def load_queries_from_file(path: Path) -> List[Dict[str, Any]]:
         raise ValueError("inputs.sample.json must contain a JSON array of query objects")
     return data
 
-def fetch_search_html(query: str, user_agent: str, timeout: int) -> str:
+def search_page_url(query: str, settings: Dict[str, Any], page: int = 0) -> str:
+    """
+    URL of result page ``page`` (0-based) for ``query``.
+
+    ``search.url_template`` may use ``{query}`` and ``{start}`` (the offset of
+    the page's first result). Without ``{start}``, pages after the first get
+    ``search.page_param`` appended as a query-string parameter.
+    """
+    config = settings.get("search") or {}
+    template = config.get("url_template") or DEFAULT_SEARCH_URL_TEMPLATE
+    start = page * int(config.get("page_size", 20))
+    url = template.format(query=requests.utils.quote(query), start=start)
+    if page and "{start}" not in template:
+        url += ("&" if "?" in url else "?") + f"{config.get('page_param', 'start')}={start}"
+    return url
+
+def fetch_search_page(
+    query: str,
+    user_agent: str,
+    timeout: int,
+    client: Optional[HttpClient] = None,
+    url: Optional[str] = None,
+) -> HttpResponse:
+    """Fetch one search result page; the body is left undecoded."""
+    if client is None:
+        client = get_default_client(user_agent)
+    if url is None:
+        url = search_page_url(query, {})
+    LOGGER.info("Fetching search HTML for query=%r (%s)", query, url)
+    with get_metrics().timer("stage_seconds", stage="search_fetch"):
+        resp = client.get(url, timeout=timeout, kind="search")
+    resp.raise_for_status()
+    return resp
+
+def fetch_search_html(
+    query: str,
+    user_agent: str,
+    timeout: int,
+    client: Optional[HttpClient] = None,
+    url: Optional[str] = None,
+) -> str:
     """
     Fetch HTML for a Google Maps / Local Search query.
 
     NOTE: Real markup may differ and this function may require adjustments
     if Google changes their HTML. It is kept simple on purpose.
     """
-    url = "https://www.google.com/maps/search/" + requests.utils.quote(query)
-    headers = {"User-Agent": user_agent}
-    LOGGER.info("Fetching search HTML for query=%r", query)
-    resp = requests.get(url, headers=headers, timeout=timeout)
-    resp.raise_for_status()
-    return resp.text
+    return fetch_search_page(query, user_agent, timeout, client=client, url=url).text
 
-def build_business_records(query: str, settings: Dict[str, Any]) -> List[BusinessRecord]:
-    html = fetch_search_html(
-        query=query,
-        user_agent=settings.get(
+def _resolve_client(settings: Dict[str, Any], client: Optional[HttpClient]) -> HttpClient:
+    if client is not None:
+        return client
+    return get_default_client(
+        settings.get(
             "user_agent",
             "Mozilla/5.0 (compatible; BitbashScraper/1.0; +https://bitbash.dev)",
-        ),
-        timeout=int(settings.get("request_timeout", 15)),
+        )
     )
-    records = parse_maps_results(html)
 
-    if not records:
+def _fetch_and_parse(
+    query: str,
+    settings: Dict[str, Any],
+    client: HttpClient,
+    page: int = 0,
+    cpu_pool: Optional[CpuPool] = None,
+) -> List[BusinessRecord]:
+    timeout = int(settings.get("request_timeout", 15))
+    url = search_page_url(query, settings, page)
+    backend = settings.get("parser_backend")
+    metrics = get_metrics()
+    if cpu_pool is not None:
+        resp = fetch_search_page(query, client.user_agent, timeout, client=client, url=url)
+        with metrics.timer("stage_seconds", stage="parse"):
+            records = cpu_pool.parse(resp.content, resp.encoding, backend)
+    else:
+        html = fetch_search_html(
+            query, user_agent=client.user_agent, timeout=timeout, client=client, url=url
+        )
+        with metrics.timer("stage_seconds", stage="parse"):
+            records = parse_maps_results(html, backend=backend)
+    metrics.inc("records_parsed_total", len(records))
+
+    if not records and page == 0:
         LOGGER.warning("No business results parsed for query %r", query)
+    return records
+
+def _iter_search_pages(
+    query: str,
+    settings: Dict[str, Any],
+    client: HttpClient,
+    executor: Optional[Any] = None,
+    start_page: int = 0,
+    seen: int = 0,
+    cpu_pool: Optional[CpuPool] = None,
+) -> Iterator[Tuple[List[BusinessRecord], bool]]:
+    """
+    Yield ``(records, last)`` for each parsed result page of ``query`` until
+    ``max_results`` records (counting ``seen`` from earlier pages) or
+    ``search.max_pages`` pages. ``last`` is set when no further page will be
+    requested.
+
+    Once a page comes back full, up to ``search.prefetch_pages`` following
+    pages are fetched while the caller works on it. A short, empty or
+    repeated page ends the search. Errors on later pages end it early
+    instead of failing the query.
+    """
+    config = settings.get("search") or {}
+    max_results = settings.get("max_results")
+    limit = int(max_results) if max_results else None
+    max_pages = int(config.get("max_pages", 10))
+    page_size = int(config.get("page_size", 20))
+    ahead = max(int(config.get("prefetch_pages", 2)), 1)
+
+    owns_executor = executor is None
+    if executor is None:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=ahead)
+    pending: Deque[Tuple[int, "concurrent.futures.Future[List[BusinessRecord]]"]] = deque()
+    next_page = start_page
+    previous: Optional[List[BusinessRecord]] = None
+
+    def top_up(count: int) -> None:
+        nonlocal next_page
+        while len(pending) < count and next_page < max_pages:
+            future = executor.submit(
+                _fetch_and_parse, query, settings, client, next_page, cpu_pool
+            )
+            pending.append((next_page, future))
+            next_page += 1
+
+    try:
+        top_up(1)
+        while pending:
+            page, future = pending.popleft()
+            try:
+                records = future.result()
+            except Exception as exc:
+                if page == start_page:
+                    raise
+                LOGGER.warning("Stopping at page %d of %r: %s", page, query, exc)
+                return
+            if not records or records == previous:
+                return
+            previous = records
+            if limit is not None:
+                records = records[: max(limit - seen, 0)]
+            seen += len(records)
+            if len(previous) >= page_size and (limit is None or seen < limit):
+                top_up(ahead)
+            else:
+                for _, stale in pending:
+                    stale.cancel()
+                pending.clear()
+            LOGGER.debug("Page %d of %r: %d results", page, query, len(records))
+            if records:
+                yield records, not pending
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def _split_resolvable(
+    records: List[BusinessRecord],
+    dns_cache: DnsCache,
+) -> Tuple[List[BusinessRecord], List[BusinessRecord]]:
+    """Pre-resolve website hosts; split records into (to enrich, unresolvable)."""
+    resolvable = dns_cache.prefetch(host_of(r.website) for r in records if r.website)
+    to_enrich: List[BusinessRecord] = []
+    dropped: List[BusinessRecord] = []
+    for record in records:
+        if record.website and not resolvable.get(host_of(record.website), True):
+            dropped.append(record)
+        else:
+            to_enrich.append(record)
+    if dropped:
+        LOGGER.info("Skipping enrichment for %d records with unresolvable hosts", len(dropped))
+    return to_enrich, dropped
+
+def _split_known(
+    records: List[BusinessRecord],
+    dedup_index: DedupIndex,
+) -> Tuple[List[BusinessRecord], List[BusinessRecord]]:
+    """Add earlier sightings' contacts to records; split into (to enrich, already enriched)."""
+    to_enrich: List[BusinessRecord] = []
+    known: List[BusinessRecord] = []
+    for record in records:
+        merged, enriched = dedup_index.observe(record)
+        (known if enriched else to_enrich).append(merged)
+    if known:
+        LOGGER.info("Reusing enrichment for %d previously seen businesses", len(known))
+    return to_enrich, known
+
+def _split_journaled(
+    query: str,
+    records: List[BusinessRecord],
+    journal: RunJournal,
+) -> Tuple[List[BusinessRecord], List[BusinessRecord]]:
+    """Split records into (to enrich, enriched before an interrupted run)."""
+    done = journal.enriched_records(query)
+    if not done:
+        return records, []
+    to_enrich: List[BusinessRecord] = []
+    finished: List[BusinessRecord] = []
+    for record in records:
+        journaled = done.get(record_key(record))
+        if journaled is None:
+            to_enrich.append(record)
+        else:
+            finished.append(journaled)
+    LOGGER.info("Resuming query %r: %d records already enriched", query, len(finished))
+    return to_enrich, finished
+
+def _split_fresh(
+    records: List[BusinessRecord],
+    snapshot: QuerySnapshot,
+    carry: bool = True,
+) -> Tuple[List[BusinessRecord], List[BusinessRecord]]:
+    """
+    Split records into (to enrich, fresh). Fresh records get last run's
+    contacts unless ``carry`` is off, e.g. for ones merged from the dedup index.
+    """
+    to_enrich: List[BusinessRecord] = []
+    fresh: List[BusinessRecord] = []
+    for record in records:
+        carried, _ = snapshot.plan(record)
+        if carried is None:
+            to_enrich.append(record)
+        else:
+            fresh.append(carried if carry else record)
+    return to_enrich, fresh
+
+def _check_engine(settings: Dict[str, Any]) -> str:
+    engine = settings.get("engine", "threads")
+    if engine not in ("threads", "async"):
+        raise ValueError("engine must be one of: threads, async")
+    return engine
+
+def _deadline_budgets(settings: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """The (per-query, per-record) enrichment budgets in seconds; None when unset."""
+    config = settings.get("deadlines") or {}
+    query_seconds = config.get("query_seconds")
+    record_seconds = config.get("record_seconds")
+    return (
+        float(query_seconds) if query_seconds else None,
+        float(record_seconds) if record_seconds else None,
+    )
+
+def _async_limits(
+    settings: Dict[str, Any],
+    executor: Optional[Any],
+) -> Tuple[int, Optional[InflightLimit]]:
+    """
+    The async engine's per-query concurrency and shared in-flight limit.
+
+    Its website fetches run on the query's event loop rather than on a
+    scheduler's threads, so under a ``FairExecutor`` they take a slot of its
+    ``inflight`` limit and keep to the per-query ``enrich_window`` it sets.
+    """
+    concurrency = int(settings.get("async_concurrency", 100))
+    if not isinstance(executor, GroupExecutor):
+        return concurrency, None
+    window = settings.get("enrich_window")
+    if window:
+        concurrency = min(concurrency, int(window))
+    return concurrency, executor.inflight
+
+def build_business_records(
+    query: str,
+    settings: Dict[str, Any],
+    client: Optional[HttpClient] = None,
+    enrichment_cache: Optional[EnrichmentCache] = None,
+    hedger: Optional[Hedger] = None,
+    crawler: Optional[ContactCrawler] = None,
+) -> List[BusinessRecord]:
+    started = time.monotonic()
+    query_seconds, record_seconds = _deadline_budgets(settings)
+    client = _resolve_client(settings, client)
+    records = [
+        record
+        for page in iter_search_pages(query, settings, client)
+        for record in page
+    ]
 
     if settings.get("enrich_contacts", True):
-        records = enrich_business_records(
-            records,
+        # The search pages came out of the query's budget too.
+        query_budget = None
+        if query_seconds is not None:
+            query_budget = query_seconds - (time.monotonic() - started)
+        if _check_engine(settings) == "async":
+            # Async clients are bound to their event loop, so each run gets one.
+            async_client = build_async_http_client(
+                settings,
+                cache=client.cache,
+                stats=client.stats,
+                limiter=client.limiter,
+                resilience=client.resilience,
+            )
+            records = asyncio.run(
+                enrich_business_records_async(
+                    records,
+                    timeout=int(settings.get("request_timeout", 15)),
+                    concurrency=int(settings.get("async_concurrency", 100)),
+                    client=async_client,
+                    cache=enrichment_cache,
+                    hedger=hedger,
+                    crawler=crawler,
+                    record_budget=record_seconds,
+                    query_budget=query_budget,
+                )
+            )
+        else:
+            records = enrich_business_records(
+                records,
+                timeout=int(settings.get("request_timeout", 15)),
+                max_workers=int(settings.get("max_workers", 5)),
+                client=client,
+                cache=enrichment_cache,
+                hedger=hedger,
+                crawler=crawler,
+                record_budget=record_seconds,
+                query_budget=query_budget,
+            )
+    return records
+
+def _iterate_async(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Drive an async generator from synchronous code on a private event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())  # type: ignore[attr-defined]
+        loop.close()
+
+async def _aiter_page_records(
+    pages: Iterator[List[BusinessRecord]],
+) -> AsyncIterator[BusinessRecord]:
+    """The records of ``pages``, each page pulled on a helper thread."""
+    loop = asyncio.get_running_loop()
+    while True:
+        # Pulling the next page blocks, so it must not happen on the event loop.
+        records = await loop.run_in_executor(None, next, pages, None)
+        if records is None:
+            return
+        for record in records:
+            yield record
+
+def _aiter_enriched_with_client(
+    records: AsyncIterator[BusinessRecord],
+    settings: Dict[str, Any],
+    client: HttpClient,
+    enrichment_cache: Optional[EnrichmentCache],
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    crawler: Optional[ContactCrawler] = None,
+    record_budget: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_missed: Optional[MissedCallback] = None,
+    on_failed: Optional[FailedCallback] = None,
+    concurrency: int = 100,
+    inflight: Optional[InflightLimit] = None,
+) -> AsyncIterator[BusinessRecord]:
+    async def generate() -> AsyncIterator[BusinessRecord]:
+        async with build_async_http_client(
+            settings,
+            cache=client.cache,
+            stats=client.stats,
+            limiter=client.limiter,
+            resilience=client.resilience,
+        ) as async_client:
+            async for record in aiter_enriched_records(
+                records,
+                async_client,
+                timeout=int(settings.get("request_timeout", 15)),
+                concurrency=concurrency,
+                cache=enrichment_cache,
+                cpu_pool=cpu_pool,
+                hedger=hedger,
+                crawler=crawler,
+                record_budget=record_budget,
+                deadline=deadline,
+                on_missed=on_missed,
+                on_failed=on_failed,
+                inflight=inflight,
+            ):
+                yield record
+
+    return generate()
+
+def iter_search_pages(
+    query: str,
+    settings: Dict[str, Any],
+    client: HttpClient,
+    executor: Optional[Any] = None,
+    cpu_pool: Optional[CpuPool] = None,
+) -> Iterator[List[BusinessRecord]]:
+    """Yield parsed result pages for ``query``; see ``_iter_search_pages``."""
+    pages = _iter_search_pages(query, settings, client, executor=executor, cpu_pool=cpu_pool)
+    try:
+        for records, _ in pages:
+            yield records
+    finally:
+        pages.close()  # type: ignore[attr-defined]
+
+def _journaled_pages(
+    query: str,
+    settings: Dict[str, Any],
+    client: HttpClient,
+    executor: Optional[Any],
+    journal: RunJournal,
+    cpu_pool: Optional[CpuPool] = None,
+) -> Iterator[List[BusinessRecord]]:
+    """Replay journaled result pages, then fetch (and journal) the rest."""
+    pages, complete = journal.parsed_pages(query)
+    if pages:
+        LOGGER.info("Resuming query %r from %d journaled result pages", query, len(pages))
+    yield from pages
+    if complete:
+        return
+    fetched = _iter_search_pages(
+        query,
+        settings,
+        client,
+        executor=executor,
+        start_page=len(pages),
+        seen=sum(len(page) for page in pages),
+        cpu_pool=cpu_pool,
+    )
+    try:
+        for records, last in fetched:
+            journal.record_page(query, records)
+            if last:
+                journal.finish_search(query)
+            yield records
+    finally:
+        fetched.close()  # type: ignore[attr-defined]
+    journal.finish_search(query)
+
+def _enrich_pages_async(
+    pages: Iterator[List[BusinessRecord]],
+    settings: Dict[str, Any],
+    client: HttpClient,
+    enrichment_cache: Optional[EnrichmentCache],
+    cpu_pool: Optional[CpuPool] = None,
+    hedger: Optional[Hedger] = None,
+    crawler: Optional[ContactCrawler] = None,
+    record_budget: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_missed: Optional[MissedCallback] = None,
+    on_failed: Optional[FailedCallback] = None,
+    executor: Optional[Any] = None,
+) -> Iterator[BusinessRecord]:
+    """
+    Enrich every page of a query on one event loop with one async client,
+    so connections are reused across pages and a page's slow fetches do not
+    hold back the next page's.
+    """
+    concurrency, inflight = _async_limits(settings, executor)
+    yield from _iterate_async(
+        _aiter_enriched_with_client(
+            _aiter_page_records(pages),
+            settings,
+            client,
+            enrichment_cache,
+            cpu_pool,
+            hedger=hedger,
+            crawler=crawler,
+            record_budget=record_budget,
+            deadline=deadline,
+            on_missed=on_missed,
+            on_failed=on_failed,
+            concurrency=concurrency,
+            inflight=inflight,
+        )
+    )
+
+def iter_business_records(
+    query: str,
+    settings: Dict[str, Any],
+    client: Optional[HttpClient] = None,
+    enrichment_cache: Optional[EnrichmentCache] = None,
+    executor: Optional[Any] = None,
+    dns_cache: Optional[DnsCache] = None,
+    dedup_index: Optional[DedupIndex] = None,
+    journal: Optional[RunJournal] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    snapshot: Optional[QuerySnapshot] = None,
+    hedger: Optional[Hedger] = None,
+    crawler: Optional[ContactCrawler] = None,
+    on_deferred: Optional[MissedCallback] = None,
+) -> Iterator[BusinessRecord]:
+    """
+    Streaming form of ``build_business_records``: records are yielded as soon
+    as their enrichment finishes instead of after the whole query. Result
+    pages (see ``iter_search_pages``) feed enrichment as they arrive.
+
+    With a shared ``executor`` (see ``pipeline.scheduler``) the search fetch
+    and website fetches all run on it, under the batch's global budget; the
+    async engine's fetches stay on its event loop but keep to the same
+    global and per-query limits.
+
+    With a ``dns_cache`` every website host is resolved up front; records
+    whose host does not resolve are passed through without a fetch.
+
+    With a ``dedup_index`` each record picks up the contacts of earlier
+    sightings of the same business (keeping its own address and phone), and
+    businesses enriched before are not fetched again.
+
+    With a ``journal`` parsed results and enriched records are logged as they
+    are produced, and work journaled by an interrupted run is not redone.
+
+    With a ``cpu_pool`` page parsing and contact extraction run in worker
+    processes while fetching stays on threads or the event loop.
+
+    With a ``snapshot`` (see ``storage.snapshot_store``) only businesses that
+    are new, changed website or have stale contacts are fetched (even if the
+    dedup index has enriched them before); the rest keep the previous run's
+    contacts. Every record is reported to it.
+
+    With ``deadlines.query_seconds`` / ``deadlines.record_seconds`` set, a
+    record whose fetch runs out of budget is yielded unenriched (with the
+    snapshot's last known contacts, if any) and passed to ``on_deferred``;
+    it is not marked as enriched, so a later run fetches it again. The same
+    goes for a record whose website fetch fails, minus ``on_deferred``. A
+    ``hedger`` races slow websites against their other URL variants. A
+    ``crawler`` follows a homepage's contact pages for what it lacks.
+    """
+    query_seconds, record_seconds = _deadline_budgets(settings)
+    deadline = time.monotonic() + query_seconds if query_seconds is not None else None
+    client = _resolve_client(settings, client)
+    if journal is not None:
+        pages = _journaled_pages(query, settings, client, executor, journal, cpu_pool)
+    else:
+        pages = iter_search_pages(query, settings, client, executor=executor, cpu_pool=cpu_pool)
+
+    if not settings.get("enrich_contacts", True):
+        for records in pages:
+            if dedup_index is not None:
+                records = [dedup_index.observe(record)[0] for record in records]
+            for record in records:
+                if snapshot is not None:
+                    record = snapshot.carry_forward(record)
+                    snapshot.observe(record, refreshed=False)
+                yield record
+        return
+
+    # Records that skip enrichment wait here until the consumer next resumes.
+    # Under the async engine pages are split on a helper thread; deque
+    # appends and pops are thread-safe.
+    passthrough: Deque[BusinessRecord] = deque()
+    # Records that ran out of budget or whose fetch failed, by identity,
+    # until they come back out.
+    unfetched: Dict[int, BusinessRecord] = {}
+
+    def missed(record: BusinessRecord, budget: str) -> None:
+        unfetched[id(record)] = record
+        if on_deferred is not None:
+            on_deferred(record, budget)
+
+    def failed(record: BusinessRecord) -> None:
+        unfetched[id(record)] = record
+
+    def pending_pages() -> Iterator[List[BusinessRecord]]:
+        for records in pages:
+            known: List[BusinessRecord] = []
+            if dedup_index is not None:
+                records, known = _split_known(records, dedup_index)
+            if snapshot is not None:
+                records, fresh = _split_fresh(records, snapshot)
+                passthrough.extend(fresh)
+                # Contacts the index calls enriched may still have gone stale.
+                stale, known = _split_fresh(known, snapshot, carry=False)
+                records.extend(stale)
+            passthrough.extend(known)
+            if dns_cache is not None:
+                records, unresolvable = _split_resolvable(records, dns_cache)
+                passthrough.extend(unresolvable)
+            if journal is not None:
+                records, finished = _split_journaled(query, records, journal)
+                passthrough.extend(finished)
+            yield records
+
+    enriched: Iterator[BusinessRecord]
+    if _check_engine(settings) == "async":
+        enriched = _enrich_pages_async(
+            pending_pages(),
+            settings,
+            client,
+            enrichment_cache,
+            cpu_pool,
+            hedger=hedger,
+            crawler=crawler,
+            record_budget=record_seconds,
+            deadline=deadline,
+            on_missed=missed,
+            on_failed=failed,
+            executor=executor,
+        )
+    else:
+        window = settings.get("enrich_window")
+        enriched = iter_enriched_records(
+            (record for records in pending_pages() for record in records),
             timeout=int(settings.get("request_timeout", 15)),
             max_workers=int(settings.get("max_workers", 5)),
+            client=client,
+            cache=enrichment_cache,
+            window=int(window) if window else None,
+            executor=executor,
+            cpu_pool=cpu_pool,
+            hedger=hedger,
+            crawler=crawler,
+            record_budget=record_seconds,
+            deadline=deadline,
+            on_missed=missed,
+            on_failed=failed,
+            inflight=executor.inflight if isinstance(executor, GroupExecutor) else None,
         )
-    return records
+
+    def drain_passthrough() -> Iterator[BusinessRecord]:
+        while passthrough:
+            record = passthrough.popleft()
+            if snapshot is not None:
+                snapshot.observe(record, refreshed=False)
+            yield record
+
+    try:
+        for record in enriched:
+            yield from drain_passthrough()
+            if unfetched.pop(id(record), None) is record:
+                if snapshot is not None:
+                    record = snapshot.carry_forward(record)
+                    snapshot.observe(record, refreshed=False, deferred=True)
+                yield record
+                continue
+            if journal is not None:
+                journal.record_enriched(query, record)
+            if dedup_index is not None:
+                record = dedup_index.record_enrichment(record)
+            if snapshot is not None:
+                snapshot.observe(record, refreshed=True)
+            yield record
+        yield from drain_passthrough()
+    finally:
+        enriched.close()  # type: ignore[attr-defined]
+
+def output_base_name(query: str) -> str:
+    sanitized_query = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in query)
+    return sanitized_query[:80] or "results"
 
 def run_for_query(
     query: str,
     settings: Dict[str, Any],
     fmt: str,
     output_dir: Path,
+    client: Optional[HttpClient] = None,
+    enrichment_cache: Optional[EnrichmentCache] = None,
+    executor: Optional[Any] = None,
+    dns_cache: Optional[DnsCache] = None,
+    dedup_index: Optional[DedupIndex] = None,
+    journal: Optional[RunJournal] = None,
+    cpu_pool: Optional[CpuPool] = None,
+    snapshot_store: Optional[SnapshotStore] = None,
+    hedger: Optional[Hedger] = None,
+    crawler: Optional[ContactCrawler] = None,
 ) -> Path:
-    records = build_business_records(query, settings)
-    LOGGER.info("Parsed %d business records for %r", len(records), query)
+    if journal is not None:
+        finished = journal.finished_output(query, fmt)
+        if finished is not None:
+            LOGGER.info("Skipping finished query %r (%s)", query, finished)
+            return finished
+
+    LOGGER.info("Running query %r with format %s", query, fmt)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    sanitized_query = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in query)
-    base_name = sanitized_query[:80] or "results"
+    snapshot = snapshot_store.begin(query) if snapshot_store is not None else None
+    deferred: List[Tuple[BusinessRecord, str]] = []
 
-    output_path = export_records(
-        records=[record_to_dict(r) for r in records],
-        fmt=fmt,
-        output_dir=output_dir,
-        base_filename=base_name,
-    )
-    LOGGER.info("Exported %d records to %s", len(records), output_path)
-    return output_path
+    # Records go to disk one by one as enrichment completes.
+    metrics = get_metrics()
+    with open_record_writer(fmt, output_dir, output_base_name(query)) as writer:
+        for record in iter_business_records(
+            query,
+            settings,
+            client=client,
+            enrichment_cache=enrichment_cache,
+            executor=executor,
+            dns_cache=dns_cache,
+            dedup_index=dedup_index,
+            journal=journal,
+            cpu_pool=cpu_pool,
+            snapshot=snapshot,
+            hedger=hedger,
+            crawler=crawler,
+            on_deferred=lambda record, budget: deferred.append((record, budget)),
+        ):
+            with metrics.timer("stage_seconds", stage="export"):
+                writer.write_record(record)
+    metrics.inc("records_exported_total", writer.count, format=fmt)
+
+    if snapshot is not None:
+        changes = snapshot.finish()
+        if (settings.get("incremental") or {}).get("delta", True):
+            delta_path = write_delta(
+                output_dir / f"{output_base_name(query)}.delta.jsonl", changes
+            )
+            LOGGER.info("Wrote %d changes for %r to %s", len(changes), query, delta_path)
+
+    deferred_path = output_dir / f"{output_base_name(query)}.deferred.jsonl"
+    if deferred:
+        write_deferred(deferred_path, deferred)
+        LOGGER.warning(
+            "%d records for %r ran out of enrichment budget; listed in %s",
+            len(deferred),
+            query,
+            deferred_path,
+        )
+    elif deferred_path.exists():
+        deferred_path.unlink()
+
+    if journal is not None:
+        journal.finish(query, fmt, writer.path)
+
+    LOGGER.info("Exported %d records for %r to %s", writer.count, query, writer.path)
+    return writer.path
+
+def write_deferred(path: Path, deferred: List[Tuple[BusinessRecord, str]]) -> Path:
+    """List records exported unenriched, and the budget they ran out of, as JSON lines."""
+    with path.open("w", encoding="utf-8") as handle:
+        for record, budget in deferred:
+            entry = {"business": record.business_name, "website": record.website, "budget": budget}
+            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return path
+
+def write_master_export(dedup_index: DedupIndex, fmt: str, output_dir: Path) -> Path:
+    """Write one merged record per distinct business seen by the index."""
+    with open_record_writer(fmt, output_dir, "all_businesses") as writer:
+        for record in dedup_index.iter_records():
+            writer.write_record(record)
+    LOGGER.info("Exported %d distinct businesses to %s", writer.count, writer.path)
+    return writer.path
+
+def serve_api(settings: Dict[str, Any], **resources: Any) -> None:
+    """Serve the scrape API until interrupted (Ctrl-C or SIGTERM)."""
+    config = settings.get("service") or {}
+    service = ScrapeService(settings, iter_business_records, **resources)
+    server = serve(service, config.get("host", "127.0.0.1"), int(config.get("port", 8787)))
+    if threading.current_thread() is threading.main_thread():
+        # shutdown() waits for serve_forever(), so it cannot run on this thread.
+        signal.signal(
+            signal.SIGTERM,
+            lambda *_: threading.Thread(target=server.shutdown, daemon=True).start(),
+        )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        LOGGER.info("Stopping scrape API after %(served)d requests", service.stats())
+        server.server_close()
+        service.close()
+
+def write_metrics(metrics: Metrics, settings: Dict[str, Any], output_dir: Path) -> None:
+    """Write the Prometheus text file and the JSON run summary."""
+    config = settings.get("metrics") or {}
+    prometheus_path = Path(config.get("prometheus_path") or output_dir / "metrics.prom")
+    summary_path = Path(config.get("summary_path") or output_dir / "metrics_summary.json")
+    metrics.write_prometheus(prometheus_path)
+    metrics.write_summary(summary_path)
+    LOGGER.info("Wrote metrics to %s and %s", prometheus_path, summary_path)
 
 def configure_logging(verbosity: int) -> None:
     level = logging.WARNING
@@ -129,13 +910,40 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--format",
         dest="fmt",
-        choices=["csv", "json", "excel"],
-        help="Override the default output format (csv, json, excel).",
+        choices=["csv", "json", "jsonl", "excel", "parquet"],
+        help="Override the default output format (csv, json, jsonl, excel, parquet).",
     )
     parser.add_argument(
         "--output-dir",
         help="Override the output directory defined in the settings file.",
     )
+    parser.add_argument(
+        "--cache-only",
+        action="store_true",
+        help="Replay responses from the HTTP cache without touching the network.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its journal instead of starting over.",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Add the queries to the shared work queue and exit; workers run them.",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run queries from the shared work queue until it is drained. Queries "
+        "given with --query or --inputs are enqueued first.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a long-lived HTTP service that streams records as NDJSON "
+        "(see the 'service' settings block).",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -153,35 +961,221 @@ def main(argv: Optional[List[str]] = None) -> None:
     settings = load_settings(settings_path)
 
     default_fmt = args.fmt or settings.get("default_output_format", "csv")
-    if default_fmt not in ("csv", "json", "excel"):
-        raise ValueError("default_output_format must be one of: csv, json, excel")
+    if default_fmt not in ("csv", "json", "jsonl", "excel", "parquet"):
+        raise ValueError(
+            "default_output_format must be one of: csv, json, jsonl, excel, parquet"
+        )
 
     if args.output_dir:
         output_dir = Path(args.output_dir)
     else:
         output_dir = Path(settings.get("output_directory", "data/outputs"))
 
-    if not args.query and not args.inputs:
+    if args.serve and (args.query or args.inputs or args.enqueue or args.worker or args.resume):
+        raise SystemExit(
+            "--serve takes its queries over HTTP and cannot be combined with "
+            "--query, --inputs, --enqueue, --worker or --resume"
+        )
+
+    if not args.query and not args.inputs and not args.worker and not args.serve:
         raise SystemExit("You must provide either --query or --inputs")
 
     if args.query and args.inputs:
         raise SystemExit("Please provide either --query or --inputs, not both")
 
+    if args.resume and (args.enqueue or args.worker):
+        raise SystemExit("--resume does not apply to the work queue, which keeps its own progress")
+
+    if args.resume and not (settings.get("journal") or {}).get("enabled", False):
+        raise SystemExit("--resume requires the 'journal' settings block to be enabled")
+
+    queue_backend = (settings.get("work_queue") or {}).get("backend", "sqlite")
+    if args.enqueue and not args.worker and queue_backend == "memory":
+        raise SystemExit(
+            "--enqueue needs a shared work queue; the 'memory' backend is gone when this "
+            "process exits (use work_queue.backend 'sqlite')"
+        )
+
+    jobs: List[Tuple[str, str]] = []
     if args.query:
         LOGGER.info("Running single-query scrape")
-        run_for_query(args.query, settings, default_fmt, output_dir)
-        return
+        jobs = [(args.query, default_fmt)]
+    elif args.inputs:
+        # Multiple queries from inputs file
+        for item in load_queries_from_file(Path(args.inputs)):
+            query = item.get("query")
+            if not query:
+                LOGGER.warning("Skipping entry without 'query' field: %r", item)
+                continue
+            job = (query, item.get("format", default_fmt))
+            if job in jobs:
+                # Queries run concurrently, so a duplicate would race on the same file.
+                LOGGER.warning("Skipping duplicate query %r with format %s", *job)
+                continue
+            jobs.append(job)
+
+    queue: Optional[WorkQueue] = None
+    if args.enqueue or args.worker:
+        queue = build_work_queue(settings, output_dir)
+        if jobs:
+            enqueue_queries(queue, jobs)
+        if not args.worker:
+            LOGGER.info(
+                "Work queue: %(queued)d queued, %(leased)d leased, %(done)d done, "
+                "%(failed)d failed",
+                queue.stats(),
+            )
+            queue.close()
+            return
+
+    cache = build_response_cache(
+        settings,
+        output_dir,
+        mode="cache-only" if args.cache_only else None,
+    )
+    enrichment_cache = build_enrichment_cache(settings, output_dir)
+    limiter = build_rate_limiter(settings)
+    resilience = build_resilience_policy(settings, output_dir)
+    dns_cache = build_dns_cache(settings)
+    hedger = build_hedger(settings)
+    crawler = build_contact_crawler(settings)
+    snapshot_store = None
+    if queue is None and not args.serve:
+        dedup_index = build_dedup_index(settings, output_dir)
+        journal = build_run_journal(settings, output_dir, resume=args.resume)
+        snapshot_store = build_snapshot_store(settings, output_dir)
+    else:
+        # All per-run state: queue workers on other hosts cannot share it and
+        # a service has no run to resume, master file or delta to write.
+        dedup_index = journal = None
+    cpu_pool = build_cpu_pool(settings)
+    metrics = build_metrics(settings)
+    metrics_server = None
+    if metrics is not None:
+        install_metrics(metrics)
+        port = (settings.get("metrics") or {}).get("port")
+        if port is not None:
+            metrics_server = serve_metrics(metrics, port=int(port))
+    if args.resume and journal is not None:
+        LOGGER.info(
+            "Resuming run: %(finished)d jobs finished, %(in_flight)d queries in flight",
+            journal.stats(),
+        )
+    if dns_cache is not None:
+        dns_cache.install()
 
-    # Multiple queries from inputs file
-    queries = load_queries_from_file(Path(args.inputs))
-    for item in queries:
-        query = item.get("query")
-        if not query:
-            LOGGER.warning("Skipping entry without 'query' field: %r", item)
-            continue
-        fmt = item.get("format", default_fmt)
-        LOGGER.info("Running query %r with format %s", query, fmt)
-        run_for_query(query, settings, fmt, output_dir)
+    # One pooled client is shared by every fetch in the run.
+    try:
+        with build_http_client(
+            settings,
+            cache=cache,
+            limiter=limiter,
+            resilience=resilience,
+        ) as client:
+            if args.serve:
+                serve_api(
+                    settings,
+                    client=client,
+                    enrichment_cache=enrichment_cache,
+                    dns_cache=dns_cache,
+                    cpu_pool=cpu_pool,
+                    hedger=hedger,
+                    crawler=crawler,
+                )
+            elif queue is not None:
+                run_worker(
+                    queue,
+                    settings,
+                    run_for_query,
+                    output_dir,
+                    client=client,
+                    enrichment_cache=enrichment_cache,
+                    dns_cache=dns_cache,
+                    cpu_pool=cpu_pool,
+                    hedger=hedger,
+                    crawler=crawler,
+                )
+            else:
+                run_query_batch(
+                    jobs,
+                    settings,
+                    run_for_query,
+                    output_dir=output_dir,
+                    client=client,
+                    enrichment_cache=enrichment_cache,
+                    dns_cache=dns_cache,
+                    dedup_index=dedup_index,
+                    journal=journal,
+                    cpu_pool=cpu_pool,
+                    snapshot_store=snapshot_store,
+                    hedger=hedger,
+                    crawler=crawler,
+                )
+            if dedup_index is not None:
+                LOGGER.info(
+                    "Deduplicated %(sightings)d sightings into %(businesses)d businesses "
+                    "(%(duplicates)d duplicates)",
+                    dedup_index.stats(),
+                )
+                dedup_config = settings.get("dedup") or {}
+                if dedup_config.get("master_export", False):
+                    write_master_export(
+                        dedup_index,
+                        dedup_config.get("master_format") or default_fmt,
+                        output_dir,
+                    )
+            LOGGER.info(
+                "Transferred %(bytes_downloaded)d bytes, saved %(bytes_saved)d bytes "
+                "(%(truncated)d truncated, %(skipped)d skipped downloads)",
+                client.stats.as_dict(),
+            )
+            if limiter is not None:
+                LOGGER.debug("Per-host rate limiter state: %s", limiter.snapshot())
+            if resilience is not None:
+                LOGGER.info(
+                    "Skipped %(short_circuited)d fetches to unavailable hosts "
+                    "(%(negative_cache_size)d hosts in negative cache)",
+                    resilience.snapshot(),
+                )
+    finally:
+        if metrics is not None:
+            install_metrics(None)
+            if metrics_server is not None:
+                metrics_server.shutdown()
+                metrics_server.server_close()
+            write_metrics(metrics, settings, output_dir)
+        if cpu_pool is not None:
+            cpu_pool.shutdown()
+        if hedger is not None:
+            hedger.close()
+        if crawler is not None:
+            crawler.close()
+        if dns_cache is not None:
+            dns_cache.uninstall()
+            LOGGER.debug("DNS cache: %s", dns_cache.stats())
+        if queue is not None:
+            queue.close()
+        if journal is not None:
+            journal.close()
+        if snapshot_store is not None:
+            LOGGER.info(
+                "Incremental run: %(fresh)d businesses up to date; re-enriched %(new)d new, "
+                "%(website_changed)d with a new website and %(stale)d stale",
+                snapshot_store.stats(),
+            )
+            snapshot_store.close()
+        if dedup_index is not None:
+            dedup_index.close()
+        if cache is not None:
+            cache.close()
+        if resilience is not None:
+            resilience.close()
+        if enrichment_cache is not None:
+            LOGGER.info(
+                "Enrichment cache: %(hits)d hits, %(misses)d misses",
+                enrichment_cache.stats(),
+            )
+            enrichment_cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,280 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from extractors.utils_format import (
+    BusinessRecord,
+    dump_record,
+    load_record,
+    merge_business_records,
+    normalize_website_origin,
+)
+
+LOGGER = logging.getLogger("gmaps_scraper.dedup_index")
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+_ADDRESS_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "boulevard": "blvd",
+    "road": "rd",
+    "drive": "dr",
+    "suite": "ste",
+    "lane": "ln",
+    "place": "pl",
+    "court": "ct",
+    "highway": "hwy",
+}
+
+def _normalize_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(_NON_ALNUM.sub(" ", value.casefold()).split())
+
+def _normalize_address(value: Optional[str]) -> str:
+    words = _normalize_text(value).split()
+    return " ".join(_ADDRESS_ABBREVIATIONS.get(w, w) for w in words)
+
+def _normalize_phone(value: Optional[str]) -> str:
+    digits = "".join(c for c in value or "" if c.isdigit())
+    # Compare national numbers so "+1 555..." and "(555)..." collide.
+    return digits[-10:] if len(digits) >= 7 else ""
+
+def _hash_key(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def business_keys(record: BusinessRecord) -> List[int]:
+    """
+    Identity keys for a record: its normalized name paired with its phone and
+    with its address, or with its website when it has neither. Two records
+    that share any key are the same business. The website alone is too weak
+    an identity: every branch of a chain shares one. Keys are 64-bit hashes
+    so the index stays compact.
+    """
+    name = _normalize_text(record.business_name)
+    if not name:
+        return []
+    parts = [
+        ("phone", _normalize_phone(record.phone)),
+        ("address", _normalize_address(record.business_address)),
+    ]
+    keys = [_hash_key(f"{kind}\x1f{name}\x1f{value}") for kind, value in parts if value]
+    if keys:
+        return keys
+    website_key = _website_key(record)
+    return [website_key] if website_key is not None else []
+
+def _website_key(record: BusinessRecord) -> Optional[int]:
+    name = _normalize_text(record.business_name)
+    origin = normalize_website_origin(record.website)
+    if not name or not origin:
+        return None
+    return _hash_key(f"website\x1f{name}\x1f{origin}")
+
+def _has_listing_identity(record: BusinessRecord) -> bool:
+    return bool(_normalize_phone(record.phone) or _normalize_address(record.business_address))
+
+def _as_sighting(record: BusinessRecord, merged: BusinessRecord) -> BusinessRecord:
+    """
+    ``merged`` with the sighting's own listing fields: contacts carry over,
+    but a chain branch keeps its own address and phone.
+    """
+    return replace(
+        merged,
+        business_name=record.business_name,
+        business_address=record.business_address,
+        website=record.website,
+        phone=record.phone,
+    )
+
+def business_identity(record: BusinessRecord) -> str:
+    """
+    A single stable key per business for comparing runs: the normalized name
+    with the phone, else the address. Unlike ``business_keys`` it leaves the
+    website out, so a business that moves to a new site keeps its identity.
+    """
+    name = _normalize_text(record.business_name)
+    return name + "\x1f" + (
+        _normalize_phone(record.phone) or _normalize_address(record.business_address)
+    )
+
+class DedupIndex:
+    """
+    On-disk index of businesses seen across queries (and across runs).
+
+    Each sighting is matched on ``business_keys``; a sighting with a phone or
+    address that matches nothing may still match on name+website an entry
+    that has neither (an earlier, sparser sighting of it). Matching
+    sightings are merged into one stored record, and the ``enriched`` flag
+    lets callers fetch each business's website only once. Only hashed keys and merged
+    records are kept, in SQLite, so memory does not grow with the index.
+    """
+
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: Path, reset: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if reset and self.path.exists():
+            self.path.unlink()
+        self.sightings = 0
+        self.duplicates = 0
+
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS businesses (
+                id INTEGER PRIMARY KEY,
+                record TEXT NOT NULL,
+                sightings INTEGER NOT NULL,
+                enriched INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS business_keys (
+                key INTEGER PRIMARY KEY,
+                business_id INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def _lookup(self, key: int) -> Optional[Tuple[int, str, bool]]:
+        row = self._conn.execute(
+            "SELECT b.id, b.record, b.enriched FROM business_keys k "
+            "JOIN businesses b ON b.id = k.business_id WHERE k.key = ?",
+            (key,),
+        ).fetchone()
+        return (row[0], row[1], bool(row[2])) if row is not None else None
+
+    def _find(self, record: BusinessRecord, keys: List[int]) -> Optional[Tuple[int, str, bool]]:
+        for key in keys:
+            found = self._lookup(key)
+            if found is not None:
+                return found
+        website_key = _website_key(record)
+        if website_key is None or website_key in keys:
+            return None
+        found = self._lookup(website_key)
+        # Two listings with their own phone or address are two branches.
+        if found is not None and not _has_listing_identity(load_record(found[1])):
+            return found
+        return None
+
+    def _upsert(
+        self,
+        record: BusinessRecord,
+        enriched: bool,
+        sighting: bool,
+    ) -> Tuple[BusinessRecord, bool]:
+        keys = business_keys(record)
+        if not keys:
+            return record, False
+        with self._lock:
+            found = self._find(record, keys)
+            if found is None:
+                cursor = self._conn.execute(
+                    "INSERT INTO businesses (record, sightings, enriched) VALUES (?, ?, ?)",
+                    (dump_record(record), int(sighting), int(enriched)),
+                )
+                business_id = cursor.lastrowid
+                merged, was_enriched = record, False
+            else:
+                business_id, stored, was_enriched = found
+                merged = merge_business_records(load_record(stored), record)
+                self._conn.execute(
+                    "UPDATE businesses SET record = ?, sightings = sightings + ?, "
+                    "enriched = MAX(enriched, ?) WHERE id = ?",
+                    (dump_record(merged), int(sighting), int(enriched), business_id),
+                )
+                if sighting:
+                    self.duplicates += 1
+            # A sighting may bring new keys (e.g. a phone the first one lacked).
+            # The website key is kept too, for sightings that carry nothing else.
+            new_keys = business_keys(merged)
+            website_key = _website_key(merged)
+            if website_key is not None:
+                new_keys.append(website_key)
+            for key in new_keys:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO business_keys VALUES (?, ?)",
+                    (key, business_id),
+                )
+            if sighting:
+                self.sightings += 1
+            self._uncommitted += 1
+            if self._uncommitted >= self.COMMIT_EVERY:
+                self._conn.commit()
+                self._uncommitted = 0
+        return _as_sighting(record, merged), was_enriched
+
+    def observe(self, record: BusinessRecord) -> Tuple[BusinessRecord, bool]:
+        """
+        Record a sighting. Returns the record with the contacts of earlier
+        sightings merged in (its own name, address, phone and website are
+        kept) and whether that business has already been enriched.
+        """
+        return self._upsert(record, enriched=False, sighting=True)
+
+    def record_enrichment(self, record: BusinessRecord) -> BusinessRecord:
+        """Store an enriched record and return it merged with the index, as ``observe``."""
+        merged, _ = self._upsert(record, enriched=True, sighting=False)
+        return merged
+
+    def iter_records(self) -> Iterator[BusinessRecord]:
+        """Yield one merged record per distinct business, in first-seen order."""
+        with self._lock:
+            self._conn.commit()
+            self._uncommitted = 0
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, record FROM businesses WHERE id > ? ORDER BY id LIMIT 1000",
+                    (last_id,),
+                ).fetchall()
+            if not rows:
+                return
+            for last_id, data in rows:
+                yield load_record(data)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM businesses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sightings": self.sightings,
+            "duplicates": self.duplicates,
+            "businesses": len(self),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+def build_dedup_index(
+    settings: Dict[str, Any],
+    output_dir: Path,
+) -> Optional[DedupIndex]:
+    config = settings.get("dedup") or {}
+    if not config.get("enabled", False):
+        return None
+    path = config.get("path") or str(output_dir / ".dedup_index.sqlite")
+    # A persisted index never lets a business be enriched again, so keeping
+    # it across runs is opt-in.
+    return DedupIndex(Path(path), reset=not config.get("persist", False))
@@ -0,0 +1,119 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from extractors.utils_format import ContactInfo, normalize_website_key
+from monitoring.metrics import get_metrics
+
+LOGGER = logging.getLogger("gmaps_scraper.enrichment_cache")
+
+class EnrichmentCache:
+    """
+    Persistent map of website -> extracted contact info.
+
+    Websites are keyed on ``normalize_website_key``: http/https and www
+    variants of a URL share an entry, but two pages on one host do not, as
+    unrelated businesses often share a host (social pages, site builders).
+    Backed by a single SQLite file so results are shared across queries in a
+    run and across runs. Entries older than ``max_age_seconds`` are treated
+    as misses and get refreshed by the next successful fetch.
+    """
+
+    def __init__(self, path: Path, max_age_seconds: int = 30 * 24 * 3600):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS contacts (
+                origin TEXT PRIMARY KEY,
+                emails TEXT NOT NULL,
+                facebook TEXT,
+                instagram TEXT,
+                twitter TEXT,
+                linkedin TEXT,
+                tiktok TEXT,
+                youtube TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, website: Optional[str]) -> Optional[ContactInfo]:
+        key = normalize_website_key(website)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT emails, facebook, instagram, twitter, linkedin, tiktok, "
+                "youtube, fetched_at FROM contacts WHERE origin = ?",
+                (key,),
+            ).fetchone()
+            if row is None or time.time() - row[7] > self.max_age_seconds:
+                self.misses += 1
+                get_metrics().inc("cache_lookups_total", cache="enrichment", result="miss")
+                return None
+            self.hits += 1
+        get_metrics().inc("cache_lookups_total", cache="enrichment", result="hit")
+        return ContactInfo(
+            emails=json.loads(row[0]),
+            facebook=row[1],
+            instagram=row[2],
+            twitter=row[3],
+            linkedin=row[4],
+            tiktok=row[5],
+            youtube=row[6],
+        )
+
+    def put(self, website: Optional[str], contacts: ContactInfo) -> None:
+        key = normalize_website_key(website)
+        if key is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO contacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(contacts.emails),
+                    contacts.facebook,
+                    contacts.instagram,
+                    contacts.twitter,
+                    contacts.linkedin,
+                    contacts.tiktok,
+                    contacts.youtube,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def build_enrichment_cache(
+    settings: Dict[str, Any],
+    output_dir: Path,
+) -> Optional[EnrichmentCache]:
+    config = settings.get("enrichment_cache") or {}
+    # Opt-in: entries outlive the run, so a site's new contacts only show up
+    # once its entry is max_age_days old.
+    if not config.get("enabled", False):
+        return None
+    path = config.get("path") or str(output_dir / ".enrichment_cache.sqlite")
+    return EnrichmentCache(
+        Path(path),
+        max_age_seconds=int(float(config.get("max_age_days", 30)) * 24 * 3600),
+    )
@@ -0,0 +1,163 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from extractors.utils_format import BusinessRecord, dump_record, load_record
+
+LOGGER = logging.getLogger("gmaps_scraper.run_journal")
+
+def record_key(record: BusinessRecord) -> str:
+    """Identity of a record within one query; enrichment never changes it."""
+    return json.dumps(
+        [record.business_name, record.business_address, record.website, record.phone]
+    )
+
+class RunJournal:
+    """
+    Durable progress log for a batch run, so ``--resume`` can pick up where
+    a crashed run stopped.
+
+    Three things are journaled as they happen: each parsed page of search
+    results, each enriched record, and each finished ``(query, format)``
+    job. Every write is committed immediately; a finished job drops its
+    per-record rows, so the journal only holds in-flight work.
+    """
+
+    def __init__(self, path: Path, reset: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if reset and self.path.exists():
+            self.path.unlink()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                query TEXT NOT NULL,
+                fmt TEXT NOT NULL,
+                output TEXT NOT NULL,
+                finished_at REAL NOT NULL,
+                PRIMARY KEY (query, fmt)
+            );
+            CREATE TABLE IF NOT EXISTS parsed (
+                query TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                records TEXT NOT NULL,
+                PRIMARY KEY (query, page)
+            );
+            CREATE TABLE IF NOT EXISTS searched (
+                query TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS enriched (
+                query TEXT NOT NULL,
+                record_key TEXT NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (query, record_key)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def finished_output(self, query: str, fmt: str) -> Optional[Path]:
+        """Output path of a job that already completed, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM jobs WHERE query = ? AND fmt = ?",
+                (query, fmt),
+            ).fetchone()
+        return Path(row[0]) if row else None
+
+    def finish(self, query: str, fmt: str, output: Path) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                (query, fmt, str(output), time.time()),
+            )
+            self._conn.execute("DELETE FROM parsed WHERE query = ?", (query,))
+            self._conn.execute("DELETE FROM searched WHERE query = ?", (query,))
+            self._conn.execute("DELETE FROM enriched WHERE query = ?", (query,))
+            self._conn.commit()
+
+    def parsed_pages(self, query: str) -> Tuple[List[List[BusinessRecord]], bool]:
+        """Journaled result pages for ``query`` and whether paging had finished."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT records FROM parsed WHERE query = ? ORDER BY page",
+                (query,),
+            ).fetchall()
+            complete = self._conn.execute(
+                "SELECT 1 FROM searched WHERE query = ?",
+                (query,),
+            ).fetchone()
+        pages = [[load_record(data) for data in json.loads(row[0])] for row in rows]
+        return pages, complete is not None
+
+    def record_page(self, query: str, records: List[BusinessRecord]) -> None:
+        """Append the next page of parsed results for ``query``."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO parsed SELECT ?, COALESCE(MAX(page) + 1, 0), ? "
+                "FROM parsed WHERE query = ?",
+                (query, json.dumps([dump_record(r) for r in records]), query),
+            )
+            self._conn.commit()
+
+    def finish_search(self, query: str) -> None:
+        """Mark that every result page of ``query`` has been journaled."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO searched VALUES (?)", (query,))
+            self._conn.commit()
+
+    def enriched_records(self, query: str) -> Dict[str, BusinessRecord]:
+        """Enriched records already journaled for ``query``, by ``record_key``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_key, record FROM enriched WHERE query = ?",
+                (query,),
+            ).fetchall()
+        return {key: load_record(data) for key, data in rows}
+
+    def record_enriched(self, query: str, record: BusinessRecord) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO enriched VALUES (?, ?, ?)",
+                (query, record_key(record), dump_record(record)),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            finished = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            in_flight = self._conn.execute(
+                "SELECT COUNT(DISTINCT query) FROM parsed"
+            ).fetchone()[0]
+        return {"finished": finished, "in_flight": in_flight}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def build_run_journal(
+    settings: Dict[str, Any],
+    output_dir: Path,
+    resume: bool = False,
+) -> Optional[RunJournal]:
+    """
+    Open the run journal. A fresh run starts from an empty journal; with
+    ``resume`` the previous run's journal is kept. The journal is opt-in, as
+    it writes every parsed page and enriched record to disk.
+    """
+    config = settings.get("journal") or {}
+    if not config.get("enabled", False):
+        if resume:
+            raise ValueError("--resume requires the 'journal' settings block to be enabled")
+        return None
+    path = config.get("path") or str(output_dir / ".run_journal.sqlite")
+    return RunJournal(Path(path), reset=not resume)
@@ -0,0 +1,250 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from extractors.utils_format import (
+    BusinessRecord,
+    dump_record,
+    load_record,
+    normalize_website_origin,
+    record_to_dict,
+)
+from storage.dedup_index import business_identity
+
+LOGGER = logging.getLogger("gmaps_scraper.snapshot_store")
+
+CONTACT_FIELDS = ("emails", "facebook", "instagram", "twitter", "linkedin", "tiktok", "youtube")
+
+DAY_SECONDS = 86400
+
+FieldTimes = Dict[str, float]
+
+def _with_contacts(record: BusinessRecord, previous: BusinessRecord) -> BusinessRecord:
+    """Today's listing fields with the contacts found on an earlier run."""
+    return BusinessRecord(
+        business_name=record.business_name,
+        business_address=record.business_address,
+        website=record.website,
+        phone=record.phone,
+        emails=list(previous.emails),
+        facebook=previous.facebook,
+        instagram=previous.instagram,
+        twitter=previous.twitter,
+        linkedin=previous.linkedin,
+        tiktok=previous.tiktok,
+        youtube=previous.youtube,
+    )
+
+def _same_site(old: BusinessRecord, record: BusinessRecord) -> bool:
+    return normalize_website_origin(old.website) == normalize_website_origin(record.website)
+
+class QuerySnapshot:
+    """
+    One query's businesses as the last run left them, and the changes the
+    current run makes to them.
+
+    ``plan`` decides per record whether its website must be fetched again;
+    ``observe`` takes each final record; ``finish`` returns the delta and
+    replaces the stored snapshot. If the run fails before ``finish`` the
+    previous snapshot stays as it was.
+    """
+
+    def __init__(
+        self,
+        store: "SnapshotStore",
+        query: str,
+        previous: Dict[str, Tuple[BusinessRecord, FieldTimes]],
+    ):
+        self.store = store
+        self.query = query
+        self.previous = previous
+        self.current: Dict[str, Tuple[BusinessRecord, FieldTimes]] = {}
+        self.changes: List[Dict[str, Any]] = []
+
+    def _stale(self, times: FieldTimes, now: float) -> bool:
+        return any(
+            now - times.get(name, 0.0) > self.store.field_ttl(name) for name in CONTACT_FIELDS
+        )
+
+    def plan(self, record: BusinessRecord) -> Tuple[Optional[BusinessRecord], str]:
+        """
+        ``(None, reason)`` when the record needs enrichment (``new``,
+        ``website_changed`` or ``stale``); otherwise ``(record, "fresh")``
+        with the previous run's contacts carried over.
+        """
+        previous = self.previous.get(business_identity(record))
+        if previous is None:
+            reason = "new"
+        else:
+            old, times = previous
+            if not _same_site(old, record):
+                reason = "website_changed"
+            elif self._stale(times, self.store.clock()):
+                reason = "stale"
+            else:
+                reason = "fresh"
+        self.store.count(reason)
+        if reason != "fresh":
+            return None, reason
+        return _with_contacts(record, previous[0]), reason
+
+    def carry_forward(self, record: BusinessRecord) -> BusinessRecord:
+        """The record with its previous contacts, for runs that do not enrich."""
+        previous = self.previous.get(business_identity(record))
+        return record if previous is None else _with_contacts(record, previous[0])
+
+    def observe(self, record: BusinessRecord, refreshed: bool, deferred: bool = False) -> None:
+        """
+        Take a final record. ``refreshed`` means its website was fetched this
+        run, so every contact field counts as verified now; ``deferred``
+        means the fetch was due but ran out of time or failed, so the fields
+        keep their old verification times (none for a new website) and the
+        next run retries it.
+        """
+        key = business_identity(record)
+        if key in self.current:
+            return
+        previous = self.previous.get(key)
+        now = self.store.clock()
+        if deferred:
+            if previous is None or not _same_site(previous[0], record):
+                times = {name: 0.0 for name in CONTACT_FIELDS}
+            else:
+                times = previous[1]
+        elif refreshed or previous is None:
+            times = {name: now for name in CONTACT_FIELDS}
+        else:
+            times = previous[1]
+        self.current[key] = (record, times)
+
+        new = record_to_dict(record)
+        if previous is None:
+            self.changes.append(
+                {"change": "added", "business": record.business_name, "record": new}
+            )
+            return
+        old = record_to_dict(previous[0])
+        fields = {
+            name: {"old": old[name], "new": value}
+            for name, value in new.items()
+            if old[name] != value
+        }
+        if fields:
+            self.changes.append(
+                {"change": "changed", "business": record.business_name, "fields": fields}
+            )
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Store this run's snapshot and return its delta against the last one."""
+        for key, (record, _) in self.previous.items():
+            if key not in self.current:
+                self.changes.append(
+                    {
+                        "change": "removed",
+                        "business": record.business_name,
+                        "record": record_to_dict(record),
+                    }
+                )
+        self.store.replace(self.query, self.current)
+        return self.changes
+
+class SnapshotStore:
+    """
+    Per-query snapshots of the businesses a run exported, with the time each
+    contact field was last verified, so a re-run only refetches websites
+    that are new, changed or stale.
+
+    ``ttl_seconds`` maps contact field names (and ``default``) to how long a
+    verified value is trusted. Snapshots are loaded one query at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = dict(ttl_seconds or {})
+        self.ttl_seconds.setdefault("default", 30 * DAY_SECONDS)
+        self.clock = clock
+        self.counts = {"new": 0, "website_changed": 0, "stale": 0, "fresh": 0}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                query TEXT NOT NULL,
+                business TEXT NOT NULL,
+                record TEXT NOT NULL,
+                field_times TEXT NOT NULL,
+                PRIMARY KEY (query, business)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def field_ttl(self, name: str) -> float:
+        return self.ttl_seconds.get(name, self.ttl_seconds["default"])
+
+    def count(self, reason: str) -> None:
+        with self._lock:
+            self.counts[reason] += 1
+
+    def begin(self, query: str) -> QuerySnapshot:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT business, record, field_times FROM snapshots WHERE query = ?",
+                (query,),
+            ).fetchall()
+        previous = {
+            business: (load_record(record), json.loads(times))
+            for business, record, times in rows
+        }
+        return QuerySnapshot(self, query, previous)
+
+    def replace(self, query: str, businesses: Dict[str, Tuple[BusinessRecord, FieldTimes]]) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM snapshots WHERE query = ?", (query,))
+                self._conn.executemany(
+                    "INSERT INTO snapshots VALUES (?, ?, ?, ?)",
+                    [
+                        (query, key, dump_record(record), json.dumps(times))
+                        for key, (record, times) in businesses.items()
+                    ],
+                )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def write_delta(path: Path, changes: List[Dict[str, Any]]) -> Path:
+    """Write delta entries as JSON lines, one per added, changed or removed business."""
+    with path.open("w", encoding="utf-8") as handle:
+        for change in changes:
+            handle.write(json.dumps(change, ensure_ascii=False) + "\n")
+    return path
+
+def build_snapshot_store(settings: Dict[str, Any], output_dir: Path) -> Optional[SnapshotStore]:
+    config = settings.get("incremental") or {}
+    if not config.get("enabled", False):
+        return None
+    ttl_days = config.get("ttl_days") or {}
+    path = config.get("path") or str(output_dir / ".snapshots.sqlite")
+    return SnapshotStore(
+        Path(path),
+        ttl_seconds={name: float(days) * DAY_SECONDS for name, days in ttl_days.items()},
+    )
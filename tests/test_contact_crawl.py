@@ -0,0 +1,193 @@
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.contact_crawl import (  # type: ignore  # noqa: E402
+    ContactCrawler,
+    rank_contact_links,
+)
+from extractors.contact_finder import (  # type: ignore  # noqa: E402
+    enrich_business_records,
+    enrich_business_records_async,
+)
+from extractors.utils_format import ContactInfo, make_basic_record  # type: ignore  # noqa: E402
+from network.http_client import HttpClient  # type: ignore  # noqa: E402
+from pipeline.scheduler import InflightLimit  # type: ignore  # noqa: E402
+
+SOCIALS = " ".join(
+    f"https://{host}/shop"
+    for host in (
+        "facebook.com",
+        "instagram.com",
+        "twitter.com",
+        "linkedin.com",
+        "tiktok.com",
+        "youtube.com",
+    )
+)
+
+def test_links_are_ranked_by_keyword_and_footer():
+    page = b"""
+    <a href="/blog">Blog</a>
+    <a href="https://elsewhere.test/contact">Partner</a>
+    <a href="/team">Our team</a>
+    <a href="mailto:hi@shop.test">Mail</a>
+    <a href="/flyer-contact.pdf">Flyer</a>
+    <a href='/ueber-uns'>About us</a>
+    <footer>
+      <a href="https://www.shop.test/kontakt#form">Kontakt</a>
+      <a href="/legal"><span>Impressum</span></a>
+      <a href="/">Home</a>
+    </footer>
+    """
+    assert rank_contact_links(page, "http://shop.test/") == [
+        "https://www.shop.test/kontakt",
+        "http://shop.test/legal",
+        "http://shop.test/ueber-uns",
+        "http://shop.test/team",
+    ]
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages: Dict[str, bytes] = {}
+    requested: List[str] = []
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        self.requested.append(self.path)
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            body = b"not found: nobody@missing.test"
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        return None
+
+@pytest.fixture
+def site():
+    _SiteHandler.requested = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def _enrich(engine: str, url: str, crawler: ContactCrawler):
+    records = [make_basic_record("Shop", None, url, None)]
+    if engine == "async":
+        return asyncio.run(enrich_business_records_async(records, crawler=crawler))[0]
+    with HttpClient(timeout=5) as client:
+        return enrich_business_records(records, client=client, crawler=crawler)[0]
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_crawl_fills_in_what_the_homepage_lacks(site, engine):
+    _SiteHandler.pages = {
+        "/": (
+            f'<a href="/contact">Contact</a><a href="/missing-about">About</a>'
+            f'<a href="/blog">Blog</a> {SOCIALS}'
+        ).encode(),
+        "/contact": b"<p>Write to hello@shop.test</p>",
+    }
+    crawler = ContactCrawler(max_pages=3)
+    record = _enrich(engine, f"{site}/", crawler)
+    crawler.close()
+
+    assert record.emails == ["hello@shop.test"]
+    assert record.youtube == "https://youtube.com/shop"
+    assert "/blog" not in _SiteHandler.requested
+    # The failed page's body does not count as contact data.
+    assert "nobody@missing.test" not in record.emails
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_complete_homepage_is_not_crawled(site, engine):
+    _SiteHandler.pages = {
+        "/": f'<a href="/contact">Contact</a> owner@shop.test {SOCIALS}'.encode(),
+        "/contact": b"other@shop.test",
+    }
+    crawler = ContactCrawler(max_pages=3)
+    record = _enrich(engine, f"{site}/", crawler)
+    crawler.close()
+
+    assert record.emails == ["owner@shop.test"]
+    assert _SiteHandler.requested == ["/"]
+
+def test_site_byte_budget_cuts_the_crawl_short(site):
+    _SiteHandler.pages = {
+        "/": b'<a href="/contact">Contact</a>',
+        "/contact": b"first@shop.test " + b"x" * 2_000_000 + b" late@shop.test",
+    }
+    crawler = ContactCrawler(max_pages=1, max_site_bytes=256 * 1024)
+    with HttpClient(timeout=5) as client:
+        record = enrich_business_records(
+            [make_basic_record("Shop", None, f"{site}/", None)],
+            client=client,
+            crawler=crawler,
+        )[0]
+    crawler.close()
+
+    assert record.emails == ["first@shop.test"]
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_crawl_keeps_to_the_shared_inflight_limit(engine):
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    fetched: List[str] = []
+
+    def enter(url: str) -> None:
+        with lock:
+            fetched.append(url)
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+
+    def leave() -> None:
+        with lock:
+            state["active"] -= 1
+
+    def get(url, limit, on_chunk):
+        enter(url)
+        time.sleep(0.05)
+        leave()
+        return b"nothing here"
+
+    async def get_async(url, limit, on_chunk):
+        enter(url)
+        await asyncio.sleep(0.05)
+        leave()
+        return b"nothing here"
+
+    # One slot is the caller's and one is busy elsewhere: one is left over.
+    inflight = InflightLimit(3)
+    assert inflight.try_acquire() and inflight.try_acquire()
+    page = b'<a href="/contact">C</a><a href="/impressum">I</a><a href="/about">A</a>'
+    crawler = ContactCrawler(max_pages=3)
+    if engine == "async":
+        crawl = crawler.crawl_async("http://shop.test/", page, ContactInfo(), get_async, inflight)
+        asyncio.run(crawl)
+    else:
+        crawler.crawl("http://shop.test/", page, ContactInfo(), get, None, inflight)
+    crawler.close()
+
+    assert len(fetched) == 3
+    assert state["peak"] == 2
+    # The borrowed slot is back.
+    assert inflight.try_acquire() and not inflight.try_acquire()
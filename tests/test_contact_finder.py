@@ -0,0 +1,173 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors import contact_finder  # type: ignore  # noqa: E402
+from extractors.contact_scanner import ContactScanner, scan_contacts  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from storage.enrichment_cache import EnrichmentCache  # type: ignore  # noqa: E402
+
+SITE_HTML = """
+<html>
+  <body>
+    <a href="mailto:Info@Sunsetdental.com">Email us</a>
+    <a href="https://www.facebook.com/sunsetdentalgroup">Facebook</a>
+    <a href="https://www.instagram.com/sunsetdental">Instagram</a>
+  </body>
+</html>
+"""
+
+def _sample_records():
+    return [
+        make_basic_record(name="With Site", website="http://sunsetdental.com"),
+        make_basic_record(name="Broken Site", website="http://broken.invalid"),
+        make_basic_record(name="No Site"),
+    ]
+
+def _fake_pages(url):
+    return SITE_HTML.encode("utf-8") if "sunsetdental" in url else None
+
+def test_async_engine_matches_threaded_engine(monkeypatch):
+    pytest.importorskip("httpx")
+
+    def fake_get(url, timeout, client=None, on_chunk=None):
+        return _fake_pages(url)
+
+    async def fake_get_async(client, url, timeout, on_chunk=None):
+        await asyncio.sleep(0)
+        return _fake_pages(url)
+
+    monkeypatch.setattr(contact_finder, "_safe_get", fake_get)
+    monkeypatch.setattr(contact_finder, "_safe_get_async", fake_get_async)
+
+    threaded = contact_finder.enrich_business_records(_sample_records(), timeout=1)
+    async_records = asyncio.run(
+        contact_finder.enrich_business_records_async(_sample_records(), timeout=1)
+    )
+
+    def by_name(records):
+        return sorted(records, key=lambda r: r.business_name)
+
+    assert by_name(async_records) == by_name(threaded)
+
+    enriched = {r.business_name: r for r in async_records}["With Site"]
+    assert enriched.emails == ["info@sunsetdental.com"]
+    assert enriched.facebook == "https://www.facebook.com/sunsetdentalgroup"
+    assert enriched.instagram == "https://www.instagram.com/sunsetdental"
+
+def test_enrichment_cache_skips_network_for_known_origins(monkeypatch, tmp_path):
+    fetched = []
+
+    def fake_get(url, timeout, client=None, on_chunk=None):
+        fetched.append(url)
+        return _fake_pages(url)
+
+    monkeypatch.setattr(contact_finder, "_safe_get", fake_get)
+    cache = EnrichmentCache(tmp_path / "contacts.sqlite")
+
+    first = contact_finder.enrich_business_records(_sample_records(), timeout=1, cache=cache)
+    variant = [make_basic_record(name="Same Chain", website="https://www.SunsetDental.com/")]
+    second = contact_finder.enrich_business_records(variant, timeout=1, cache=cache)
+
+    assert sorted(fetched) == ["http://broken.invalid", "http://sunsetdental.com"]
+    assert second[0].emails == ["info@sunsetdental.com"]
+    assert second[0].facebook == {r.business_name: r for r in first}["With Site"].facebook
+    assert cache.stats() == {"hits": 1, "misses": 2}
+    cache.close()
+
+def test_enrichment_cache_keeps_pages_on_a_shared_host_apart(monkeypatch, tmp_path):
+    fetched = []
+
+    def fake_get(url, timeout, client=None, on_chunk=None):
+        fetched.append(url)
+        return f"Write to {url.rsplit('/', 1)[-1]}@mail.test".encode("utf-8")
+
+    monkeypatch.setattr(contact_finder, "_safe_get", fake_get)
+    cache = EnrichmentCache(tmp_path / "contacts.sqlite")
+    records = [
+        make_basic_record(name="Bakery", website="https://www.facebook.com/bakery"),
+        make_basic_record(name="Florist", website="https://facebook.com/florist"),
+        make_basic_record(name="Bakery", website="http://facebook.com/bakery/?utm_source=gmb"),
+    ]
+
+    enriched = [
+        contact_finder.enrich_business_records([record], timeout=1, cache=cache)[0]
+        for record in records
+    ]
+    assert [r.emails for r in enriched] == [
+        ["bakery@mail.test"],
+        ["florist@mail.test"],
+        ["bakery@mail.test"],
+    ]
+    assert fetched == ["https://www.facebook.com/bakery", "https://facebook.com/florist"]
+    cache.close()
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        SITE_HTML,
+        "Write to Info@Acme.COM or info@acme.com, not test@example.com",
+        "a@b.com@c.org and x@a.com.https://facebook.com/q",
+        '<a href="HTTPS://WWW.FACEBOOK.COM/Foo">F</a> https://x.com/acme\'',
+        "https://www.facebook.com/sharer?u=z@q.io https://facebook.com/second",
+        'xhttp://uk.linkedin.com/company/acme" https://youtu.be/abc @media @@ a@ @b.c',
+        "https://facebook.com/acme\u00a0| https://x.com/acme\u2009https://youtu.be/q\x1fz",
+    ],
+)
+def test_scan_contacts_matches_regex_extractors(page):
+    contacts = scan_contacts(page.encode("utf-8"))
+    assert contacts.emails == contact_finder._extract_emails(page)
+    assert (
+        contacts.facebook,
+        contacts.instagram,
+        contacts.twitter,
+        contacts.linkedin,
+        contacts.tiktok,
+        contacts.youtube,
+    ) == contact_finder._extract_social_links(page)
+
+def test_contact_scanner_is_chunk_size_independent():
+    page = (SITE_HTML * 3 + "<p>sales@acme.io</p> https://twitter.com/acme").encode("utf-8")
+    expected = scan_contacts(page)
+    for size in (1, 7, 64, 4096):
+        scanner = ContactScanner()
+        for i in range(0, len(page), size):
+            scanner.feed(page[i : i + size])
+        assert scanner.result() == expected
+
+def test_iter_enriched_records_bounds_in_flight_work(monkeypatch):
+    lock = threading.Lock()
+    state = {"submitted": 0, "max_ahead": 0, "yielded": 0}
+
+    def fake_enrich(record, timeout, client=None, cache=None):
+        time.sleep(0.01)
+        return record
+
+    def source():
+        for i in range(20):
+            with lock:
+                state["submitted"] += 1
+                ahead = state["submitted"] - state["yielded"]
+                state["max_ahead"] = max(state["max_ahead"], ahead)
+            yield make_basic_record(name=f"B{i}")
+
+    monkeypatch.setattr(contact_finder, "_enrich_single", fake_enrich)
+
+    names = []
+    for record in contact_finder.iter_enriched_records(source(), max_workers=2, window=4):
+        with lock:
+            state["yielded"] += 1
+        names.append(record.business_name)
+
+    assert sorted(names) == sorted(f"B{i}" for i in range(20))
+    assert state["max_ahead"] <= 5
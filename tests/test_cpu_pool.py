@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors import contact_finder  # type: ignore  # noqa: E402
+from extractors.maps_parser import parse_maps_results  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from pipeline.cpu_pool import CpuPool  # type: ignore  # noqa: E402
+
+RESULTS_HTML = """
+<div class="business-result">
+  <div class="business-name">Café Uno</div>
+  <a class="business-website" href="http://uno.test">Website</a>
+</div>
+<div class="business-result"><div class="business-name">Dos</div></div>
+"""
+
+SITE_HTML = (
+    '<a href="mailto:Hello@Uno.test">mail</a>'
+    '<a href="https://www.instagram.com/cafeuno">ig</a>'
+)
+
+@pytest.fixture(scope="module")
+def pool():
+    with CpuPool(max_workers=2) as cpu_pool:
+        yield cpu_pool
+
+def test_pool_parses_page_bytes_like_the_in_process_parser(pool):
+    data = RESULTS_HTML.encode("utf-8")
+    assert pool.parse(data, "utf-8", "lxml") == parse_maps_results(RESULTS_HTML)
+    assert pool.parse(data, "utf-8", "bs4") == parse_maps_results(RESULTS_HTML, backend="bs4")
+
+def test_enrichment_with_pool_matches_streaming_scanner(monkeypatch, pool):
+    def fake_get(url, timeout, client=None, on_chunk=None):
+        return SITE_HTML.encode("utf-8")
+
+    monkeypatch.setattr(contact_finder, "_safe_get", fake_get)
+    records = [make_basic_record("Café Uno", website="http://uno.test"), make_basic_record("Dos")]
+
+    in_process = contact_finder.enrich_business_records(records, timeout=1)
+    offloaded = contact_finder.enrich_business_records(records, timeout=1, cpu_pool=pool)
+
+    def by_name(items):
+        return sorted(items, key=lambda r: r.business_name)
+
+    assert by_name(offloaded) == by_name(in_process)
+    assert by_name(offloaded)[0].emails == ["hello@uno.test"]
+    assert by_name(offloaded)[0].instagram == "https://www.instagram.com/cafeuno"
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.contact_finder import enrich_business_records  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from network.hedging import FetchAttempt, Hedger, url_variants  # type: ignore  # noqa: E402
+from network.http_client import HttpClient  # type: ignore  # noqa: E402
+
+def test_url_variants_flip_scheme_then_www():
+    assert url_variants("https://www.shop.test/contact") == [
+        "https://www.shop.test/contact",
+        "http://www.shop.test/contact",
+        "https://shop.test/contact",
+    ]
+    assert url_variants("http://shop.test:8080/")[2] == "http://www.shop.test:8080/"
+    assert url_variants("http://127.0.0.1:8080/") == [
+        "http://127.0.0.1:8080/",
+        "https://127.0.0.1:8080/",
+    ]
+
+def _attempt(behaviour: Dict[str, Optional[float]], cancelled: List[str]):
+    """Answer each URL after its delay; None means it fails at once."""
+
+    def attempt(fetch: FetchAttempt) -> Optional[str]:
+        delay = behaviour[fetch.url]
+        if delay is None:
+            return None
+        if fetch.cancelled.wait(delay):
+            cancelled.append(fetch.url)
+            return None
+        return fetch.url
+
+    return attempt
+
+def test_slow_first_response_is_hedged_and_the_loser_cancelled():
+    hedger = Hedger(delay_seconds=0.05, max_variants=1)
+    cancelled: List[str] = []
+    behaviour = {"https://a.test/": 5.0, "http://a.test/": 0.05}
+    started = time.monotonic()
+    assert hedger.run("https://a.test/", _attempt(behaviour, cancelled)) == "http://a.test/"
+    assert time.monotonic() - started < 1.0
+
+    deadline = time.monotonic() + 5
+    while not cancelled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cancelled == ["https://a.test/"]
+    hedger.close()
+
+def test_failed_attempt_falls_back_without_waiting():
+    hedger = Hedger(delay_seconds=5.0, max_variants=2)
+    behaviour = {"https://a.test/": None, "http://a.test/": None, "https://www.a.test/": 0.0}
+    started = time.monotonic()
+    assert hedger.run("https://a.test/", _attempt(behaviour, [])) == "https://www.a.test/"
+    assert time.monotonic() - started < 1.0
+    hedger.close()
+
+def test_async_hedge_cancels_the_slow_task():
+    hedger = Hedger(delay_seconds=0.05, max_variants=1)
+    cancelled: List[str] = []
+
+    async def attempt(fetch: FetchAttempt) -> str:
+        try:
+            await asyncio.sleep(5.0 if fetch.url.startswith("https") else 0.05)
+        except asyncio.CancelledError:
+            cancelled.append(fetch.url)
+            raise
+        return fetch.url
+
+    assert asyncio.run(hedger.run_async("https://a.test/", attempt)) == "http://a.test/"
+    assert cancelled == ["https://a.test/"]
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        if self.path.startswith("/slow"):
+            time.sleep(3)
+        elif self.path.startswith("/steady"):
+            time.sleep(0.3)
+        body = b"<html><body>Mail us: hello@fast.test</body></html>"
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        return None
+
+@pytest.fixture
+def site():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_query_budget_exports_slow_sites_unenriched(monkeypatch, tmp_path: Path, site, engine):
+    records = [
+        make_basic_record("Fast", None, f"{site}/fast", None),
+        make_basic_record("Slow", None, f"{site}/slow", None),
+    ]
+
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        return list(records)
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    settings: Dict[str, Any] = {
+        "enrich_contacts": True,
+        "engine": engine,
+        "deadlines": {"query_seconds": 1.0},
+    }
+    started = time.monotonic()
+    with HttpClient(timeout=10) as client:
+        path = runner.run_for_query("q", settings, "jsonl", tmp_path, client=client)
+    assert time.monotonic() - started < 2.5
+
+    rows = {
+        row["Business Name"]: row
+        for row in map(json.loads, path.read_text(encoding="utf-8").splitlines())
+    }
+    assert rows["Fast"]["Emails"] == ["hello@fast.test"]
+    assert rows["Slow"]["Emails"] == "N/A"
+    deferred = (tmp_path / "q.deferred.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in deferred] == [
+        {"business": "Slow", "website": f"{site}/slow", "budget": "query"}
+    ]
+
+def test_record_budget_starts_when_the_fetch_starts(site):
+    # Eight 0.3s fetches on two workers queue for over a second in total,
+    # but only the 3s one takes longer than its 1s budget.
+    records = [make_basic_record(f"Shop {i}", None, f"{site}/steady/{i}", None) for i in range(8)]
+    records.append(make_basic_record("Slow", None, f"{site}/slow", None))
+    missed: List[str] = []
+    started = time.monotonic()
+    with HttpClient(timeout=5) as client:
+        enriched = enrich_business_records(
+            records,
+            max_workers=2,
+            client=client,
+            record_budget=1.0,
+            on_missed=lambda record, budget: missed.append(record.business_name),
+        )
+    assert time.monotonic() - started < 2.8
+    assert missed == ["Slow"]
+    assert all(r.emails == ["hello@fast.test"] for r in enriched if r.business_name != "Slow")
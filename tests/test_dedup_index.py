@@ -0,0 +1,146 @@
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import BusinessRecord, make_basic_record  # type: ignore  # noqa: E402
+from storage.dedup_index import (  # type: ignore  # noqa: E402
+    DedupIndex,
+    build_dedup_index,
+    business_keys,
+)
+
+def test_business_keys_normalize_name_phone_address_and_website():
+    a = make_basic_record(
+        "Smile Dental, Inc.", "12 Main Street", "https://www.smile.com/", "+1 (555) 010-2000"
+    )
+    b = make_basic_record("smile dental inc", "12 main st", "http://smile.com", "555-010-2000")
+    assert set(business_keys(a)) == set(business_keys(b))
+    assert len(business_keys(a)) == 2
+    # The website is only a key for a listing without a phone or address.
+    c = make_basic_record("Smile Dental", None, "https://smile.com")
+    assert len(business_keys(c)) == 1 and not set(business_keys(c)) & set(business_keys(a))
+    assert business_keys(make_basic_record("")) == []
+
+def test_sightings_are_merged_and_persist_across_runs(tmp_path: Path):
+    path = tmp_path / "dedup.sqlite"
+    index = DedupIndex(path)
+    first = make_basic_record("Smile Dental", "12 Main St", None, "555-010-2000")
+    merged, enriched = index.observe(first)
+    assert not enriched and merged.website is None
+
+    # Second sighting matches on name+phone and contributes a website.
+    second = make_basic_record("Smile Dental", None, "http://smile.com", "5550102000")
+    merged, _ = index.observe(second)
+    assert merged == second
+    (stored,) = index.iter_records()
+    assert stored.business_address == "12 Main St"
+    assert stored.website == "http://smile.com"
+
+    index.record_enrichment(replace(merged, emails=["hi@smile.com"]))
+    index.close()
+
+    index = DedupIndex(path)
+    # Third sighting only shares name+website, a key learned from the second.
+    third = make_basic_record("Smile Dental", None, "https://www.smile.com", None)
+    merged, enriched = index.observe(third)
+    assert enriched
+    assert merged.emails == ["hi@smile.com"]
+    assert merged.phone is None
+    assert len(index) == 1
+    assert index.stats()["duplicates"] == 1
+    index.close()
+
+    assert len(DedupIndex(path, reset=True)) == 0
+
+def test_index_starts_empty_each_run_unless_persisted(tmp_path: Path):
+    record = make_basic_record("Smile Dental", None, "http://smile.com", None)
+    for persist, expected in ((None, 0), (True, 1)):
+        config: Dict[str, Any] = {"enabled": True}
+        if persist is not None:
+            config["persist"] = persist
+        first = build_dedup_index({"dedup": config}, tmp_path)
+        first.record_enrichment(first.observe(record)[0])
+        first.close()
+        second = build_dedup_index({"dedup": config}, tmp_path)
+        assert len(second) == expected
+        second.close()
+
+def test_chain_branches_sharing_a_website_stay_apart(monkeypatch, tmp_path: Path):
+    results = {
+        "coffee downtown": [
+            make_basic_record("Starbucks", "1 Pine St", "https://starbucks.com/", "555-000-0001"),
+        ],
+        "coffee uptown": [
+            make_basic_record("Starbucks", "9 Oak Ave", "https://starbucks.com/", "555-000-0002"),
+        ],
+    }
+    monkeypatch.setattr(
+        runner, "_fetch_and_parse", lambda query, settings, client, *args: results[query]
+    )
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            yield replace(record, emails=["info@starbucks.com"])
+
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    settings: Dict[str, Any] = {"enrich_contacts": True}
+    index = DedupIndex(tmp_path / "dedup.sqlite")
+
+    for query, expected in results.items():
+        (record,) = runner.iter_business_records(
+            query, settings, client=object(), dedup_index=index
+        )
+        assert (record.business_address, record.phone) == (
+            expected[0].business_address,
+            expected[0].phone,
+        )
+    assert index.stats()["businesses"] == 2
+    assert [r.phone for r in index.iter_records()] == ["555-000-0001", "555-000-0002"]
+    index.close()
+
+def test_overlapping_queries_enrich_each_business_once(monkeypatch, tmp_path: Path):
+    results = {
+        "q1": [
+            make_basic_record("A", None, "http://a.test", None),
+            make_basic_record("B", None, "http://b.test", None),
+        ],
+        "q2": [
+            make_basic_record("B", None, "http://www.b.test/", "555-000-1111"),
+            make_basic_record("C", None, "http://c.test", None),
+        ],
+    }
+    monkeypatch.setattr(
+        runner, "_fetch_and_parse", lambda query, settings, client, *args: results[query]
+    )
+    fetched: List[str] = []
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            fetched.append(record.business_name)
+            yield replace(record, emails=[f"{record.business_name.lower()}@mail.test"])
+
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    settings: Dict[str, Any] = {"enrich_contacts": True}
+    index = DedupIndex(tmp_path / "dedup.sqlite")
+
+    out = {
+        query: list(
+            runner.iter_business_records(query, settings, client=object(), dedup_index=index)
+        )
+        for query in results
+    }
+    assert fetched == ["A", "B", "C"]
+    b_in_q2 = next(r for r in out["q2"] if r.business_name == "B")
+    assert b_in_q2.emails == ["b@mail.test"] and b_in_q2.phone == "555-000-1111"
+
+    path = runner.write_master_export(index, "jsonl", tmp_path)
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+    index.close()
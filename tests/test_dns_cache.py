@@ -0,0 +1,119 @@
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import BusinessRecord, make_basic_record  # type: ignore  # noqa: E402
+from network.dns_cache import DnsCache  # type: ignore  # noqa: E402
+from network.http_client import HttpClient  # type: ignore  # noqa: E402
+
+class StubResolver:
+    """Answers ``*.test`` names with loopback after a fixed delay."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, host: str, port: int):
+        with self._lock:
+            self.calls.append(host)
+        time.sleep(self.delay)
+        if not host.endswith(".test") or host.startswith("dead"):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+def test_prefetch_dedupes_and_resolves_concurrently():
+    resolver = StubResolver(delay=0.2)
+    dns = DnsCache(resolver=resolver, max_workers=8)
+    hosts = ["a.test", "b.test", "A.test", "c.test", "dead.test", "a.test"]
+
+    started = time.monotonic()
+    result = dns.prefetch(hosts)
+    elapsed = time.monotonic() - started
+
+    assert result == {"a.test": True, "b.test": True, "c.test": True, "dead.test": False}
+    assert sorted(resolver.calls) == ["a.test", "b.test", "c.test", "dead.test"]
+    assert elapsed < 0.6  # four lookups overlapped instead of 0.8s serially
+
+    # Answers, including the failure, are served from the cache afterwards.
+    dns.prefetch(hosts)
+    assert dns.resolve("b.test") is not None
+    assert dns.resolve("dead.test") is None
+    assert len(resolver.calls) == 4
+
+def test_entries_expire_after_ttl():
+    resolver = StubResolver()
+    dns = DnsCache(resolver=resolver, ttl=0.05, negative_ttl=0.05)
+    dns.resolve("a.test")
+    dns.resolve("a.test")
+    time.sleep(0.1)
+    dns.resolve("a.test")
+    assert resolver.calls == ["a.test", "a.test"]
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        body = self.headers.get("Host", "").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+def test_installed_cache_serves_http_client_lookups():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    port = httpd.server_address[1]
+    resolver = StubResolver()
+    try:
+        with DnsCache(resolver=resolver) as dns:
+            dns.prefetch(["shop.test"])
+            with HttpClient(timeout=5) as client:
+                resp = client.get(f"http://shop.test:{port}/")
+        assert resp.text == f"shop.test:{port}"
+        assert resolver.calls == ["shop.test"]
+        assert socket.getaddrinfo is not dns.getaddrinfo
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+def test_unresolvable_hosts_skip_enrichment(monkeypatch):
+    records = [
+        make_basic_record("Live", "1 Street", "http://live.test", None),
+        make_basic_record("Dead", "2 Street", "http://dead.test/", None),
+        make_basic_record("Offline", "3 Street", None, None),
+    ]
+    monkeypatch.setattr(runner, "_fetch_and_parse", lambda query, settings, client, *args: records)
+    enriched: List[str] = []
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            enriched.append(record.business_name)
+            yield record
+
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    settings: Dict[str, Any] = {"enrich_contacts": True}
+    dns = DnsCache(resolver=StubResolver())
+
+    names = [
+        r.business_name
+        for r in runner.iter_business_records("q", settings, client=object(), dns_cache=dns)
+    ]
+    assert sorted(names) == ["Dead", "Live", "Offline"]
+    assert enriched == ["Live", "Offline"]
@@ -0,0 +1,146 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from network.http_client import (  # type: ignore  # noqa: E402
+    DownloadLimits,
+    HttpClient,
+    HttpError,
+    UnsupportedContentError,
+)
+from network.response_cache import CacheMissError, ResponseCache  # type: ignore  # noqa: E402
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen = []
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        self.seen.append((self.client_address[1], self.headers.get("User-Agent")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        status = 404 if self.path == "/missing" else 200
+        body = b"<html>ok</html>"
+        content_type = "text/html; charset=utf-8"
+        if self.path == "/big":
+            body = b"<p>filler text</p>\n" * 50000
+        elif self.path == "/brochure.pdf":
+            body = b"%PDF-1.4" + b"0" * 10000
+            content_type = "application/pdf"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+@pytest.fixture
+def server():
+    _Handler.seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_http_client_reuses_connections_and_sends_user_agent(server):
+    with HttpClient(user_agent="TestAgent/1.0", timeout=5) as client:
+        for _ in range(3):
+            resp = client.get(server + "/")
+            assert resp.status_code == 200
+            assert resp.text == "<html>ok</html>"
+
+        with pytest.raises(HttpError):
+            client.get(server + "/missing").raise_for_status()
+
+    ports = {port for port, _ in _Handler.seen}
+    agents = {agent for _, agent in _Handler.seen}
+    assert len(ports) == 1
+    assert agents == {"TestAgent/1.0"}
+
+def test_response_cache_serves_fresh_entries_and_revalidates_stale_ones(server, tmp_path):
+    cache = ResponseCache(tmp_path, ttls={"website": 3600, "search": 0})
+    with HttpClient(timeout=5, cache=cache) as client:
+        first = client.get(server + "/page")
+        second = client.get(server + "/page")
+        assert not first.from_cache
+        assert second.from_cache and second.text == first.text
+        assert len(_Handler.seen) == 1
+
+        client.get(server + "/results", kind="search")
+        revalidated = client.get(server + "/results", kind="search")
+        assert revalidated.status_code == 200
+        assert revalidated.text == "<html>ok</html>"
+        assert len(_Handler.seen) == 3
+    cache.close()
+
+    offline = ResponseCache(tmp_path, mode="cache-only")
+    with HttpClient(timeout=5, cache=offline) as client:
+        assert client.get(server + "/results").from_cache
+        with pytest.raises(CacheMissError):
+            client.get(server + "/never-fetched")
+    assert len(_Handler.seen) == 3
+    offline.close()
+
+def test_response_cache_evicts_least_recently_used(server, tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=40)
+    with HttpClient(timeout=5, cache=cache) as client:
+        client.get(server + "/a")
+        client.get(server + "/b")
+        client.get(server + "/a")
+        client.get(server + "/c?x=1")
+    assert cache.total_bytes <= 40
+    assert cache.lookup(server + "/b") == (None, None)
+    cache.close()
+
+def test_download_limits_truncate_skip_and_stop_early(server):
+    limits = DownloadLimits(
+        max_bytes=100 * 1024,
+        allowed_content_types=("text/",),
+        stop_when_complete=True,
+        chunk_size=8 * 1024,
+    )
+    with HttpClient(timeout=5, download_limits=limits) as client:
+        capped = client.get(server + "/big")
+        assert capped.truncated
+        assert len(capped.content) == 100 * 1024
+
+        with pytest.raises(UnsupportedContentError):
+            client.get(server + "/brochure.pdf")
+
+        seen = []
+        early = client.get(server + "/big", on_chunk=lambda chunk: seen.append(chunk) or True)
+        assert early.truncated
+        assert len(seen) == 1 and early.content == seen[0]
+
+        search = client.get(server + "/big", kind="search")
+        assert not search.truncated
+
+    stats = client.stats.as_dict()
+    assert stats["truncated"] == 2
+    assert stats["skipped"] == 1
+    assert stats["bytes_saved"] > 1500000
+
+def test_response_cache_does_not_store_truncated_bodies(server, tmp_path):
+    cache = ResponseCache(tmp_path)
+    limits = DownloadLimits(max_bytes=1024, chunk_size=512)
+    with HttpClient(timeout=5, cache=cache, download_limits=limits) as client:
+        assert client.get(server + "/big").truncated
+        assert cache.lookup(server + "/big") == (None, None)
+        assert not client.get(server + "/big").from_cache
+    cache.close()
@@ -0,0 +1,141 @@
+import json
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from monitoring.metrics import (  # type: ignore  # noqa: E402
+    Histogram,
+    Metrics,
+    NullMetrics,
+    get_metrics,
+    install_metrics,
+    serve_metrics,
+)
+from network.http_client import HttpClient, HttpError  # type: ignore  # noqa: E402
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        status = 404 if self.path == "/missing" else 200
+        if self.path.startswith("/search"):
+            body = (
+                '<html><body><div class="business-result">'
+                '<div class="business-name">Biz</div></div></body></html>'
+            ).encode("utf-8")
+        else:
+            body = b"<html>" + b"x" * 1000 + b"</html>"
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics()
+    install_metrics(metrics)
+    yield metrics
+    install_metrics(None)
+
+def test_metrics_are_a_no_op_until_installed():
+    active = get_metrics()
+    assert type(active) is NullMetrics
+    assert not active.enabled
+    with active.timer("stage_seconds", stage="parse"):
+        active.inc("records_parsed_total", 3)
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5))
+    for value in [0.05] * 50 + [0.15] * 40 + [0.4] * 10:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert 0.1 < histogram.quantile(0.9) <= 0.2
+    assert 0.2 < histogram.quantile(0.99) <= 0.5
+    assert Histogram().quantile(0.5) is None
+
+def test_prometheus_text_and_summary(metrics):
+    metrics.inc("http_responses_total", host="a.test", status=200)
+    metrics.inc("http_responses_total", 2, host="a.test", status=200)
+    metrics.observe("stage_seconds", 0.02, stage="parse")
+    text = metrics.to_prometheus()
+    assert "# TYPE gmaps_http_responses_total counter" in text
+    assert 'gmaps_http_responses_total{host="a.test",status="200"} 3' in text
+    assert 'gmaps_stage_seconds_bucket{stage="parse",le="0.025"} 1' in text
+    assert 'gmaps_stage_seconds_bucket{stage="parse",le="+Inf"} 1' in text
+    assert 'gmaps_stage_seconds_count{stage="parse"} 1' in text
+
+    summary = metrics.summary()
+    assert summary["counters"]['http_responses_total{host="a.test",status="200"}'] == 3
+    assert summary["histograms"]['stage_seconds{stage="parse"}']["count"] == 1
+
+def test_http_client_records_latency_status_errors_and_bytes(server, metrics):
+    with HttpClient(timeout=5) as client:
+        client.get(f"{server}/page")
+        with pytest.raises(HttpError):
+            client.get(f"{server}/missing").raise_for_status()
+        with pytest.raises(Exception):
+            client.get("http://127.0.0.1:1/refused")
+
+    host = "127.0.0.1"
+    assert metrics.counter_value("http_responses_total", host=host, status=200) == 1
+    assert metrics.counter_value("http_responses_total", host=host, status=404) == 1
+    assert metrics.counter_value("http_errors_total", host=host, error="connection") == 1
+    assert metrics.counter_value("http_bytes_downloaded_total") >= 2 * 1013
+    assert metrics.summary()["histograms"]['http_request_seconds{host="127.0.0.1"}']["count"] == 3
+
+def test_metrics_endpoint_serves_prometheus_text(metrics):
+    metrics.inc("records_exported_total", 5, format="csv")
+    server = serve_metrics(metrics, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'gmaps_records_exported_total{format="csv"} 5' in body
+
+def test_main_writes_prometheus_file_and_summary(server, tmp_path: Path):
+    settings = {
+        "enrich_contacts": False,
+        "search": {"url_template": f"{server}/search?q={{query}}"},
+        "metrics": {"enabled": True},
+    }
+    config = tmp_path / "settings.json"
+    config.write_text(json.dumps(settings), encoding="utf-8")
+    out = tmp_path / "out"
+
+    runner.main(["--query", "pizza", "--config", str(config), "--output-dir", str(out)])
+
+    assert type(get_metrics()) is NullMetrics
+    assert 'gmaps_stage_seconds_count{stage="search_fetch"} 1' in (
+        out / "metrics.prom"
+    ).read_text(encoding="utf-8")
+    summary = json.loads((out / "metrics_summary.json").read_text(encoding="utf-8"))
+    assert summary["counters"]['records_exported_total{format="csv"}'] == 1
+    assert summary["histograms"]['stage_seconds{stage="parse"}']["count"] == 1
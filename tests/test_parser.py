@@ -1,5 +1,8 @@
 import sys
 from pathlib import Path
+from typing import List
+
+import pytest
 
 # Ensure src is importable
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -41,4 +44,51 @@ def test_parse_maps_results_basic():
 
     second = record_to_dict(records[1])
     assert second["Business Name"] == "Oceanview Dentistry"
-    assert second["Business Address"] == "456 Ocean Ave, Los Angeles, CA"
\ No newline at end of file
+    assert second["Business Address"] == "456 Ocean Ave, Los Angeles, CA"
+EDGE_CASES = [
+    SAMPLE_HTML,
+    "",
+    "<!-- x -->",
+    # Nested text, comments and entities are flattened the same way.
+    '<div class="business-result"><div class="business-name"> Acme <!-- x --> <b>Co</b>\n'
+    '</div><a class="business-website" href="">w</a><div class="business-phone">&nbsp;</div></div>',
+    # Name fallbacks: aria-label link, then <strong>; multi-class nodes.
+    '<div class="business-result card"><strong>Bold</strong>'
+    '<a aria-label="x">Link <i>t</i></a></div>'
+    '<div class="business-result"><strong>Only strong</strong></div>'
+    '<div class="business-result"><div class="business-phone">nameless</div></div>',
+    # Fallback result selector.
+    '<div data-result-type="business"><a aria-label="a"> Aria </a>'
+    '<div class="business-address">1 Road</div></div>',
+    # Nested result blocks.
+    '<div class="business-result"><div class="business-result">'
+    '<div class="business-name">Inner</div></div><div class="business-name">Outer</div></div>',
+    # Script/style/template text is not part of a field's text.
+    '<div class="business-result"><div class="business-name"><script>var a=1</script>N'
+    "<style>p{}</style><template><b>T</b></template></div></div>",
+    '<?xml version="1.0" encoding="utf-8"?><div class="business-result">'
+    '<div class="business-name">Café ☕</div></div>',
+]
+
+def _available_backends() -> List[str]:
+    backends = ["lxml"]
+    try:
+        import selectolax  # type: ignore  # noqa: F401
+    except ImportError:
+        return backends
+    return backends + ["selectolax"]
+
+@pytest.mark.filterwarnings("ignore::bs4.XMLParsedAsHTMLWarning")
+@pytest.mark.parametrize("backend", _available_backends())
+@pytest.mark.parametrize("html", EDGE_CASES)
+def test_parser_backends_match_bs4(backend, html):
+    assert parse_maps_results(html, backend=backend) == parse_maps_results(html, backend="bs4")
+
+def test_lxml_backend_matches_bs4_on_malformed_markup():
+    # selectolax builds an HTML5 tree and may repair this differently.
+    html = '<table><div class="business-result"><td class="business-name">T</td></div></table>'
+    assert parse_maps_results(html, backend="lxml") == parse_maps_results(html, backend="bs4")
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        parse_maps_results(SAMPLE_HTML, backend="regex")
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from network.rate_limit import (  # type: ignore  # noqa: E402
+    HostRateLimiter,
+    HostState,
+    RateLimitConfig,
+    parse_retry_after,
+)
+
+def test_token_bucket_paces_requests_after_burst():
+    state = HostState(RateLimitConfig(requests_per_second=2.0, burst=2, initial_concurrency=10))
+    now = state.last_refill
+    assert state.try_acquire(now) == 0.0
+    assert state.try_acquire(now) == 0.0
+    assert state.try_acquire(now) == pytest.approx(0.5)
+    assert state.try_acquire(now + 0.5) == 0.0
+
+def test_aimd_backs_off_on_throttle_and_recovers_additively():
+    config = RateLimitConfig(
+        requests_per_second=0,
+        initial_concurrency=8,
+        min_concurrency=1,
+        max_concurrency=16,
+    )
+    state = HostState(config)
+    state.release(100.0, 429, latency=0.1, retry_after=3)
+    assert state.limit == 4
+    assert state.blocked_until == 103.0
+    assert state.try_acquire(101.0) == pytest.approx(2.0)
+
+    # A burst of throttled replies within a second only halves once.
+    state.release(100.5, 503, latency=0.1, retry_after=None)
+    assert state.limit == 4
+
+    for _ in range(4):
+        state.release(104.0, 200, latency=0.1, retry_after=None)
+    assert 4.9 < state.limit < 5.1
+
+    state.release(106.0, 200, latency=config.slow_response_seconds + 1, retry_after=None)
+    assert state.limit < 2.6
+
+def test_limiter_snapshot_and_retry_after_parsing():
+    limiter = HostRateLimiter(RateLimitConfig(requests_per_second=0))
+    limiter.acquire("example.com")
+    limiter.release("example.com", 429, latency=0.2, retry_after="7")
+    snapshot = limiter.snapshot()["example.com"]
+    assert snapshot["throttled"] == 1
+    assert snapshot["in_flight"] == 0
+    assert 6 < snapshot["blocked_for"] <= 7
+
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0) == 10.0
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,67 @@
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.utils_format import (  # type: ignore  # noqa: E402
+    BusinessRecord,
+    RecordBatch,
+    make_basic_record,
+    record_to_dict,
+    record_to_row,
+)
+from outputs.exporters import DEFAULT_HEADERS, CsvWriter  # type: ignore  # noqa: E402
+
+def _records():
+    full = BusinessRecord(
+        business_name="Full",
+        business_address="1 Road",
+        website="https://full.test",
+        phone="555",
+        emails=["a@full.test", "b@full.test"],
+        facebook="https://facebook.com/full",
+        instagram=None,
+        twitter="https://x.com/full",
+        linkedin=None,
+        tiktok=None,
+        youtube="https://youtu.be/full",
+    )
+    return [full, make_basic_record("Bare")]
+
+def test_business_record_is_slotted_frozen_and_picklable():
+    record = _records()[0]
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.phone = "other"  # type: ignore[misc]
+    assert pickle.loads(pickle.dumps(record)) == record
+
+def test_row_serializer_matches_dict_conversion():
+    for record in _records():
+        as_dict = record_to_dict(record)
+        assert list(as_dict) == DEFAULT_HEADERS
+        assert record_to_row(record) == tuple(as_dict.values())
+    assert record_to_dict(_records()[1])["Emails"] == "N/A"
+
+def test_record_batch_round_trips_and_yields_rows():
+    batch = RecordBatch(_records())
+    assert len(batch) == 2
+    assert list(batch) == _records()
+    assert list(batch.rows()) == [record_to_row(r) for r in _records()]
+    assert batch.columns["business_name"] == ["Full", "Bare"]
+
+def test_csv_row_path_writes_the_same_file_as_dicts(tmp_path: Path):
+    with CsvWriter(tmp_path / "dicts.csv") as writer:
+        for record in _records():
+            writer.write(record_to_dict(record))
+    with CsvWriter(tmp_path / "rows.csv") as writer:
+        for record in _records():
+            writer.write_record(record)
+    assert writer.count == 2
+    assert (tmp_path / "rows.csv").read_bytes() == (tmp_path / "dicts.csv").read_bytes()
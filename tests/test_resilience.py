@@ -0,0 +1,149 @@
+import asyncio
+import socket
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from network.http_client import AsyncHttpClient, HttpClient  # type: ignore  # noqa: E402
+from network.rate_limit import host_of  # type: ignore  # noqa: E402
+from network.resilience import (  # type: ignore  # noqa: E402
+    CircuitBreaker,
+    HostUnavailableError,
+    NegativeCache,
+    ResiliencePolicy,
+    RetryPolicy,
+    classify_failure,
+)
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    calls = 0
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        type(self).calls += 1
+        status = 503 if type(self).calls <= 2 else 200
+        body = b"<html>recovered</html>"
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+def _wrapped(inner):
+    try:
+        raise RuntimeError("outer") from inner
+    except RuntimeError as exc:
+        return exc
+
+def test_classify_failure_walks_exception_chain():
+    assert classify_failure(_wrapped(socket.gaierror(-2, "Name or service not known"))) == "dns"
+    assert classify_failure(_wrapped(ssl.SSLCertVerificationError("bad cert"))) == "tls"
+    assert classify_failure(_wrapped(socket.timeout("timed out"))) == "timeout"
+    assert classify_failure(_wrapped(ConnectionRefusedError(111, "refused"))) == "connection"
+    assert classify_failure(ValueError("unrelated")) is None
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+    breaker.record_failure(0.0)
+    assert breaker.allow(0.0)
+    breaker.record_failure(1.0)
+    assert breaker.state == "open"
+    assert not breaker.allow(5.0)
+    assert breaker.allow(11.0)
+    assert breaker.state == "half-open"
+    assert not breaker.allow(11.0)
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_negative_cache_persists_until_expiry(tmp_path):
+    cache = NegativeCache(tmp_path / "dead.sqlite", ttls={"dns": 3600, "timeout": 0})
+    cache.record("dead.example", "dns")
+    cache.record("slow.example", "timeout")
+    cache.close()
+
+    reopened = NegativeCache(tmp_path / "dead.sqlite")
+    assert reopened.lookup("dead.example") == "dns"
+    assert reopened.lookup("slow.example") is None
+    reopened.close()
+
+def test_client_retries_transient_statuses_and_skips_dead_hosts(tmp_path):
+    _FlakyHandler.calls = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    policy = ResiliencePolicy(
+        retry=RetryPolicy(max_attempts=3, base_delay=0.0),
+        negative_cache=NegativeCache(tmp_path / "dead.sqlite"),
+    )
+    try:
+        with HttpClient(timeout=5, resilience=policy) as client:
+            response = client.get(f"http://127.0.0.1:{httpd.server_address[1]}/")
+            assert response.status_code == 200
+            assert _FlakyHandler.calls == 3
+
+            # Nothing listens on port 9 locally: connection refused, retried, then remembered.
+            with pytest.raises(Exception) as first:
+                client.get("http://localhost:9/")
+            assert not isinstance(first.value, HostUnavailableError)
+            with pytest.raises(HostUnavailableError):
+                client.get("http://localhost:9/other")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        policy.close()
+
+    assert policy.snapshot()["short_circuited"] == 1
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        time.sleep(2)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        return None
+
+def test_cancelled_half_open_probe_lets_the_next_request_probe():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    host = host_of(url)
+    policy = ResiliencePolicy(failure_threshold=1, reset_seconds=0.0)
+    policy.after_response(host, 503, attempt=99)
+
+    async def cancel_probe() -> None:
+        async with AsyncHttpClient(timeout=5, resilience=policy) as client:
+            probe = asyncio.ensure_future(client.get(url))
+            await asyncio.sleep(0.2)
+            assert policy.snapshot()["open_circuits"] == {host: "half-open"}
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+    try:
+        asyncio.run(cancel_probe())
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert policy.before_request(host, "website") is True
@@ -0,0 +1,95 @@
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import BusinessRecord, make_basic_record  # type: ignore  # noqa: E402
+from storage.run_journal import RunJournal, build_run_journal  # type: ignore  # noqa: E402
+
+RECORDS = [make_basic_record(name, None, f"http://{name.lower()}.test", None) for name in "ABCD"]
+
+class Crash(Exception):
+    pass
+
+def _install_fakes(monkeypatch, searches: List[str], fetched: List[str], crash_after=None):
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        searches.append(query)
+        return list(RECORDS)
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            if crash_after is not None and len(fetched) == crash_after:
+                raise Crash()
+            fetched.append(record.business_name)
+            yield replace(record, emails=[f"{record.business_name.lower()}@mail.test"])
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+
+def test_resume_skips_finished_work(monkeypatch, tmp_path: Path):
+    settings: Dict[str, Any] = {"enrich_contacts": True}
+    journal_path = tmp_path / "journal.sqlite"
+    searches: List[str] = []
+    fetched: List[str] = []
+
+    # First run finishes query "done" and dies halfway through "q".
+    journal = RunJournal(journal_path)
+    _install_fakes(monkeypatch, searches, fetched)
+    done_path = runner.run_for_query(
+        "done", settings, "jsonl", tmp_path, client=object(), journal=journal
+    )
+    _install_fakes(monkeypatch, searches, fetched, crash_after=len(fetched) + 2)
+    with pytest.raises(Crash):
+        runner.run_for_query("q", settings, "jsonl", tmp_path, client=object(), journal=journal)
+    journal.close()
+    assert searches == ["done", "q"]
+    assert fetched == ["A", "B", "C", "D", "A", "B"]
+
+    # The resumed run fetches neither search page again and enriches only C and D.
+    searches.clear()
+    fetched.clear()
+    journal = RunJournal(journal_path)
+    _install_fakes(monkeypatch, searches, fetched)
+    resumed_done = runner.run_for_query(
+        "done", settings, "jsonl", tmp_path, client=object(), journal=journal
+    )
+    assert resumed_done == done_path
+    path = runner.run_for_query("q", settings, "jsonl", tmp_path, client=object(), journal=journal)
+    assert searches == []
+    assert fetched == ["C", "D"]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+    assert "a@mail.test" in path.read_text(encoding="utf-8")
+    assert journal.stats() == {"finished": 2, "in_flight": 0}
+    journal.close()
+
+def test_fresh_run_resets_the_journal(tmp_path: Path):
+    settings: Dict[str, Any] = {"journal": {"enabled": True}}
+    journal = build_run_journal(settings, tmp_path)
+    journal.finish("q", "csv", tmp_path / "q.csv")
+    journal.close()
+
+    journal = build_run_journal(settings, tmp_path, resume=True)
+    assert journal.finished_output("q", "csv") == tmp_path / "q.csv"
+    journal.close()
+
+    journal = build_run_journal(settings, tmp_path)
+    assert journal.finished_output("q", "csv") is None
+    journal.close()
+
+    with pytest.raises(ValueError):
+        build_run_journal({}, tmp_path, resume=True)
+
+def test_cli_rejects_resume_without_a_journal(tmp_path: Path):
+    config = tmp_path / "settings.json"
+    config.write_text("{}", encoding="utf-8")
+    with pytest.raises(SystemExit, match="'journal' settings block"):
+        runner.main(["--resume", "--query", "pizza", "--config", str(config)])
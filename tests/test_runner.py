@@ -1,3 +1,5 @@
+import json
+import subprocess
 import sys
 from pathlib import Path
 from typing import Any, Dict, List
@@ -11,8 +13,16 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 import runner  # type: ignore  # noqa: E402
-from extractors.utils_format import BusinessRecord, record_to_dict  # type: ignore  # noqa: E402
-from outputs.exporters import export_records  # type: ignore  # noqa: E402
+from extractors.utils_format import (  # type: ignore  # noqa: E402
+    BusinessRecord,
+    make_basic_record,
+    record_to_dict,
+)
+from outputs.exporters import (  # type: ignore  # noqa: E402
+    DEFAULT_HEADERS,
+    export_records,
+    open_record_writer,
+)
 
 SAMPLE_HTML = """
 <html>
@@ -36,12 +46,16 @@ class DummyResponse:
 
 def test_build_business_records_uses_parser_and_enrichment(monkeypatch):
     # Patch fetch_search_html to avoid real network calls
-    monkeypatch.setattr(runner, "fetch_search_html", lambda q, user_agent, timeout: SAMPLE_HTML)
+    monkeypatch.setattr(
+        runner, "fetch_search_html", lambda q, user_agent, timeout, **kwargs: SAMPLE_HTML
+    )
 
     # Patch enrich_business_records to avoid hitting websites and to verify call
     captured_records: List[BusinessRecord] = []
 
-    def fake_enrich(records: List[BusinessRecord], timeout: int, max_workers: int) -> List[BusinessRecord]:
+    def fake_enrich(
+        records: List[BusinessRecord], timeout: int, max_workers: int, **kwargs: Any
+    ) -> List[BusinessRecord]:
         captured_records.extend(records)
         return records
 
@@ -85,4 +99,81 @@ def test_export_records_creates_files(tmp_path: Path):
 
     assert json_path.exists()
     assert csv_path.exists()
-    assert xlsx_path.exists()
\ No newline at end of file
+    assert xlsx_path.exists()
+
+def test_record_writers_stream_rows_to_disk(tmp_path: Path):
+    rows = [{"Business Name": f"B{i}", "Emails": [f"b{i}@shop.com"]} for i in range(3)]
+
+    with open_record_writer("jsonl", tmp_path, "stream") as writer:
+        for row in rows:
+            writer.write(row)
+            # Each row is on disk before the next one is produced.
+            lines = writer.path.read_text(encoding="utf-8").splitlines()
+            assert json.loads(lines[-1]) == row
+
+    json_path = export_records(rows, "json", tmp_path, "array")
+    assert json_path.read_text(encoding="utf-8") == json.dumps(rows, ensure_ascii=False, indent=2)
+    empty_path = export_records([], "json", tmp_path, "empty")
+    assert json.loads(empty_path.read_text(encoding="utf-8")) == []
+
+def test_parquet_export_is_typed_with_list_emails(tmp_path: Path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    record = BusinessRecord(
+        business_name="A",
+        business_address=None,
+        website="http://a.com",
+        phone=None,
+        emails=["a@example.com", "b@example.com"],
+        facebook=None,
+        instagram="https://instagram.com/a",
+        twitter=None,
+        linkedin=None,
+        tiktok=None,
+        youtube=None,
+    )
+    with open_record_writer("parquet", tmp_path, "typed") as writer:
+        writer.write_record(record)
+        writer.write(record_to_dict(make_basic_record("B")))
+
+    table = pq.read_table(writer.path)
+    assert table.column_names == DEFAULT_HEADERS
+    assert str(table.schema.field("Emails").type) == "list<element: string>"
+    rows = table.to_pylist()
+    assert rows[0]["Emails"] == ["a@example.com", "b@example.com"]
+    assert rows[0]["Phone"] is None
+    empty = {column: None for column in DEFAULT_HEADERS}
+    assert rows[1] == {**empty, "Business Name": "B", "Emails": []}
+
+def test_excel_export_streams_rows_with_list_cells_as_text(tmp_path: Path):
+    openpyxl = pytest.importorskip("openpyxl")
+    with open_record_writer("excel", tmp_path, "leads") as writer:
+        writer.write_record(make_basic_record("A", website="http://a.com"))
+        writer.write(record_to_dict(make_basic_record("B")) | {"Emails": ["b@example.com"]})
+
+    sheet = openpyxl.load_workbook(writer.path).active
+    rows = [[cell.value for cell in row] for row in sheet.iter_rows()]
+    assert rows[0] == DEFAULT_HEADERS
+    assert rows[1][:3] == ["A", "N/A", "http://a.com"]
+    assert rows[2][4] == "['b@example.com']"
+
+def test_heavy_export_libraries_are_imported_lazily():
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]); import runner; "
+        "print(sorted(m for m in ('pandas', 'openpyxl', 'pyarrow') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(SRC_DIR)], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+def test_run_for_query_streams_records_to_writer(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(
+        runner, "fetch_search_html", lambda q, user_agent, timeout, **kwargs: SAMPLE_HTML
+    )
+    settings: Dict[str, Any] = {"enrich_contacts": False}
+
+    output_path = runner.run_for_query("test query", settings, "jsonl", tmp_path)
+
+    assert output_path == tmp_path / "test_query.jsonl"
+    rows = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert [row["Business Name"] for row in rows] == ["Test Business"]
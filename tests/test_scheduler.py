@@ -0,0 +1,145 @@
+import concurrent.futures
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from network.http_client import HttpClient  # type: ignore  # noqa: E402
+from pipeline.scheduler import FairExecutor, run_query_batch  # type: ignore  # noqa: E402
+
+def _ordered_run(policy):
+    order = []
+    gate = threading.Event()
+    with FairExecutor(1, policy=policy) as pool:
+        blocker = pool.submit("setup", gate.wait)
+        futures = [pool.submit("big", order.append, f"big{i}") for i in range(3)]
+        futures += [pool.submit("small", order.append, f"small{i}") for i in range(2)]
+        gate.set()
+        blocker.result()
+        for future in futures:
+            future.result()
+    return order
+
+def test_fair_executor_round_robin_interleaves_groups():
+    assert _ordered_run("round_robin") == ["big0", "small0", "big1", "small1", "big2"]
+    assert _ordered_run("fifo") == ["big0", "big1", "big2", "small0", "small1"]
+
+def test_fair_executor_tasks_share_the_inflight_limit():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def task():
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+
+    with FairExecutor(2) as pool:
+        # An async fetch elsewhere holds one of the two slots.
+        assert pool.inflight.try_acquire()
+        futures = [pool.submit("q", task) for _ in range(3)]
+        concurrent.futures.wait(futures, timeout=5)
+        pool.inflight.release()
+    assert state["peak"] == 1
+
+def test_run_query_batch_runs_queries_concurrently(tmp_path):
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    both_started = threading.Barrier(2, timeout=5)
+
+    def fake_run(query, settings, fmt, executor, output_dir):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        both_started.wait()
+        executor.submit(lambda: None).result()
+        with lock:
+            state["active"] -= 1
+        return output_dir / f"{query}.{fmt}"
+
+    settings = {"scheduler": {"max_concurrent_queries": 2, "global_max_inflight": 2}}
+    paths = run_query_batch(
+        [("a", "csv"), ("b", "json")],
+        settings,
+        fake_run,
+        output_dir=tmp_path,
+    )
+
+    assert paths == [tmp_path / "a.csv", tmp_path / "b.json"]
+    assert state["peak"] == 2
+
+def test_run_query_batch_keeps_a_smaller_configured_enrich_window(tmp_path):
+    windows = []
+
+    def fake_run(query, settings, fmt, executor, output_dir):
+        windows.append(settings["enrich_window"])
+        return output_dir / f"{query}.{fmt}"
+
+    for configured in (None, 3, 20):
+        settings = {"scheduler": {"per_query_max_inflight": 8}, "enrich_window": configured}
+        run_query_batch([("a", "csv")], settings, fake_run, output_dir=tmp_path)
+    assert windows == [8, 3, 8]
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        with self.lock:
+            self.state["active"] += 1
+            self.state["peak"] = max(self.state["peak"], self.state["active"])
+        time.sleep(0.1)
+        with self.lock:
+            self.state["active"] -= 1
+        body = b"hello@shop.test"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+def test_async_engine_keeps_to_the_global_inflight_limit(monkeypatch, tmp_path):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    site = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        return [
+            make_basic_record(f"{query}{i}", None, f"{site}/{query}{i}", None) for i in range(4)
+        ]
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    settings: Dict[str, Any] = {
+        "enrich_contacts": True,
+        "engine": "async",
+        "scheduler": {"max_concurrent_queries": 3, "global_max_inflight": 2},
+    }
+    with HttpClient(timeout=5) as client:
+        paths = run_query_batch(
+            [("a", "jsonl"), ("b", "jsonl"), ("c", "jsonl")],
+            settings,
+            runner.run_for_query,
+            output_dir=tmp_path,
+            client=client,
+        )
+    httpd.shutdown()
+    httpd.server_close()
+
+    assert all(len(path.read_text(encoding="utf-8").splitlines()) == 4 for path in paths)
+    assert _SlowHandler.state["peak"] == 2
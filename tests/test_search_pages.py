@@ -0,0 +1,154 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from network.http_client import HttpClient  # type: ignore  # noqa: E402
+from pipeline.cpu_pool import CpuPool  # type: ignore  # noqa: E402
+
+TOTAL_RESULTS = 45
+PAGE_SIZE = 20
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    starts: List[int] = []
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        params = parse_qs(urlsplit(self.path).query)
+        start = int(params.get("start", ["0"])[0])
+        self.starts.append(start)
+        blocks = "".join(
+            f'<div class="business-result"><div class="business-name">Biz {i}</div>'
+            f'<a class="business-website" href="http://biz{i}.test">Website</a></div>'
+            for i in range(start, min(start + PAGE_SIZE, TOTAL_RESULTS))
+        )
+        body = f"<html><body>{blocks}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+@pytest.fixture
+def search_settings():
+    _SearchHandler.starts = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    port = httpd.server_address[1]
+    yield {
+        "enrich_contacts": False,
+        "search": {
+            "url_template": f"http://127.0.0.1:{port}/search?q={{query}}",
+            "page_size": PAGE_SIZE,
+            "prefetch_pages": 1,
+        },
+    }
+    httpd.shutdown()
+    httpd.server_close()
+
+def _names(settings: Dict[str, Any], cpu_pool=None) -> List[str]:
+    with HttpClient(timeout=5) as client:
+        records = runner.iter_business_records(
+            "pizza", settings, client=client, cpu_pool=cpu_pool
+        )
+        return [record.business_name for record in records]
+
+def test_pages_are_fetched_until_results_run_out(search_settings):
+    names = _names({**search_settings, "max_results": None})
+    assert names == [f"Biz {i}" for i in range(TOTAL_RESULTS)]
+    assert sorted(_SearchHandler.starts) == [0, 20, 40]
+
+def test_paging_stops_at_max_results(search_settings):
+    names = _names({**search_settings, "max_results": 30})
+    assert names == [f"Biz {i}" for i in range(30)]
+    assert sorted(_SearchHandler.starts) == [0, 20]
+
+def test_pages_can_be_parsed_in_worker_processes(search_settings):
+    with CpuPool(max_workers=1) as pool:
+        names = _names({**search_settings, "max_results": 25}, cpu_pool=pool)
+    assert names == [f"Biz {i}" for i in range(25)]
+
+def test_next_page_is_prefetched_while_the_first_is_consumed(search_settings):
+    settings: Dict[str, Any] = {**search_settings, "max_results": None}
+    with HttpClient(timeout=5) as client:
+        pages = runner.iter_search_pages("pizza", settings, client)
+        first = next(pages)
+        deadline = time.monotonic() + 5
+        while len(_SearchHandler.starts) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(first) == PAGE_SIZE
+        assert _SearchHandler.starts == [0, 20]
+        pages.close()
+
+def test_search_page_url_appends_offset_when_template_has_none():
+    settings = {"search": {"page_size": 20}}
+    assert runner.search_page_url("a b", settings) == "https://www.google.com/maps/search/a%20b"
+    assert runner.search_page_url("a b", settings, 2).endswith("/a%20b?start=40")
+    templated = {"search": {"url_template": "http://x/?q={query}&s={start}", "page_size": 10}}
+    assert runner.search_page_url("q", templated, 3) == "http://x/?q=q&s=30"
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        if self.path == "/slow":
+            time.sleep(1)
+        body = b"hello@site.test"
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        return None
+
+def test_async_engine_enriches_all_pages_on_one_client(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    site = f"http://127.0.0.1:{httpd.server_address[1]}"
+    pages = [["Slow"], ["Fast"]]
+
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, page: int, *_):
+        names = pages[page] if page < len(pages) else []
+        return [make_basic_record(name, None, f"{site}/{name.lower()}", None) for name in names]
+
+    build = runner.build_async_http_client
+    built: List[Any] = []
+
+    def counting_build(*args: Any, **kwargs: Any):
+        built.append(build(*args, **kwargs))
+        return built[-1]
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    monkeypatch.setattr(runner, "build_async_http_client", counting_build)
+    settings: Dict[str, Any] = {"engine": "async", "search": {"page_size": 1}}
+    with HttpClient(timeout=5) as client:
+        records = list(runner.iter_business_records("q", settings, client=client))
+    httpd.shutdown()
+    httpd.server_close()
+
+    # The second page's fetch does not wait for the first page's slow one.
+    assert [record.business_name for record in records] == ["Fast", "Slow"]
+    assert all(record.emails == ["hello@site.test"] for record in records)
+    assert len(built) == 1
@@ -0,0 +1,167 @@
+import http.client
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from network.http_client import HttpClient  # type: ignore  # noqa: E402
+from pipeline.service import ScrapeService, serve  # type: ignore  # noqa: E402
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: Set[int] = set()
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        self.connections.add(self.client_address[1])
+        blocks = "".join(
+            f'<div class="business-result"><div class="business-name">Biz {i}</div></div>'
+            for i in range(3)
+        )
+        body = f"<html><body>{blocks}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+@pytest.fixture
+def start_service():
+    started = []
+
+    def start(settings: Dict[str, Any], iter_records, **resources) -> ScrapeService:
+        service = ScrapeService(settings, iter_records, **resources)
+        server = serve(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append((service, server))
+        service.port = server.server_address[1]
+        return service
+
+    yield start
+    for service, server in started:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+def _post(port: int, body: Dict[str, Any], headers: Dict[str, str] = None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("POST", "/scrape", json.dumps(body), headers or {})
+    return conn, conn.getresponse()
+
+def _lines(resp) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in resp.read().decode("utf-8").splitlines()]
+
+def test_records_stream_as_ndjson_over_one_warm_client(start_service):
+    _SearchHandler.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    settings = {
+        "enrich_contacts": False,
+        "search": {"url_template": f"http://127.0.0.1:{httpd.server_address[1]}/s?q={{query}}"},
+    }
+    try:
+        with HttpClient(timeout=5) as client:
+            service = start_service(settings, runner.iter_business_records, client=client)
+            for query in ("pizza", "tacos"):
+                conn, resp = _post(service.port, {"query": query})
+                assert resp.status == 200
+                assert resp.getheader("Content-Type") == "application/x-ndjson"
+                assert resp.getheader("X-Request-Id")
+                names = [row["Business Name"] for row in _lines(resp)]
+                conn.close()
+                assert names == ["Biz 0", "Biz 1", "Biz 2"]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    # Both requests went out over the same pooled connection.
+    assert len(_SearchHandler.connections) == 1
+    assert service.stats() == {"active": 0, "served": 2}
+
+def _endless(closed: threading.Event, release: threading.Event = None):
+    def iter_records(query, settings, executor=None, **kwargs):
+        try:
+            i = 0
+            while True:
+                if release is not None:
+                    release.wait(5)
+                yield make_basic_record(name=f"{query} {i}")
+                i += 1
+                time.sleep(0.01)
+        finally:
+            closed.set()
+
+    return iter_records
+
+def test_delete_cancels_a_running_request(start_service):
+    closed = threading.Event()
+    service = start_service({}, _endless(closed))
+    conn, resp = _post(service.port, {"query": "pizza"}, {"X-Request-Id": "job-1"})
+    assert resp.getheader("X-Request-Id") == "job-1"
+    assert json.loads(resp.readline())["Business Name"] == "pizza 0"
+
+    cancel = http.client.HTTPConnection("127.0.0.1", service.port, timeout=5)
+    cancel.request("DELETE", "/scrape/job-1")
+    cancelled = cancel.getresponse()
+    assert cancelled.status == 202
+    cancelled.read()
+    resp.read()  # the stream ends instead of running forever
+    assert closed.wait(5)
+
+    cancel.request("DELETE", "/scrape/job-1")
+    assert cancel.getresponse().status == 404
+    conn.close()
+    cancel.close()
+
+def test_client_disconnect_stops_the_query(start_service):
+    closed = threading.Event()
+    service = start_service({}, _endless(closed))
+    conn, resp = _post(service.port, {"query": "pizza"})
+    resp.readline()
+    conn.sock.close()
+    conn.close()
+    assert closed.wait(5)
+
+def test_full_service_answers_503(start_service):
+    closed, release = threading.Event(), threading.Event()
+    service = start_service(
+        {"service": {"max_concurrent_requests": 1, "queue_timeout_seconds": 0.05}},
+        _endless(closed, release),
+    )
+    first = threading.Thread(target=_post, args=(service.port, {"query": "slow"}), daemon=True)
+    first.start()
+    deadline = time.time() + 5
+    while service.stats()["active"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+
+    conn, resp = _post(service.port, {"query": "pizza"})
+    assert resp.status == 503
+    assert resp.getheader("Retry-After") == "1"
+    conn.close()
+    release.set()
+
+@pytest.mark.parametrize(
+    "body",
+    [{}, {"query": ""}, {"query": "pizza", "settings": {"user_agent": "x"}}],
+)
+def test_invalid_requests_are_rejected(start_service, body):
+    service = start_service({}, _endless(threading.Event()))
+    conn, resp = _post(service.port, body)
+    assert resp.status == 400
+    assert "error" in json.loads(resp.read())
+    conn.close()
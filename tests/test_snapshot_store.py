@@ -0,0 +1,196 @@
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import BusinessRecord, make_basic_record  # type: ignore  # noqa: E402
+from storage.dedup_index import build_dedup_index  # type: ignore  # noqa: E402
+from storage.snapshot_store import DAY_SECONDS, SnapshotStore  # type: ignore  # noqa: E402
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _record(name: str, website: str, **contacts: Any) -> BusinessRecord:
+    return replace(make_basic_record(name, None, website, f"555-{ord(name):04d}"), **contacts)
+
+def test_plan_refetches_new_changed_and_stale_businesses(tmp_path: Path):
+    clock = FakeClock()
+    store = SnapshotStore(
+        tmp_path / "snap.sqlite",
+        ttl_seconds={"default": 30 * DAY_SECONDS, "emails": 7 * DAY_SECONDS},
+        clock=clock,
+    )
+    first = store.begin("q")
+    for name in "AB":
+        first.observe(_record(name, f"http://{name.lower()}.test", emails=["x@a.test"]), True)
+    first.finish()
+
+    clock.now += 3 * DAY_SECONDS
+    second = store.begin("q")
+    carried, reason = second.plan(_record("A", "http://a.test/"))
+    assert reason == "fresh" and carried.emails == ["x@a.test"]
+    assert second.plan(_record("B", "http://b-new.test")) == (None, "website_changed")
+    assert second.plan(_record("C", "http://c.test")) == (None, "new")
+
+    # Emails expire after a week even though the other fields last a month.
+    clock.now += 5 * DAY_SECONDS
+    assert store.begin("q").plan(_record("A", "http://a.test")) == (None, "stale")
+    assert store.stats() == {"new": 1, "website_changed": 1, "stale": 1, "fresh": 1}
+    store.close()
+
+def test_finish_reports_added_changed_and_removed(tmp_path: Path):
+    store = SnapshotStore(tmp_path / "snap.sqlite", clock=FakeClock())
+    first = store.begin("q")
+    first.observe(_record("A", "http://a.test", emails=["old@a.test"]), refreshed=True)
+    first.observe(_record("B", "http://b.test"), refreshed=True)
+    assert [c["change"] for c in first.finish()] == ["added", "added"]
+
+    second = store.begin("q")
+    second.observe(_record("A", "http://a.test", emails=["new@a.test"]), refreshed=True)
+    second.observe(_record("C", "http://c.test"), refreshed=True)
+    changes = second.finish()
+    assert [(c["change"], c["business"]) for c in changes] == [
+        ("changed", "A"),
+        ("added", "C"),
+        ("removed", "B"),
+    ]
+    assert changes[0]["fields"] == {"Emails": {"old": ["old@a.test"], "new": ["new@a.test"]}}
+    assert sorted(store.begin("q").previous) == sorted(second.current)
+    store.close()
+
+def test_second_run_only_enriches_what_changed(monkeypatch, tmp_path: Path):
+    listings = [_record(name, f"http://{name.lower()}.test") for name in "ABC"]
+    fetched: List[str] = []
+
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        return list(listings)
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            fetched.append(record.business_name)
+            yield replace(record, emails=[f"{record.business_name.lower()}@mail.test"])
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    settings: Dict[str, Any] = {"enrich_contacts": True}
+
+    store = SnapshotStore(tmp_path / "snap.sqlite")
+    runner.run_for_query("q", settings, "jsonl", tmp_path, client=object(), snapshot_store=store)
+    assert fetched == ["A", "B", "C"]
+
+    fetched.clear()
+    listings[1] = _record("B", "http://b-moved.test")
+    del listings[2]
+    path = runner.run_for_query(
+        "q", settings, "jsonl", tmp_path, client=object(), snapshot_store=store
+    )
+    store.close()
+    assert fetched == ["B"]
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [row["Emails"] for row in rows] == [["a@mail.test"], ["b@mail.test"]]
+
+    delta = tmp_path / "q.delta.jsonl"
+    changes = [json.loads(line) for line in delta.read_text(encoding="utf-8").splitlines()]
+    assert [(c["change"], c["business"]) for c in changes] == [
+        ("changed", "B"),
+        ("removed", "C"),
+    ]
+    assert set(changes[0]["fields"]) == {"Website"}
+
+def test_stale_snapshot_overrides_the_dedup_index(monkeypatch, tmp_path: Path):
+    listings = [_record("A", "http://a.test")]
+    fetched: List[str] = []
+
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        return list(listings)
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            fetched.append(record.business_name)
+            yield replace(record, emails=[f"run{len(fetched)}@a.test"])
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    # A persistent index remembers that A was enriched by the first run.
+    settings: Dict[str, Any] = {
+        "enrich_contacts": True,
+        "dedup": {"enabled": True, "persist": True},
+    }
+    clock = FakeClock()
+    store = SnapshotStore(tmp_path / "snap.sqlite", clock=clock)
+
+    def run() -> List[Dict[str, Any]]:
+        dedup_index = build_dedup_index(settings, tmp_path)
+        path = runner.run_for_query(
+            "q",
+            settings,
+            "jsonl",
+            tmp_path,
+            client=object(),
+            dedup_index=dedup_index,
+            snapshot_store=store,
+        )
+        dedup_index.close()
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    run()
+    clock.now += DAY_SECONDS
+    assert [row["Emails"] for row in run()] == [["run1@a.test"]]
+    assert fetched == ["A"]
+
+    clock.now += 31 * DAY_SECONDS
+    assert [row["Emails"] for row in run()] == [["run1@a.test", "run2@a.test"]]
+    assert fetched == ["A", "A"]
+    assert store.stats() == {"new": 1, "website_changed": 0, "stale": 1, "fresh": 1}
+    store.close()
+
+def test_failed_refetch_keeps_the_old_contacts_and_stays_stale(monkeypatch, tmp_path: Path):
+    fetched: List[str] = []
+    fail = False
+
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        return [_record("A", "http://a.test")]
+
+    def fake_iter_enriched(records: List[BusinessRecord], **kwargs: Any):
+        for record in records:
+            fetched.append(record.business_name)
+            if fail:
+                kwargs["on_failed"](record)
+                yield record
+            else:
+                yield replace(record, emails=["old@a.test"])
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    settings: Dict[str, Any] = {"enrich_contacts": True}
+    clock = FakeClock()
+    store = SnapshotStore(tmp_path / "snap.sqlite", clock=clock)
+
+    def run() -> List[Dict[str, Any]]:
+        path = runner.run_for_query(
+            "q", settings, "jsonl", tmp_path, client=object(), snapshot_store=store
+        )
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    run()
+    clock.now += 31 * DAY_SECONDS
+    fail = True
+    assert [row["Emails"] for row in run()] == [["old@a.test"]]
+    assert (tmp_path / "q.delta.jsonl").read_text(encoding="utf-8") == ""
+
+    # The failed fetch did not count as verifying the old contacts.
+    run()
+    assert fetched == ["A", "A", "A"]
+    store.close()
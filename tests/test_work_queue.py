@@ -0,0 +1,270 @@
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+# Ensure src is importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import runner  # type: ignore  # noqa: E402
+from extractors.utils_format import make_basic_record  # type: ignore  # noqa: E402
+from pipeline.work_queue import (  # type: ignore  # noqa: E402
+    QUERY_JOB,
+    MemoryWorkQueue,
+    SqliteWorkQueue,
+    enqueue_queries,
+    run_worker,
+)
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_queue(request, tmp_path: Path):
+    queues = []
+
+    def make(clock=None, max_attempts: int = 3):
+        kwargs: Dict[str, Any] = {"max_attempts": max_attempts}
+        if clock is not None:
+            kwargs["clock"] = clock
+        if request.param == "memory":
+            queue = MemoryWorkQueue(**kwargs)
+        else:
+            queue = SqliteWorkQueue(tmp_path / "queue.sqlite", **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+def test_enqueue_is_idempotent_and_claims_are_exclusive(make_queue):
+    queue = make_queue()
+    assert queue.put(QUERY_JOB, "a", {"query": "a"})
+    assert not queue.put(QUERY_JOB, "a", {"query": "a"})
+    assert queue.put(QUERY_JOB, "b", {"query": "b"})
+
+    first = queue.claim("w1", lease_seconds=60)
+    second = queue.claim("w2", lease_seconds=60)
+    assert (first.key, second.key) == ("a", "b")
+    assert first.payload == {"query": "a"} and first.attempts == 1
+    assert queue.claim("w3", lease_seconds=60) is None
+    assert queue.stats() == {"queued": 0, "leased": 2, "done": 0, "failed": 0}
+
+def test_abandoned_lease_is_redelivered_and_stale_worker_is_fenced(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock=clock)
+    queue.put(QUERY_JOB, "a", {})
+    stale = queue.claim("w1", lease_seconds=30)
+
+    clock.now += 10
+    assert queue.heartbeat(stale, lease_seconds=30)
+    clock.now += 35
+    fresh = queue.claim("w2", lease_seconds=30)
+    assert fresh is not None and fresh.attempts == 2
+    assert fresh.lease_token != stale.lease_token
+
+    assert not queue.heartbeat(stale, lease_seconds=30)
+    assert not queue.fail(stale, "boom")
+    assert queue.complete(stale, {"output": "a.csv"})
+    assert not queue.complete(fresh, {"output": "a.csv"})
+    assert list(queue.results(QUERY_JOB)) == [("a", {"output": "a.csv"})]
+
+def test_jobs_fail_for_good_after_max_attempts(make_queue):
+    clock = FakeClock()
+    queue = make_queue(clock=clock, max_attempts=2)
+    queue.put(QUERY_JOB, "flaky", {})
+    queue.put(QUERY_JOB, "abandoned", {})
+
+    flaky = queue.claim("w", lease_seconds=30)
+    assert queue.fail(flaky, "timeout")
+    flaky = queue.claim("w", lease_seconds=30)
+    assert flaky.key == "flaky" and flaky.attempts == 2
+    assert not queue.fail(flaky, "timeout")
+    queue.claim("w", lease_seconds=30)  # "abandoned", never finished
+
+    clock.now += 31
+    abandoned = queue.claim("w", lease_seconds=30)
+    assert abandoned.attempts == 2
+    clock.now += 31
+    assert queue.claim("w", lease_seconds=30) is None
+    assert queue.stats() == {"queued": 0, "leased": 0, "done": 0, "failed": 2}
+
+CLAIM_SCRIPT = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from pipeline.work_queue import SqliteWorkQueue
+queue = SqliteWorkQueue(sys.argv[2])
+claimed = []
+while True:
+    job = queue.claim(sys.argv[3], lease_seconds=60)
+    if job is None:
+        break
+    claimed.append(job.key)
+    queue.complete(job, {})
+print(json.dumps(claimed))
+"""
+
+def test_sqlite_queue_hands_each_job_to_one_process(tmp_path: Path):
+    path = tmp_path / "queue.sqlite"
+    queue = SqliteWorkQueue(path)
+    keys = [f"q{i}" for i in range(200)]
+    for key in keys:
+        queue.put(QUERY_JOB, key, {})
+
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", CLAIM_SCRIPT, str(SRC_DIR), str(path), f"w{i}"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for i in range(4)
+    ]
+    claimed: List[str] = []
+    for proc in procs:
+        out, _ = proc.communicate(timeout=60)
+        claimed.extend(json.loads(out))
+
+    assert sorted(claimed) == sorted(keys)
+    assert queue.stats()["done"] == 200
+    queue.close()
+
+def _fake_run_query(calls: List[str], lock: threading.Lock):
+    def run_query(query, settings, fmt, output_dir, executor=None, **kwargs):
+        with lock:
+            calls.append(query)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{query}.{fmt}"
+        path.write_text(query, encoding="utf-8")
+        return path
+
+    return run_query
+
+def test_workers_drain_the_queue_and_pick_up_abandoned_jobs(tmp_path: Path):
+    path = tmp_path / "queue.sqlite"
+    settings = {
+        "work_queue": {"lease_seconds": 0.5, "poll_seconds": 0.05},
+        "scheduler": {"max_concurrent_queries": 2, "global_max_inflight": 4},
+    }
+    coordinator = SqliteWorkQueue(path)
+    assert enqueue_queries(coordinator, [(f"q{i}", "csv") for i in range(6)]) == 6
+    assert enqueue_queries(coordinator, [("q0", "csv")]) == 0
+    coordinator.claim("crashed-worker", lease_seconds=0.5)  # q0, never finished
+
+    calls: List[str] = []
+    run_query = _fake_run_query(calls, threading.Lock())
+    workers = [SqliteWorkQueue(path) for _ in range(2)]
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            args=(queue, settings, run_query, tmp_path / "out"),
+            kwargs={"worker_id": f"w{i}"},
+        )
+        for i, queue in enumerate(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert sorted(calls) == [f"q{i}" for i in range(6)]
+    assert sorted(p.name for p in (tmp_path / "out").iterdir() if p.is_file()) == [
+        f"q{i}.csv" for i in range(6)
+    ]
+    assert not any((tmp_path / "out" / ".staging").iterdir())
+    assert coordinator.stats() == {"queued": 0, "leased": 0, "done": 6, "failed": 0}
+    for queue in [coordinator, *workers]:
+        queue.close()
+
+def test_worker_publishes_the_deferred_listing_with_the_output(monkeypatch, tmp_path: Path):
+    def fake_fetch_and_parse(query: str, settings: Dict[str, Any], client: Any, *args: Any):
+        return [make_basic_record("Slow", None, "http://slow.test", None)]
+
+    def fake_iter_enriched(records, **kwargs: Any):
+        for record in records:
+            kwargs["on_missed"](record, "query")
+            yield record
+
+    monkeypatch.setattr(runner, "_fetch_and_parse", fake_fetch_and_parse)
+    monkeypatch.setattr(runner, "iter_enriched_records", fake_iter_enriched)
+    queue = MemoryWorkQueue()
+    enqueue_queries(queue, [("q", "jsonl")])
+    settings: Dict[str, Any] = {"enrich_contacts": True, "work_queue": {"poll_seconds": 0.05}}
+    out = tmp_path / "out"
+    run_worker(queue, settings, runner.run_for_query, out, client=object())
+
+    assert sorted(p.name for p in out.iterdir() if p.is_file()) == [
+        "q.deferred.jsonl",
+        "q.jsonl",
+    ]
+    deferred = (out / "q.deferred.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["business"] for line in deferred] == ["Slow"]
+    assert list(queue.results(QUERY_JOB)) == [
+        (
+            '["q", "jsonl"]',
+            {"output": str(out / "q.jsonl"), "artifacts": [str(out / "q.deferred.jsonl")]},
+        )
+    ]
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        body = (
+            '<html><body><div class="business-result">'
+            '<div class="business-name">Biz</div></div></body></html>'
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+def test_cli_enqueue_then_worker(tmp_path: Path):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    settings = {
+        "enrich_contacts": False,
+        "search": {"url_template": f"http://127.0.0.1:{httpd.server_address[1]}/s?q={{query}}"},
+        "work_queue": {"poll_seconds": 0.05},
+    }
+    config = tmp_path / "settings.json"
+    config.write_text(json.dumps(settings), encoding="utf-8")
+    inputs = tmp_path / "inputs.json"
+    inputs.write_text(json.dumps([{"query": "pizza"}, {"query": "tacos"}]), encoding="utf-8")
+    out = tmp_path / "out"
+    common = ["--config", str(config), "--output-dir", str(out)]
+
+    try:
+        runner.main(["--enqueue", "--inputs", str(inputs), *common])
+        assert not list(out.glob("*.csv"))
+        runner.main(["--worker", *common])
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert sorted(p.name for p in out.glob("*.csv")) == ["pizza.csv", "tacos.csv"]
+    queue = SqliteWorkQueue(out / "work_queue.sqlite")
+    assert queue.stats()["done"] == 2
+    queue.close()
+
+def test_cli_rejects_enqueue_to_the_memory_backend(tmp_path: Path):
+    config = tmp_path / "settings.json"
+    config.write_text(json.dumps({"work_queue": {"backend": "memory"}}), encoding="utf-8")
+    with pytest.raises(SystemExit, match="shared work queue"):
+        runner.main(["--enqueue", "--query", "pizza", "--config", str(config)])